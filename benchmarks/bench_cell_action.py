@@ -0,0 +1,193 @@
+"""Benchmark for building cell action tags from the IMU action CSV.
+
+Compares the previous ``iterrows`` loop (one tag dict, list item and signal per row) with the
+vectorized ``build_cell_action_tags`` transform shown through a ``TagListModel`` (no items),
+and checks that both produce the same tags. Also times one video start time nudge: the scalar
+shift and formatting one screen of list rows, which is all a repaint asks the model for, and
+checks that the transform emits no pandas warnings.
+
+Usage:
+    python -m benchmarks.bench_cell_action [--rows 200000] [--dir /path/to/data]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QListWidgetItem
+
+from src.video_tagger.cell_action_tag_manager import CellActionTagManager
+from src.video_tagger.cell_actions import TAG_TYPE, build_cell_action_tags
+from src.video_tagger.tag_list_model import TagListModel
+from src.video_tagger.utils import format_time
+
+
+class LegacyCellActionTagManager(CellActionTagManager):
+    """``load_cell_action_tags`` as it was before the vectorized transform."""
+
+    def add_tag(self, tag):
+        self.tags.append(tag)
+        item = QListWidgetItem(f"[{format_time(tag['time_ms'])}] {self.tag_label(tag)}")
+        item.setData(Qt.UserRole, tag)
+        self.items.append(item)
+
+    def load_cell_action_tags(self):
+        self.tags = []
+        self.items = []
+        if self.cell_action is not None:
+            for _, row in self.cell_action.iterrows():
+                if self.video_start_time is None:
+                    self.set_video_start_time(row["initial_time"])
+
+                time_ms = int((row["initial_time"] - self.video_start_time).total_seconds() * 1000)
+                initial_time = row["initial_time"]
+                final_time = row["final_time"]
+                action_type = row["type"]
+                direction = row["direction"]
+                value = row["value"]
+                level = row["level"]
+
+                if action_type == "JUM":
+                    value = round(value * 100, 1)
+                    level = ""
+                elif action_type == "DIV":
+                    value = ""
+
+                duration_ms = int((final_time - initial_time).total_seconds() * 1000)
+
+                tag = {
+                    "time_ms": time_ms,
+                    "duration_ms": max(duration_ms, 0),
+                    "initial_time": initial_time,
+                    "final_time": final_time,
+                    "action_type": action_type,
+                    "direction": direction,
+                    "value": value,
+                    "level": level,
+                    "tag_type": TAG_TYPE,
+                }
+
+                self.add_tag(tag)
+
+
+def write_csv(filename, rows):
+    rng = np.random.default_rng(0)
+    start = pd.Timestamp("2024-05-01 12:00:00")
+    initial_time = start + pd.to_timedelta(np.sort(rng.integers(0, 5_400_000, rows)), unit="ms")
+    action_type = rng.choice(["JUM", "DIV", "SPR"], rows)
+    pd.DataFrame(
+        {
+            "initial_time": initial_time.strftime("%Y-%m-%d %H:%M:%S.%f"),
+            "final_time": (
+                initial_time + pd.to_timedelta(rng.integers(0, 3000, rows), unit="ms")
+            ).strftime("%Y-%m-%d %H:%M:%S.%f"),
+            "type": action_type,
+            "direction": np.where(action_type == "SPR", None, rng.choice(["L", "R", "F"], rows)),
+            "value": rng.random(rows).round(4),
+            "level": rng.choice(["L", "M", "H"], rows),
+        }
+    ).to_csv(filename, index=False)
+
+
+def measure_legacy(filename):
+    manager = LegacyCellActionTagManager()
+    manager.load_cell_action(filename)
+    start = time.perf_counter()
+    # 이전 구현: 태그마다 list item 을 만듦
+    manager.load_cell_action_tags()
+    elapsed = time.perf_counter() - start
+    return elapsed, manager, [item.text() for item in manager.items]
+
+
+def measure_model(filename):
+    manager = CellActionTagManager()
+    manager.load_cell_action(filename)
+    model = TagListModel(time_ms=manager.time_ms, label=lambda tag: tag["label"])
+    # 새 구현: 모든 태그를 한 번에 전달받아 모델만 바꿈 (문구는 보일 때 만듦)
+    manager.tagsLoaded.connect(model.set_tags)
+    start = time.perf_counter()
+    manager.load_cell_action_tags()
+    elapsed = time.perf_counter() - start
+    return elapsed, manager, model
+
+
+def measure_retime(manager, model, shift_ms=40, visible_rows=50):
+    """Time one start time nudge: the scalar shift and the repaint of the visible rows."""
+    start_time = manager.video_start_time + pd.Timedelta(milliseconds=shift_ms)
+    start = time.perf_counter()
+    manager.set_video_start_time(start_time)
+    shift_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in range(min(visible_rows, model.rowCount())):
+        model.index(row, 0).data()
+    refresh_time = time.perf_counter() - start
+    return shift_time, refresh_time
+
+
+def model_texts(model):
+    return [model.index(row, 0).data() for row in range(model.rowCount())]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--dir", default=None, help="directory for the benchmark CSV")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp_dir:
+        filename = os.path.join(tmp_dir, "imu_action.csv")
+        write_csv(filename, args.rows)
+
+        legacy_time, legacy, legacy_texts = measure_legacy(filename)
+        vectorized_time, vectorized, model = measure_model(filename)
+
+    vectorized_texts = model_texts(model)
+    shift_time, refresh_time = measure_retime(vectorized, model)
+    vectorized.set_video_start_time(vectorized.video_start_time - pd.Timedelta(milliseconds=40))
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        start = time.perf_counter()
+        build_cell_action_tags(vectorized.cell_action)
+        transform_time = time.perf_counter() - start
+
+    legacy_tags = pd.DataFrame(legacy.get_tags())
+    vectorized_tags = pd.DataFrame(vectorized.get_tags())
+    vectorized_tags["time_ms"] = vectorized_tags.pop("epoch_ms") - vectorized.start_epoch_ms
+    vectorized_tags = vectorized_tags.drop(columns="label")[legacy_tags.columns]
+    # 이전 구현은 total_seconds() * 1000 을 잘라 1 ms 작게 나오는 경우가 있음
+    time_columns = ["time_ms", "duration_ms"]
+    time_diff = (vectorized_tags[time_columns] - legacy_tags[time_columns]).abs()
+    rounded = int(time_diff.to_numpy().any(axis=1).sum())
+    same_tags = bool((time_diff <= 1).all().all()) and legacy_tags.drop(
+        columns=time_columns
+    ).equals(vectorized_tags.drop(columns=time_columns))
+    same_labels = [text.split("] ", 1)[1] for text in legacy_texts] == [
+        text.split("] ", 1)[1] for text in vectorized_texts
+    ]
+
+    speedup = legacy_time / vectorized_time
+    print(f"{args.rows} rows")
+    print(f"iterrows + list items      {legacy_time:8.2f} s")
+    print(f"vectorized + list model     {vectorized_time:8.2f} s   ({speedup:.1f}x)")
+    print(f"  of which transform only   {transform_time:8.2f} s")
+    print(
+        f"start time nudge: shift {shift_time * 1e6:.0f} us,"
+        f" visible rows {refresh_time * 1e6:.0f} us"
+    )
+    print(f"same tags: {same_tags}, same labels: {same_labels}")
+    print(f"{rounded} tags 1 ms later than before (float truncation in the old loop)")
+    for warning in caught:
+        print(f"transform warning: {warning.category.__name__}: {warning.message}")
+    if not (same_tags and same_labels) or caught:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
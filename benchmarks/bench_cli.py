@@ -0,0 +1,104 @@
+"""Benchmark for exporting many data directories with the headless command line tool.
+
+Creates ``--sessions`` data directories with ``--tags`` tags and an IMU action CSV of
+``--actions`` rows each, then times ``video-tagger export --cell-actions`` over all of them in
+one process and in ``--workers`` worker processes. Also checks that exporting a session emits
+no warnings, which a batch run would otherwise print once per data directory.
+
+Usage:
+    python -m benchmarks.bench_cli [--sessions 16] [--tags 200000] [--actions 20000] \
+        [--workers 4] [--dir /path/to/data]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import warnings
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from src.video_tagger.cli import export_session, run_tasks
+from src.video_tagger.config import DataConfig, save_data_config
+from src.video_tagger.database import TagDatabase
+
+START_TIME = "2024-05-01 10:00:00.000"
+
+
+def make_session(data_dir, tags, actions, rng):
+    os.makedirs(data_dir, exist_ok=True)
+    time_ms = np.sort(rng.integers(0, 3600 * 1000, tags))
+    names = ["JUM H", "JUM L", "DIV", "SPIN"]
+    with TagDatabase(os.path.join(data_dir, "tags.db")) as db:
+        db.import_tags([[(int(t), names[i % len(names)], "MANUAL") for i, t in enumerate(time_ms)]])
+
+    initial_time = pd.Timestamp(START_TIME) + pd.to_timedelta(
+        np.sort(rng.integers(0, 3600 * 1000, actions)), unit="ms"
+    )
+    pd.DataFrame(
+        {
+            "initial_time": initial_time,
+            "final_time": initial_time + pd.Timedelta(milliseconds=500),
+            "type": rng.choice(["JUM", "DIV"], actions),
+            "direction": rng.choice(["L", "R", ""], actions),
+            "value": rng.random(actions),
+            "level": rng.choice(["H", "M", "L"], actions),
+        }
+    ).to_csv(os.path.join(data_dir, "imu_action.csv"), index=False)
+    save_data_config(
+        DataConfig(START_TIME, "", os.path.join(data_dir, "tags.db"), "imu_action.csv"),
+        os.path.join(data_dir, "data_config.yaml"),
+    )
+
+
+def measure(data_dirs, workers):
+    task = partial(export_session, export_format="csv", cell_actions=True)
+    start = time.perf_counter()
+    errors = [error for _, _, error in run_tasks(task, data_dirs, workers) if error is not None]
+    if errors:
+        raise RuntimeError(errors[0])
+    return time.perf_counter() - start
+
+
+def check_warnings(data_dir):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        export_session(data_dir, export_format="csv", cell_actions=True)
+    for warning in caught:
+        print(f"export warning: {warning.category.__name__}: {warning.message}")
+    return not caught
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--tags", type=int, default=200000)
+    parser.add_argument("--actions", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--dir", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp_dir:
+        rng = np.random.default_rng(0)
+        data_dirs = [os.path.join(tmp_dir, f"session{i:03d}") for i in range(args.sessions)]
+        for data_dir in data_dirs:
+            make_session(data_dir, args.tags, args.actions, rng)
+
+        # 첫 실행에서 CSV 캐시가 만들어지므로 한 번 돌린 뒤 측정
+        no_warnings = check_warnings(data_dirs[0])
+        measure(data_dirs, 1)
+        serial = measure(data_dirs, 1)
+        parallel = measure(data_dirs, args.workers)
+
+    print(f"{args.sessions} sessions, {args.tags} tags and {args.actions} cell actions each")
+    print(f"1 process        {serial:6.2f} s")
+    print(f"{args.workers} workers        {parallel:6.2f} s   ({serial / parallel:.1f}x)")
+    print(f"export without warnings: {no_warnings}")
+    if not no_warnings:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
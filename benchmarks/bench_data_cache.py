@@ -0,0 +1,110 @@
+"""Benchmark for the parsed-CSV sidecar cache.
+
+Writes a fusion CSV with ``--rows`` samples and compares parsing it with ``pd.read_csv`` against
+loading it through ``read_csv_cached`` (first load fills the cache, later loads read it). Also
+checks that the first and cached loads return the same frame as ``pd.read_csv``, including
+missing values in text columns, that touching the CSV invalidates the cache, and that a CSV
+Arrow cannot store (a column mixing text and numbers) is still read without the cache.
+
+Usage:
+    python -m benchmarks.bench_data_cache [--rows 2000000] [--dir /path/to/data]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.video_tagger.data_cache import cache_path, read_csv_cached
+
+
+def write_csv(filename, rows):
+    rng = np.random.default_rng(0)
+    pd.DataFrame(
+        {
+            "datetime": pd.date_range("2024-05-01 12:00:00", periods=rows, freq="10ms").strftime(
+                "%Y-%m-%d %H:%M:%S.%f"
+            ),
+            "euler_x": rng.standard_normal(rows),
+            "euler_y": rng.standard_normal(rows),
+            "euler_z": rng.standard_normal(rows),
+            # 빈 칸은 object 컬럼의 NaN 으로 읽힘
+            "direction": rng.choice(["L", "R", ""], rows),
+        }
+    ).to_csv(filename, index=False)
+
+
+def same_frame(a, b):
+    # equals 는 None 과 NaN 을 같게 보므로 object 컬럼은 값의 타입까지 비교
+    return a.equals(b) and all(
+        a[column].map(type).equals(b[column].map(type)) for column in a.columns[a.dtypes == object]
+    )
+
+
+def check_mixed_types(tmp_dir, rows=1000000):
+    # low_memory 로 나눠 읽으면 앞부분은 문자열, 뒷부분은 float 인 object 컬럼이 됨 (ArrowTypeError)
+    filename = os.path.join(tmp_dir, "mixed.csv")
+    values = np.where(np.arange(rows) < rows // 2, "x", "1.5")
+    pd.DataFrame({"datetime": "2024-05-01 12:00:00", "value": values}).to_csv(filename, index=False)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", pd.errors.DtypeWarning)
+        parsed = pd.read_csv(filename, parse_dates=["datetime"])
+        try:
+            return same_frame(parsed, read_csv_cached(filename, parse_dates=["datetime"]))
+        except Exception as e:
+            print(f"mixed types: {type(e).__name__}: {e}")
+            return False
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--dir", default=None, help="directory for the benchmark CSV")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp_dir:
+        filename = os.path.join(tmp_dir, "fusion.csv")
+        write_csv(filename, args.rows)
+        parse_dates = ["datetime"]
+
+        parse_time, parsed = timed(pd.read_csv, filename, parse_dates=parse_dates)
+        fill_time, first = timed(read_csv_cached, filename, parse_dates=parse_dates)
+        hit_time, cached = timed(read_csv_cached, filename, parse_dates=parse_dates)
+        cache_size = os.path.getsize(cache_path(filename, parse_dates))
+
+        stale_path = cache_path(filename, parse_dates)
+        os.utime(filename, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        read_csv_cached(filename, parse_dates=parse_dates)
+        invalidated = cache_path(filename, parse_dates) != stale_path and not os.path.exists(
+            stale_path
+        )
+
+        print(f"{args.rows} rows, CSV {os.path.getsize(filename) / 2**20:.1f} MiB")
+        print(f"read_csv                  {parse_time:8.3f} s")
+        print(f"cached (first load)       {fill_time:8.3f} s")
+        print(f"cached (hit)              {hit_time:8.3f} s   ({parse_time / hit_time:.0f}x)")
+        print(f"cache file                {cache_size / 2**20:8.1f} MiB")
+        same_first = same_frame(parsed, first)
+        same_cached = same_frame(parsed, cached)
+        print(
+            f"same frame: first load {same_first}, cache hit {same_cached}, "
+            f"invalidated on change: {invalidated}"
+        )
+        mixed = check_mixed_types(tmp_dir)
+        print(f"mixed-type column read without cache: {mixed}")
+        if not (same_first and same_cached and invalidated and mixed):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
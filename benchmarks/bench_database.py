@@ -0,0 +1,103 @@
+"""Micro-benchmark for TagDatabase add/remove latency.
+
+Compares the previous connect-per-call implementation with the persistent WAL connection.
+
+Usage:
+    python -m benchmarks.bench_database [--count 2000] [--dir /path/to/data]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from src.video_tagger.database import TagDatabase
+
+
+class LegacyTagDatabase:
+    """Connect-per-call implementation used before the persistent connection."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tags (
+                    time_ms INTEGER,
+                    tag_name TEXT,
+                    tag_type TEXT,
+                    PRIMARY KEY (time_ms, tag_name, tag_type)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_time_tag ON tags(time_ms, tag_name)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tag_name ON tags(tag_name)")
+            conn.commit()
+
+    def add_tag(self, time_ms, tag_name, tag_type):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tags (time_ms, tag_name, tag_type) VALUES (?, ?, ?)",
+                (time_ms, tag_name, tag_type),
+            )
+            conn.commit()
+
+    def remove_tag(self, time_ms, tag_name, tag_type):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "DELETE FROM tags WHERE time_ms = ? AND tag_name = ? AND tag_type = ?",
+                (time_ms, tag_name, tag_type),
+            )
+            conn.commit()
+
+    def close(self):
+        pass
+
+
+def measure(db, count):
+    add_times = []
+    remove_times = []
+    for i in range(count):
+        start = time.perf_counter()
+        db.add_tag(i * 40, "JUM H", "MANUAL")
+        add_times.append(time.perf_counter() - start)
+    for i in range(count):
+        start = time.perf_counter()
+        db.remove_tag(i * 40, "JUM H", "MANUAL")
+        remove_times.append(time.perf_counter() - start)
+    db.close()
+    return add_times, remove_times
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p50 = statistics.median(samples) * 1e6
+    p99 = samples[int(len(samples) * 0.99) - 1] * 1e6
+    print(f"{name:<32} p50 {p50:9.1f} us   p99 {p99:9.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--dir", default=None, help="directory for the benchmark databases")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp_dir:
+        cases = [
+            ("legacy (connect per call)", LegacyTagDatabase(os.path.join(tmp_dir, "legacy.db"))),
+            ("persistent WAL / NORMAL", TagDatabase(os.path.join(tmp_dir, "wal.db"))),
+            (
+                "persistent WAL / FULL",
+                TagDatabase(os.path.join(tmp_dir, "wal_full.db"), synchronous="FULL"),
+            ),
+        ]
+        for name, db in cases:
+            add_times, remove_times = measure(db, args.count)
+            report(f"{name} add", add_times)
+            report(f"{name} remove", remove_times)
+
+
+if __name__ == "__main__":
+    main()
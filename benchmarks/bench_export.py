@@ -0,0 +1,90 @@
+"""Export throughput and peak memory: previous pandas path vs the streaming exporter.
+
+Each case runs in a fresh process so that its peak RSS (``ru_maxrss``) is not polluted by the
+other cases.
+
+Usage:
+    python -m benchmarks.bench_export [--count 1000000]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from src.video_tagger.database import TagDatabase
+from src.video_tagger.tag_export import EXPORT_FORMATS, export_filename, export_tags
+
+TAG_NAMES = ["JUM H", "JUM M", "JUM L", "DIV L", "DIV R", "DIV F", "DIV B"]
+VIDEO_START_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 는 KiB, macOS 는 byte 단위
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def legacy_pandas_csv(db, filename):
+    import pandas as pd
+
+    tags = db.load_tags()
+    df = pd.DataFrame(tags, columns=["time_ms", "tag_name", "tag_type"])
+    df.time_ms = pd.to_timedelta(df.time_ms, unit="ms")
+    df["datetime"] = VIDEO_START_TIME + df.time_ms
+    df = df[["datetime", "time_ms", "tag_name", "tag_type"]]
+    df.to_csv(filename, index=False)
+    return len(df)
+
+
+def run_case(db_path, case, result_queue):
+    # 공통 모듈 import 후의 기준 메모리
+    if case == "pandas csv (previous)":
+        import pandas  # noqa: F401
+    elif case in ("parquet", "arrow"):
+        import pyarrow  # noqa: F401
+    db = TagDatabase(db_path)
+    baseline = peak_rss_mib()
+    start = time.perf_counter()
+    if case == "pandas csv (previous)":
+        count = legacy_pandas_csv(db, db_path + ".legacy.csv")
+    else:
+        count = export_tags(db, export_filename(db_path, case), case, VIDEO_START_TIME)
+    elapsed = time.perf_counter() - start
+    db.close()
+    result_queue.put((count, elapsed, peak_rss_mib() - baseline))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000000)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "tags.db")
+        with TagDatabase(db_path) as db:
+            db.apply_batch(
+                ("add", i * 13, TAG_NAMES[i % len(TAG_NAMES)], "MANUAL") for i in range(args.count)
+            )
+
+        for case in ["pandas csv (previous)"] + list(EXPORT_FORMATS):
+            result_queue = context.Queue()
+            process = context.Process(target=run_case, args=(db_path, case, result_queue))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                print(f"{case:<22} failed")
+                continue
+            count, elapsed, peak = result_queue.get()
+            print(
+                f"{case:<22} {count / elapsed / 1e3:9.1f} k rows/s   " f"peak RSS +{peak:7.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
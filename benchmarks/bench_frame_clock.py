@@ -0,0 +1,99 @@
+"""Benchmark for updating the playhead-synced views from one frame clock.
+
+Simulates a player that reports its position every ``--notify-ms`` while playing for
+``--seconds`` and then stays paused for as long. Counts how often the synced views (sliders,
+time label, overlay, 3D view, tag lists) are updated and how many timer wakeups happen while
+paused, with one ``positionChanged`` connection per view plus the 3D view's own 10 ms timer (as
+before) and with ``FrameClock``.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_frame_clock \
+        [--notify-ms 5] [--seconds 2] [--views 5]
+"""
+
+import argparse
+
+from PyQt5.QtCore import QEventLoop, QObject, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+from src.video_tagger.frame_clock import FrameClock
+
+
+class NotifyingPlayer(QObject):
+    positionChanged = pyqtSignal(int)
+
+    def __init__(self, notify_ms):
+        super().__init__()
+        self.current = 0
+        self.timer = QTimer(self)
+        self.timer.setInterval(notify_ms)
+        self.timer.timeout.connect(self._advance)
+
+    def position(self):
+        return self.current
+
+    def _advance(self):
+        self.current += self.timer.interval()
+        self.positionChanged.emit(self.current)
+
+
+def run_events(seconds):
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec_()
+
+
+def measure(args, use_clock):
+    """View updates while playing, and view updates plus timer wakeups while paused."""
+    player = NotifyingPlayer(args.notify_ms)
+    calls = [0]
+
+    def view(position):
+        calls[0] += 1
+
+    wakeups = [0]
+    if use_clock:
+        clock = FrameClock(player)
+        for _ in range(args.views):
+            clock.add_view(view)
+    else:
+        for _ in range(args.views):
+            player.positionChanged.connect(view)
+        # 이전의 Cell3dCuboid 처럼 재생 여부와 관계없이 10 ms 마다 도는 타이머
+        scene_timer = QTimer()
+        scene_timer.timeout.connect(lambda: wakeups.__setitem__(0, wakeups[0] + 1))
+        scene_timer.start(10)
+
+    player.timer.start()
+    run_events(args.seconds)
+    player.timer.stop()
+    run_events(0.1)  # 마지막 위치 갱신까지 기다림
+    playing_calls = calls[0]
+
+    calls[0] = 0
+    wakeups[0] = 0
+    run_events(args.seconds)
+    return playing_calls, calls[0] + wakeups[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notify-ms", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--views", type=int, default=5)
+    args = parser.parse_args()
+
+    app = QApplication([])  # noqa: F841
+    direct = measure(args, use_clock=False)
+    clocked = measure(args, use_clock=True)
+
+    print(f"{args.views} views, position every {args.notify_ms} ms, {args.seconds:.0f} s each")
+    for label, (playing, paused) in (("per-view connections", direct), ("FrameClock", clocked)):
+        print(
+            f"{label:<21} playing {playing / args.seconds:6.0f} view updates/s"
+            f"   paused {paused / args.seconds:5.0f} wakeups/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Benchmark for reverse play and frame stepping with the frame cache playback engine.
+
+Uses a synthetic decoder that, like a real codec, has to start at the previous keyframe and
+spends ``--decode-ms`` per decoded frame. Compares stepping backwards one frame at a time by
+seeking (what a seek-per-frame player does) with ``FramePlayer`` reverse play and frame
+stepping, which are served from its cache.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_frame_player \
+        [--fps 30] [--gop 60] [--decode-ms 2] [--seconds 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+from PyQt5.QtCore import QElapsedTimer, QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from src.video_tagger.frame_player import FramePlayer
+
+
+class SyntheticDecoder:
+    """Decoder with keyframes every ``gop`` frames and a fixed decode cost per frame."""
+
+    def __init__(self, fps, frame_count, gop, decode_s, width=640, height=360):
+        self.fps = fps
+        self.frame_count = frame_count
+        self.gop = gop
+        self.decode_s = decode_s
+        self.width = width
+        self.height = height
+        self.decoded = 0
+
+    def iter_frames(self, start_index):
+        for index in range(start_index // self.gop * self.gop, self.frame_count):
+            time.sleep(self.decode_s)
+            self.decoded += 1
+            if index >= start_index:
+                frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+                frame[...] = index % 256
+                yield index, frame
+
+    def keyframe(self, index):
+        return next(self.iter_frames(index // self.gop * self.gop), None)
+
+    def close(self):
+        pass
+
+
+def run_events(seconds):
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec_()
+
+
+def measure_seek_reverse(decoder, start_index, frames):
+    """Frames per second when every backward step seeks and decodes from the keyframe."""
+    start = time.perf_counter()
+    for index in range(start_index, start_index - frames, -1):
+        next(decoder.iter_frames(index))
+    return frames / (time.perf_counter() - start)
+
+
+def measure_reverse_play(player, decoder, start_ms, seconds):
+    """Frames shown per second and the longest gap between frames while playing backwards."""
+    player.set_decoder(decoder)
+    player.setPosition(start_ms)
+    run_events(1.0)  # 재생 전에 주변 프레임을 미리 디코딩
+
+    shown = []
+    clock = QElapsedTimer()
+    player.frameReady.connect(lambda image: shown.append(clock.elapsed()))
+    player.setPlaybackRate(-1.0)
+    clock.start()
+    player.play()
+    run_events(seconds)
+    player.pause()
+    gaps = np.diff(shown) if len(shown) > 1 else np.array([0])
+    return len(shown) / seconds, gaps.max()
+
+
+def measure_steps(player, steps):
+    """Mean and max time until the frame is shown for ``steps`` single frame steps back."""
+    times = []
+    for _ in range(steps):
+        shown = []
+        connection = player.frameReady.connect(lambda image: shown.append(True))
+        start = time.perf_counter()
+        player.step_frame(-1)
+        while not shown:
+            QApplication.processEvents(QEventLoop.AllEvents, 5)
+        times.append(time.perf_counter() - start)
+        player.frameReady.disconnect(connection)
+    return sum(times) / len(times), max(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--gop", type=int, default=60)
+    parser.add_argument("--decode-ms", type=float, default=2.0)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    app = QApplication([])  # noqa: F841
+    frame_count = int(args.fps * 600)
+    start_index = frame_count // 2
+    start_ms = int(start_index * 1000 / args.fps)
+
+    def make_decoder():
+        return SyntheticDecoder(args.fps, frame_count, args.gop, args.decode_ms / 1000)
+
+    seek_fps = measure_seek_reverse(make_decoder(), start_index, int(args.fps))
+
+    player = FramePlayer(max_memory_mb=256, prefetch_ms=2000)
+    decoder = make_decoder()
+    reverse_fps, max_gap = measure_reverse_play(player, decoder, start_ms, args.seconds)
+    step_mean, step_max = measure_steps(player, 30)
+    decoded = decoder.decoded
+    player.close()
+
+    print(f"{args.fps:.0f} fps video, keyframe every {args.gop} frames, {args.decode_ms} ms/frame")
+    print(f"seek per frame backwards    {seek_fps:6.1f} fps")
+    print(f"frame cache reverse play    {reverse_fps:6.1f} fps (longest gap {max_gap} ms)")
+    print(f"frame cache step back       mean {step_mean * 1e3:.2f} ms, max {step_max * 1e3:.2f} ms")
+    print(f"frames decoded by the cache engine: {decoded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark for bulk tag import.
+
+Writes a tag file with ``--count`` rows, imports it into an empty database with
+``TagDatabase.import_tags`` (one transaction, ``executemany``) and compares the rate with
+``add_tag`` per row, which commits once per tag. Also checks that a CSV in the layout saved by
+earlier versions of the app (``time_ms`` as pandas timedelta text) imports the same tags, and
+exits non-zero otherwise.
+
+Usage:
+    python -m benchmarks.bench_import [--count 1000000] [--format csv] [--dir /path/to/data]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from src.video_tagger.database import TagDatabase
+from src.video_tagger.tag_export import EXPORT_FORMATS, export_tags
+from src.video_tagger.tag_import import iter_import
+
+TAG_NAMES = ["JUM H", "JUM M", "JUM L", "DIV L", "DIV R", "DIV F", "DIV B"]
+
+
+def write_source(tmp_dir, count, export_format):
+    with TagDatabase(os.path.join(tmp_dir, "source.db")) as db:
+        db.import_tags(
+            [
+                [(i * 40, TAG_NAMES[i % len(TAG_NAMES)], "MANUAL") for i in range(start, end)]
+                for start, end in (
+                    (start, min(start + 100000, count)) for start in range(0, count, 100000)
+                )
+            ]
+        )
+        filename = os.path.join(tmp_dir, "source" + EXPORT_FORMATS[export_format])
+        export_tags(db, filename, export_format)
+    return filename
+
+
+def check_legacy_csv(tmp_dir, count=1000):
+    """Import a CSV written like the app's original ``save_tags_to_csv`` and compare the rows."""
+    rows = [(i * 40 + i % 3, TAG_NAMES[i % len(TAG_NAMES)], "MANUAL") for i in range(count)]
+    df = pd.DataFrame(rows, columns=["time_ms", "tag_name", "tag_type"])
+    df.time_ms = pd.to_timedelta(df.time_ms, unit="ms")
+    df["datetime"] = datetime(2024, 5, 1, 10) + df.time_ms
+    df = df[["datetime", "time_ms", "tag_name", "tag_type"]]
+    filename = os.path.join(tmp_dir, "legacy.csv")
+    df.to_csv(filename, index=False)
+
+    imported = [row for chunk in iter_import(filename) for row in chunk]
+    return imported == rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000000)
+    parser.add_argument("--per-row-count", type=int, default=2000)
+    parser.add_argument("--format", default="csv", choices=list(EXPORT_FORMATS))
+    parser.add_argument("--dir", default=None, help="directory for the benchmark databases")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp_dir:
+        if not check_legacy_csv(tmp_dir):
+            print("Legacy CSV (timedelta time_ms) did not import the same tags")
+            sys.exit(1)
+        print("legacy CSV (timedelta time_ms) imports the same tags")
+
+        filename = write_source(tmp_dir, args.count, args.format)
+
+        with TagDatabase(os.path.join(tmp_dir, "per_row.db")) as db:
+            rows = [row for chunk in iter_import(filename) for row in chunk][: args.per_row_count]
+            start = time.perf_counter()
+            for row in rows:
+                db.add_tag(*row)
+            elapsed = time.perf_counter() - start
+        print(f"{'add_tag per row':<24} {len(rows) / elapsed:12,.0f} tags/s")
+
+        for on_conflict in ("skip", "replace"):
+            with TagDatabase(os.path.join(tmp_dir, f"bulk_{on_conflict}.db")) as db:
+                start = time.perf_counter()
+                result = db.import_tags(iter_import(filename), on_conflict)
+                elapsed = time.perf_counter() - start
+            print(
+                f"{'import_tags ' + on_conflict:<24} {result.read / elapsed:12,.0f} tags/s"
+                f"   {elapsed:6.2f} s   added {result.added:,} removed {result.removed:,}"
+            )
+
+
+if __name__ == "__main__":
+    main()
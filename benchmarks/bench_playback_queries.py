@@ -0,0 +1,114 @@
+"""Check that steady-state playback runs no SQL and time the per-tick view updates.
+
+Builds a real ``VideoPlayer`` over a database of ``--count`` manual tags, cell action tags and
+fusion data, then simulates playback ticks every 20 ms of video time by running every view
+registered on the player's ``FrameClock`` (sliders, time label, overlay label, 3D view): the
+code that runs on each ``positionChanged``. Exits non-zero if any SQL statement is executed on
+the tag database connection during playback.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_playback_queries \
+        [--count 50000] [--ticks 5000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from PyQt5.QtWidgets import QApplication
+
+from src.video_tagger.cell_actions import cell_action_tags
+from src.video_tagger.config import DataConfig
+from src.video_tagger.database import TagDatabase
+from src.video_tagger.tag_manager import TagManager
+from src.video_tagger.utils import load_settings, to_epoch_ms
+from src.video_tagger.video_player import VideoPlayer
+
+TAG_NAMES = ["JUM H", "JUM M", "JUM L", "DIV L", "DIV R", "DIV F", "DIV B"]
+START_TIME = "2024-05-01 10:00:00.000"
+
+
+def write_fusion_data(filename, duration_ms):
+    datetimes = pd.Timestamp(START_TIME) + pd.to_timedelta(np.arange(0, duration_ms, 10), "ms")
+    angles = np.zeros(len(datetimes))
+    pd.DataFrame(
+        {"datetime": datetimes, "euler_x": angles, "euler_y": angles, "euler_z": angles}
+    ).to_csv(filename, index=False)
+
+
+def make_cell_action(count, duration_ms):
+    initial_time = pd.Timestamp(START_TIME) + pd.to_timedelta(
+        np.linspace(0, duration_ms, count, endpoint=False).astype(np.int64), "ms"
+    )
+    return pd.DataFrame(
+        {
+            "initial_time": initial_time,
+            "final_time": initial_time + pd.Timedelta(milliseconds=500),
+            "type": np.where(np.arange(count) % 2 == 0, "JUM", "DIV"),
+            "direction": "L",
+            "value": 0.5,
+            "level": "H",
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=50000)
+    parser.add_argument("--ticks", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = QApplication([])  # noqa: F841
+    duration_ms = args.count * 97
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "tags.db")
+        with TagDatabase(db_path) as db:
+            db.apply_batch(
+                ("add", i * 97, TAG_NAMES[i % len(TAG_NAMES)], "MANUAL") for i in range(args.count)
+            )
+        fusion_path = os.path.join(tmp_dir, "fusion.csv")
+        write_fusion_data(fusion_path, duration_ms)
+
+        tag_manager = TagManager()
+        tag_manager.load_db(db_path, writer_options={"enabled": False})
+        tag_manager.load_tags_from_db()
+
+        data_config = DataConfig(START_TIME, "", db_path, "", fusion_path)
+        config = load_settings()
+        config["playback"] = dict(config.get("playback") or {}, engine="qt")
+        video_player = VideoPlayer(config, data_config, tag_manager)
+        video_player.update_duration(duration_ms)
+        video_player.position_slider.setTags(tag_manager.tags)
+        video_player.set_cell_action_tags(
+            cell_action_tags(make_cell_action(args.count // 10, duration_ms))
+        )
+        video_player.set_cell_action_offset(to_epoch_ms(pd.Timestamp(START_TIME)))
+
+        statements_before = tag_manager.db.statement_count
+        start = time.perf_counter()
+        for tick in range(args.ticks):
+            position = tick * 20
+            # FrameClock.update_views 와 같이 재생 위치를 따르는 모든 화면을 갱신
+            for view in video_player.frame_clock.views:
+                view(position)
+        elapsed = time.perf_counter() - start
+        statements = tag_manager.db.statement_count - statements_before
+        video_player.close_player()
+        tag_manager.close()
+
+    views = len(video_player.frame_clock.views)
+    print(
+        f"{args.ticks} ticks over {args.count} tags, {views} views: "
+        f"{elapsed / args.ticks * 1e6:.1f} us/tick"
+    )
+    print(f"SQL statements during playback: {statements}")
+    if statements != 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Range query benchmark and query-plan check for TagDatabase.
+
+Fills a database with synthetic tags, verifies that the range queries are answered by an index
+search on ``time_ms`` of ``tag_events`` (exits non-zero otherwise) and times a playhead-sized
+window query against a full ``load_tags`` scan.
+
+Usage:
+    python -m benchmarks.bench_range_query [--count 200000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from src.video_tagger.database import TagDatabase
+
+TAG_NAMES = ["JUM H", "JUM M", "JUM L", "DIV L", "DIV R", "DIV F", "DIV B"]
+
+
+def fill(db, count):
+    rows = [(i * 27, TAG_NAMES[i % len(TAG_NAMES)], "MANUAL") for i in range(count)]
+    db.cursor.executemany("INSERT INTO tags (time_ms, tag_name, tag_type) VALUES (?, ?, ?)", rows)
+    db.conn.commit()
+    db.cursor.execute("ANALYZE")
+
+
+def check_plans(db):
+    queries = {
+        "tags_in_range": db._tags_in_range_query(1000, 2000),
+        "tags_in_range (filtered)": db._tags_in_range_query(1000, 2000, ["JUM H"], ["MANUAL"]),
+        "count_tags_in_range": db._count_tags_in_range_query(0, 60000, 1000),
+    }
+    ok = True
+    for name, (sql, params) in queries.items():
+        plan = db.explain_query_plan(sql, params)
+        uses_index = any(
+            line.startswith("SEARCH tag_events ") and "time_ms>?" in line and "time_ms<?" in line
+            for line in plan
+        )
+        ok = ok and uses_index
+        print(f"{name:<28} {'OK ' if uses_index else 'BAD'} {' | '.join(plan)}")
+    return ok
+
+
+def timeit(func, repeat=200):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with TagDatabase(os.path.join(tmp_dir, "tags.db")) as db:
+            fill(db, args.count)
+            if not check_plans(db):
+                print("Range queries do not search tag_events by time_ms")
+                sys.exit(1)
+
+            mid = args.count * 27 // 2
+            print(f"load_tags            {timeit(db.load_tags, 5):9.3f} ms")
+            print(
+                f"tags_in_range (1 s)  {timeit(lambda: db.tags_in_range(mid, mid + 1000)):9.3f} ms"
+            )
+            print(
+                "count_tags_in_range  "
+                f"{timeit(lambda: db.count_tags_in_range(0, mid, 60000), 5):9.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
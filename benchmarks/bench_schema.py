@@ -0,0 +1,111 @@
+"""Size and query benchmark for the dictionary-encoded tag schema.
+
+Builds a database with the original text schema (version 1), measures its file size and query
+times, lets TagDatabase migrate it to the current schema and measures again.
+
+Usage:
+    python -m benchmarks.bench_schema [--count 300000]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from src.video_tagger.database import TagDatabase
+from src.video_tagger.migrations import MIGRATIONS
+
+TAG_NAMES = ["JUM H", "JUM M", "JUM L", "DIV L", "DIV R", "DIV F", "DIV B"]
+TAG_TYPES = ["MANUAL", "CELL_ACTION"]
+
+LEGACY_QUERIES = {
+    "window (1 s)": (
+        "SELECT time_ms, tag_name, tag_type FROM tags WHERE time_ms >= ? AND time_ms < ?",
+        "window",
+    ),
+    "by name": (
+        "SELECT time_ms, tag_name, tag_type FROM tags WHERE tag_name = ? ORDER BY time_ms",
+        "name",
+    ),
+    "count per minute": (
+        "SELECT (time_ms / 60000) * 60000 AS bucket_ms, tag_name, COUNT(*) FROM tags "
+        "WHERE time_ms >= ? AND time_ms < ? GROUP BY bucket_ms, tag_name",
+        "all",
+    ),
+}
+
+
+def build_legacy_db(path, count):
+    conn = sqlite3.connect(path)
+    MIGRATIONS[0][1](conn.cursor())
+    rows = [
+        (i * 13, TAG_NAMES[i % len(TAG_NAMES)], TAG_TYPES[(i // 7) % len(TAG_TYPES)])
+        for i in range(count)
+    ]
+    conn.executemany("INSERT INTO tags (time_ms, tag_name, tag_type) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def file_size(path):
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def time_legacy(conn, count, repeat=20):
+    mid = count * 13 // 2
+    results = {}
+    for name, (sql, kind) in LEGACY_QUERIES.items():
+        params = {"window": (mid, mid + 1000), "name": ("DIV L",), "all": (0, count * 13)}[kind]
+        start = time.perf_counter()
+        for _ in range(repeat):
+            conn.execute(sql, params).fetchall()
+        results[name] = (time.perf_counter() - start) / repeat * 1e3
+    return results
+
+
+def time_current(db, count, repeat=20):
+    mid = count * 13 // 2
+    calls = {
+        "window (1 s)": lambda: db.tags_in_range(mid, mid + 1000),
+        "by name": lambda: db.tags_in_range(0, count * 13, tag_names=["DIV L"]),
+        "count per minute": lambda: db.count_tags_in_range(0, count * 13, 60000),
+    }
+    results = {}
+    for name, call in calls.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            call()
+        results[name] = (time.perf_counter() - start) / repeat * 1e3
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=300000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "tags.db")
+        build_legacy_db(path, args.count)
+        legacy_size = file_size(path)
+        conn = sqlite3.connect(path)
+        legacy_times = time_legacy(conn, args.count)
+        conn.close()
+
+        start = time.perf_counter()
+        with TagDatabase(path) as db:
+            migrate_time = time.perf_counter() - start
+            current_times = time_current(db, args.count)
+            db.cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        current_size = file_size(path)
+
+    print(f"{args.count} tags, migration took {migrate_time:.2f} s")
+    print(f"{'file size':<16} {legacy_size / 2**20:9.2f} MiB -> {current_size / 2**20:9.2f} MiB")
+    for name in LEGACY_QUERIES:
+        print(f"{name:<16} {legacy_times[name]:9.3f} ms -> {current_times[name]:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
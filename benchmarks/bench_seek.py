@@ -0,0 +1,95 @@
+"""Benchmark for seek coalescing while dragging the timeline slider.
+
+Simulates a player whose seeks take ``--seek-ms`` each and run one after another (like a
+decoder that seeks from the previous keyframe), and drags the slider with one ``sliderMoved``
+every ``--move-ms`` for ``--moves`` events. Compares calling ``setPosition`` for every event
+with ``SeekScheduler``: how many seeks run and how long after the drag ends the video shows
+the final position.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_seek \
+        [--seek-ms 40] [--move-ms 8] [--moves 200]
+"""
+
+import argparse
+import time
+from collections import deque
+
+from PyQt5.QtCore import QEventLoop, QObject, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+from src.video_tagger.seek_scheduler import SeekScheduler
+
+
+class SlowSeekPlayer(QObject):
+    """Runs queued seeks one at a time; each reports its position when done."""
+
+    positionChanged = pyqtSignal(int)
+
+    def __init__(self, seek_ms):
+        super().__init__()
+        self.seek_ms = seek_ms
+        self.queue = deque()
+        self.current = 0
+        self.seeks = 0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._finish)
+
+    def position(self):
+        return self.current
+
+    def setPosition(self, position):
+        self.queue.append(position)
+        if not self.timer.isActive():
+            self.timer.start(self.seek_ms)
+
+    def _finish(self):
+        self.current = self.queue.popleft()
+        self.seeks += 1
+        self.positionChanged.emit(self.current)
+        if self.queue:
+            self.timer.start(self.seek_ms)
+
+
+def wait(ms):
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec_()
+
+
+def drag(seek, player, moves, move_ms):
+    """Seeks run and ms from the last drag event until the player shows the final position."""
+    for i in range(moves):
+        seek(i * 100)
+        wait(move_ms)
+    target = (moves - 1) * 100
+    end = time.perf_counter()
+    while player.position() != target:
+        QApplication.processEvents(QEventLoop.AllEvents, 5)
+    return player.seeks, (time.perf_counter() - end) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seek-ms", type=int, default=40)
+    parser.add_argument("--move-ms", type=int, default=8)
+    parser.add_argument("--moves", type=int, default=200)
+    args = parser.parse_args()
+
+    app = QApplication([])  # noqa: F841
+
+    player = SlowSeekPlayer(args.seek_ms)
+    direct = drag(player.setPosition, player, args.moves, args.move_ms)
+
+    player = SlowSeekPlayer(args.seek_ms)
+    scheduler = SeekScheduler(player, interval_ms=args.seek_ms * 5)
+    coalesced = drag(scheduler.seek, player, args.moves, args.move_ms)
+
+    print(f"{args.moves} drag events every {args.move_ms} ms, {args.seek_ms} ms per seek")
+    for label, (seeks, lag) in (("setPosition per event", direct), ("SeekScheduler", coalesced)):
+        print(f"{label:<22} {seeks:4d} seeks, lag after release {lag:7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Benchmark for TagSlider painting during playback.
+
+Paints a slider with ``--count`` tags once per simulated ``positionChanged`` (the handle moves,
+the tags do not) with the previous per-tag ``paintEvent`` and with the cached marker layer,
+and checks that both draw the same pixels when there are fewer tags than pixel columns. Also
+times rebuilding the layer for ``--dense-count`` tags, which renders as a density strip, and
+wheel zooming from the whole video down to a 0.5 s window and back, and adding one tag to
+``--count`` tags by regrouping them all (``setTags``) and by ``insert_rows``.
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_tag_slider \
+        [--count 20000] [--paints 50] [--dense-count 1000000]
+"""
+
+import argparse
+import time
+
+from PyQt5.QtCore import QPoint, QPointF, Qt
+from PyQt5.QtGui import QColor, QImage, QPainter, QPen, QWheelEvent
+from PyQt5.QtWidgets import QApplication, QStyleOptionSlider
+
+from src.video_tagger.tag_slider import TagSlider
+
+CONFIG = {
+    "tags": [
+        {"name": "JUM H", "color": "#FF0000"},
+        {"name": "JUM M", "color": "#0000FF"},
+        {"name": "DIV L", "color": "#00FF00"},
+    ]
+}
+
+
+class LegacyTagSlider(TagSlider):
+    """``paintEvent`` as it was before the cached marker layer."""
+
+    def paintEvent(self, event):
+        super(TagSlider, self).paintEvent(event)
+
+        painter = QPainter(self)
+        pen = QPen(self.marker_color)
+        pen.setWidth(self.marker_width)
+        painter.setPen(pen)
+
+        opt = QStyleOptionSlider()
+        self.initStyleOption(opt)
+        groove_rect = self.style().subControlRect(
+            self.style().CC_Slider, opt, self.style().SC_SliderGroove, self
+        )
+
+        slider_min = self.minimum()
+        slider_max = self.maximum()
+        slider_range = slider_max - slider_min
+
+        y_center = groove_rect.center().y()
+
+        for tag in self.tags:
+            time_ms = tag.get(self.time_key, 0) - self.time_offset_ms
+            tag_name = tag.get("tag_name", "")
+            if tag_name == "":
+                action_type = tag.get("action_type", "")
+                direction = tag.get("direction", "")
+                if not direction:
+                    direction = ""
+
+                tag_name = f"{action_type} {direction}".strip()
+
+            if slider_range == 0:
+                continue
+            fraction = (time_ms - slider_min) / slider_range
+
+            x = groove_rect.left() + fraction * groove_rect.width()
+
+            top_y = y_center - (self.marker_height / 2)
+            bottom_y = y_center + (self.marker_height / 2)
+
+            tag_color = self.tag_color.get(tag_name, "red")
+            pen.setColor(QColor(tag_color))
+            painter.setPen(pen)
+            painter.drawLine(int(x), int(top_y), int(x), int(bottom_y))
+
+        painter.end()
+
+
+def make_slider(slider_class, tags, duration_ms):
+    slider = slider_class(CONFIG, Qt.Horizontal)
+    slider.resize(1200, 80)
+    slider.setRange(0, duration_ms)
+    slider.setTags(tags)
+    return slider
+
+
+def measure(slider, paints, duration_ms):
+    image = QImage(slider.size(), QImage.Format_ARGB32_Premultiplied)
+    # 첫 그리기 (캐시 생성 포함)
+    start = time.perf_counter()
+    slider.render(image)
+    first_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(paints):
+        slider.setValue(i * duration_ms // paints)
+        slider.render(image)
+    return first_time, (time.perf_counter() - start) / paints
+
+
+def grab(slider):
+    return slider.grab().toImage().convertToFormat(QImage.Format_RGB32)
+
+
+def make_tags(count, spacing_ms=400):
+    names = [tag["name"] for tag in CONFIG["tags"]]
+    return [
+        {
+            "time_ms": i * spacing_ms + (i * 7919) % spacing_ms,
+            "tag_name": names[i % len(names)],
+            "tag_type": "MANUAL",
+        }
+        for i in range(count)
+    ]
+
+
+def measure_rebuild(count):
+    """Time a layer rebuild (e.g. after a start time change) for ``count`` tags."""
+    tags = make_tags(count)
+    slider = make_slider(TagSlider, tags, count * 400)
+    image = QImage(slider.size(), QImage.Format_ARGB32_Premultiplied)
+    slider.render(image)
+    start = time.perf_counter()
+    slider.setTimeOffset(400)
+    slider.render(image)
+    elapsed = time.perf_counter() - start
+    opt = QStyleOptionSlider()
+    slider.initStyleOption(opt)
+    groove_rect = slider.style().subControlRect(
+        slider.style().CC_Slider, opt, slider.style().SC_SliderGroove, slider
+    )
+    max_per_column = slider.column_counts(groove_rect).sum(axis=0).max()
+    return elapsed, max_per_column > slider.lod_threshold
+
+
+def measure_zoom(count, steps=40):
+    """Per-step time of wheel zooming in ``steps`` notches and back out, repainting each time."""
+    tags = make_tags(count)
+    slider = make_slider(TagSlider, tags, count * 400)
+    slider.setDuration(count * 400)
+    image = QImage(slider.size(), QImage.Format_ARGB32_Premultiplied)
+    slider.render(image)
+    center = QPointF(slider.width() / 2, slider.height() / 2)
+    times = []
+    for delta in [120] * steps + [-120] * steps:
+        event = QWheelEvent(
+            center,
+            center,
+            QPoint(),
+            QPoint(0, delta),
+            Qt.NoButton,
+            Qt.NoModifier,
+            Qt.NoScrollPhase,
+            False,
+        )
+        start = time.perf_counter()
+        slider.wheelEvent(event)
+        slider.render(image)
+        times.append(time.perf_counter() - start)
+    return sum(times) / len(times), max(times)
+
+
+def measure_add_tag(count, repeats=20):
+    """Mean time to add one tag with ``setTags`` (regroups all tags) and ``insert_rows``."""
+    tags = make_tags(count)
+    slider = make_slider(TagSlider, tags, count * 400)
+    new_tag = dict(tags[count // 2], time_ms=tags[count // 2]["time_ms"] + 1)
+    results = []
+    for incremental in (False, True):
+        elapsed = 0.0
+        for _ in range(repeats):
+            tags.insert(count // 2 + 1, new_tag)
+            start = time.perf_counter()
+            if incremental:
+                slider.insert_rows(count // 2 + 1, 1)
+            else:
+                slider.setTags(tags)
+            elapsed += time.perf_counter() - start
+            del tags[count // 2 + 1]
+            if incremental:
+                slider.remove_rows(count // 2 + 1, 1)
+            else:
+                slider.setTags(tags)
+        results.append(elapsed / repeats)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--paints", type=int, default=50)
+    parser.add_argument("--dense-count", type=int, default=1000000)
+    args = parser.parse_args()
+
+    app = QApplication([])  # noqa: F841
+    duration_ms = args.count * 400
+    tags = make_tags(args.count)
+
+    results = {}
+    for slider_class in (LegacyTagSlider, TagSlider):
+        slider = make_slider(slider_class, tags, duration_ms)
+        results[slider_class] = measure(slider, args.paints, duration_ms)
+
+    # 픽셀 열보다 태그가 적으면 정확한 마커로 그려 이전과 같은 그림이어야 함
+    sparse = [dict(tag, tag_name="JUM H") for tag in make_tags(500, spacing_ms=5000)]
+    legacy = make_slider(LegacyTagSlider, sparse, 500 * 5000)
+    cached = make_slider(TagSlider, sparse, 500 * 5000)
+    same_pixels = grab(legacy) == grab(cached)
+
+    rebuild_time, density = measure_rebuild(args.dense_count)
+    zoom_mean, zoom_max = measure_zoom(args.dense_count)
+    regroup_time, insert_time = measure_add_tag(args.count)
+
+    legacy_first, legacy_paint = results[LegacyTagSlider]
+    cached_first, cached_paint = results[TagSlider]
+    print(f"{args.count} tags, {args.paints} handle moves")
+    for label, first, paint in (
+        ("per-tag paintEvent", legacy_first, legacy_paint),
+        ("cached marker layer", cached_first, cached_paint),
+    ):
+        print(f"{label:<22} first {first * 1e3:7.1f} ms   move {paint * 1e3:7.2f} ms")
+    print(f"handle move speedup: {legacy_paint / cached_paint:.0f}x")
+    mode = "density strip" if density else "exact markers"
+    print(f"{args.dense_count} tags: layer rebuild {rebuild_time * 1e3:.1f} ms ({mode})")
+    print(
+        f"{args.dense_count} tags: wheel zoom step mean {zoom_mean * 1e3:.1f} ms,"
+        f" max {zoom_max * 1e3:.1f} ms"
+    )
+    print(
+        f"add one tag: setTags {regroup_time * 1e3:.2f} ms, insert_rows {insert_time * 1e3:.3f} ms"
+    )
+    print(f"same pixels (sparse tags): {same_pixels}")
+    if not same_pixels:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 # my_video_tagger/main.py
+import multiprocessing
 import sys
 
 from PyQt5.QtGui import QFont, QSurfaceFormat
@@ -32,4 +33,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 썸네일 작업 프로세스 (spawn) 가 패키징된 앱에서도 동작하도록
+    multiprocessing.freeze_support()
     main()
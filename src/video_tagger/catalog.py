@@ -0,0 +1,413 @@
+"""Cross-session tag catalog.
+
+Every data directory keeps its tags in its own ``tags.db``. The catalog copies the tags of many
+sessions into one consolidated SQLite database so that questions such as "how many JUM H tags
+across all matches" are a single indexed query. ``update`` only re-reads sessions whose
+``tags.db`` (or its WAL file) changed since the last run.
+
+Usage:
+    python -m src.video_tagger.catalog update /data/matches
+    python -m src.video_tagger.catalog stats --by tag_name --tag-type MANUAL
+    python -m src.video_tagger.catalog query --tag-name "JUM H" --limit 20
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+from .config import load_data_config
+
+DATA_CONFIG_FILENAME = "data_config.yaml"
+DEFAULT_DB_FILENAME = "tags.db"
+DEFAULT_CATALOG_PATH = "tag_catalog.db"
+GROUP_COLUMNS = {
+    "session": "sessions.data_dir",
+    "tag_name": "catalog_tags.tag_name",
+    "tag_type": "catalog_tags.tag_type",
+}
+
+
+def find_sessions(roots):
+    """Yield ``(data_dir, db_path, video_start_time_utc)`` for every session under ``roots``.
+
+    A session is a directory that has a ``data_config.yaml`` or a ``tags.db``.
+    """
+    seen = set()
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            if DATA_CONFIG_FILENAME in filenames:
+                data_config = load_data_config(os.path.join(dirpath, DATA_CONFIG_FILENAME))
+                db_path = data_config.db_path or os.path.join(dirpath, DEFAULT_DB_FILENAME)
+                if not os.path.isabs(db_path):
+                    db_path = os.path.join(dirpath, db_path)
+                video_start_time_utc = data_config.video_start_time_utc
+            elif DEFAULT_DB_FILENAME in filenames:
+                db_path = os.path.join(dirpath, DEFAULT_DB_FILENAME)
+                video_start_time_utc = ""
+            else:
+                continue
+
+            data_dir = os.path.abspath(dirpath)
+            if data_dir in seen or not os.path.exists(db_path):
+                continue
+            seen.add(data_dir)
+            yield data_dir, os.path.abspath(db_path), video_start_time_utc
+
+
+def db_signature(db_path):
+    """Return ``(mtime_ns, size)`` of a database including its WAL file."""
+    mtime_ns = 0
+    size = 0
+    for path in (db_path, db_path + "-wal"):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            mtime_ns = max(mtime_ns, stat.st_mtime_ns)
+            size += stat.st_size
+    return mtime_ns, size
+
+
+class TagCatalog:
+    """Consolidated index of the tags of many sessions.
+
+    Args:
+        catalog_path (str): Path to the catalog SQLite database.
+    """
+
+    def __init__(self, catalog_path=DEFAULT_CATALOG_PATH):
+        self.catalog_path = catalog_path
+        catalog_dir = os.path.dirname(catalog_path)
+        if catalog_dir:
+            os.makedirs(catalog_dir, exist_ok=True)
+        self.conn = sqlite3.connect(catalog_path, uri=True)
+        self.cursor = self.conn.cursor()
+        self.cursor.execute("PRAGMA journal_mode = WAL")
+        self.cursor.execute("PRAGMA synchronous = NORMAL")
+        self._init_db()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _init_db(self):
+        self.cursor.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id INTEGER PRIMARY KEY,
+                data_dir TEXT UNIQUE NOT NULL,
+                db_path TEXT NOT NULL,
+                db_mtime_ns INTEGER NOT NULL,
+                db_size INTEGER NOT NULL,
+                video_start_time_utc TEXT,
+                tag_count INTEGER NOT NULL DEFAULT 0,
+                indexed_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS catalog_tags (
+                session_id INTEGER NOT NULL REFERENCES sessions(session_id) ON DELETE CASCADE,
+                time_ms INTEGER NOT NULL,
+                tag_name TEXT NOT NULL,
+                tag_type TEXT NOT NULL,
+                PRIMARY KEY (session_id, time_ms, tag_name, tag_type)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_catalog_name_type
+            ON catalog_tags(tag_name, tag_type, time_ms);
+            CREATE INDEX IF NOT EXISTS idx_catalog_type
+            ON catalog_tags(tag_type, tag_name);
+            """
+        )
+        self.conn.commit()
+
+    def close(self):
+        if self.conn is None:
+            return
+        self.cursor.close()
+        self.conn.close()
+        self.conn = None
+        self.cursor = None
+
+    def update(self, roots, prune=True):
+        """Index new and changed sessions under ``roots``.
+
+        Args:
+            roots (Iterable[str]): Directories to scan recursively.
+            prune (bool): Drop catalogued sessions under ``roots`` that no longer exist.
+
+        Returns:
+            dict: Number of ``indexed``, ``unchanged`` and ``removed`` sessions.
+        """
+        roots = [os.path.abspath(root) for root in roots]
+        stats = {"indexed": 0, "unchanged": 0, "removed": 0}
+        found = set()
+        for data_dir, db_path, video_start_time_utc in find_sessions(roots):
+            found.add(data_dir)
+            mtime_ns, size = db_signature(db_path)
+            self.cursor.execute(
+                "SELECT session_id, db_mtime_ns, db_size FROM sessions WHERE data_dir = ?",
+                (data_dir,),
+            )
+            row = self.cursor.fetchone()
+            if row is not None and row[1] == mtime_ns and row[2] == size:
+                stats["unchanged"] += 1
+                continue
+            try:
+                self._index_session(data_dir, db_path, video_start_time_utc, mtime_ns, size)
+            except sqlite3.Error as e:
+                print(f'Failed to index "{db_path}": {e}')
+                continue
+            stats["indexed"] += 1
+
+        if prune:
+            self.cursor.execute("SELECT session_id, data_dir FROM sessions")
+            for session_id, data_dir in self.cursor.fetchall():
+                in_roots = any(os.path.commonpath([root, data_dir]) == root for root in roots)
+                if in_roots and data_dir not in found:
+                    self._remove_session(session_id)
+                    stats["removed"] += 1
+            self.conn.commit()
+        return stats
+
+    def _index_session(self, data_dir, db_path, video_start_time_utc, mtime_ns, size):
+        cursor = self.cursor
+        indexed_at = datetime.now(timezone.utc).isoformat()
+        source_uri = "file:" + db_path.replace("?", "%3f").replace("#", "%23") + "?mode=ro"
+        cursor.execute("ATTACH DATABASE ? AS source", (source_uri,))
+        try:
+            cursor.execute("BEGIN")
+            cursor.execute(
+                """
+                INSERT INTO sessions (
+                    data_dir, db_path, db_mtime_ns, db_size, video_start_time_utc, indexed_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(data_dir) DO UPDATE SET
+                    db_path = excluded.db_path,
+                    db_mtime_ns = excluded.db_mtime_ns,
+                    db_size = excluded.db_size,
+                    video_start_time_utc = excluded.video_start_time_utc,
+                    indexed_at = excluded.indexed_at
+                """,
+                (data_dir, db_path, mtime_ns, size, video_start_time_utc, indexed_at),
+            )
+            cursor.execute("SELECT session_id FROM sessions WHERE data_dir = ?", (data_dir,))
+            session_id = cursor.fetchone()[0]
+            cursor.execute("DELETE FROM catalog_tags WHERE session_id = ?", (session_id,))
+            cursor.execute(
+                """
+                INSERT OR IGNORE INTO catalog_tags (session_id, time_ms, tag_name, tag_type)
+                SELECT ?, time_ms, tag_name, tag_type FROM source.tags
+                """,
+                (session_id,),
+            )
+            cursor.execute(
+                """
+                UPDATE sessions SET tag_count = (
+                    SELECT COUNT(*) FROM catalog_tags WHERE session_id = ?
+                ) WHERE session_id = ?
+                """,
+                (session_id, session_id),
+            )
+            cursor.execute("COMMIT")
+        except sqlite3.Error:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.execute("DETACH DATABASE source")
+
+        # 읽기만 해도 WAL 파일이 생기거나 정리될 수 있으므로 색인 후의 상태를 기록
+        mtime_ns, size = db_signature(db_path)
+        cursor.execute(
+            "UPDATE sessions SET db_mtime_ns = ?, db_size = ? WHERE data_dir = ?",
+            (mtime_ns, size, data_dir),
+        )
+        self.conn.commit()
+
+    def _remove_session(self, session_id):
+        self.cursor.execute("DELETE FROM catalog_tags WHERE session_id = ?", (session_id,))
+        self.cursor.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def sessions(self):
+        self.cursor.execute(
+            """
+            SELECT data_dir, db_path, video_start_time_utc, tag_count, indexed_at
+            FROM sessions ORDER BY data_dir
+            """
+        )
+        return self.cursor.fetchall()
+
+    @staticmethod
+    def _filter(tag_names=None, tag_types=None, data_dirs=None, start_ms=None, end_ms=None):
+        conditions = []
+        params = []
+        for column, values in (
+            ("catalog_tags.tag_name", tag_names),
+            ("catalog_tags.tag_type", tag_types),
+            ("sessions.data_dir", data_dirs),
+        ):
+            if values is not None:
+                values = list(values)
+                conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if start_ms is not None:
+            conditions.append("catalog_tags.time_ms >= ?")
+            params.append(start_ms)
+        if end_ms is not None:
+            conditions.append("catalog_tags.time_ms < ?")
+            params.append(end_ms)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+
+    def query_tags(
+        self,
+        tag_names=None,
+        tag_types=None,
+        data_dirs=None,
+        start_ms=None,
+        end_ms=None,
+        limit=None,
+    ):
+        """Return ``(data_dir, time_ms, tag_name, tag_type)`` rows across sessions."""
+        where, params = self._filter(tag_names, tag_types, data_dirs, start_ms, end_ms)
+        sql = f"""
+            SELECT sessions.data_dir, catalog_tags.time_ms, catalog_tags.tag_name,
+                catalog_tags.tag_type
+            FROM catalog_tags JOIN sessions USING (session_id)
+            {where}
+            ORDER BY sessions.data_dir, catalog_tags.time_ms
+            """
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        self.cursor.execute(sql, params)
+        return self.cursor.fetchall()
+
+    def aggregate(
+        self,
+        by=("tag_name",),
+        bucket_ms=None,
+        tag_names=None,
+        tag_types=None,
+        data_dirs=None,
+        start_ms=None,
+        end_ms=None,
+    ):
+        """Count tags grouped by ``session``, ``tag_name`` and/or ``tag_type``.
+
+        Args:
+            by (Iterable[str]): Grouping columns, any of ``session``, ``tag_name``, ``tag_type``.
+            bucket_ms (int, optional): Also group by ``time_ms`` buckets of this width.
+
+        Returns:
+            list[tuple]: One row per group with the grouping values followed by the count.
+        """
+        columns = []
+        for name in by:
+            if name not in GROUP_COLUMNS:
+                raise ValueError(f"Unknown group column: {name}")
+            columns.append(GROUP_COLUMNS[name])
+        select_params = []
+        if bucket_ms is not None:
+            if bucket_ms <= 0:
+                raise ValueError("bucket_ms must be positive")
+            columns.append("(catalog_tags.time_ms / ?) * ?")
+            select_params = [bucket_ms, bucket_ms]
+        if not columns:
+            columns = ["'all'"]
+
+        where, params = self._filter(tag_names, tag_types, data_dirs, start_ms, end_ms)
+        group_by = ", ".join(str(i + 1) for i in range(len(columns)))
+        self.cursor.execute(
+            f"""
+            SELECT {", ".join(columns)}, COUNT(*)
+            FROM catalog_tags JOIN sessions USING (session_id)
+            {where}
+            GROUP BY {group_by}
+            ORDER BY {group_by}
+            """,
+            select_params + params,
+        )
+        return self.cursor.fetchall()
+
+
+def write_rows(header, rows, file=sys.stdout):
+    writer = csv.writer(file)
+    writer.writerow(header)
+    writer.writerows(rows)
+
+
+def add_filter_arguments(parser):
+    parser.add_argument("--tag-name", action="append", dest="tag_names")
+    parser.add_argument("--tag-type", action="append", dest="tag_types")
+    parser.add_argument("--session", action="append", dest="data_dirs")
+    parser.add_argument("--start-ms", type=int)
+    parser.add_argument("--end-ms", type=int)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Cross-session tag catalog")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG_PATH, help="catalog database path")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    update_parser = subparsers.add_parser("update", help="index new and changed sessions")
+    update_parser.add_argument("roots", nargs="+", help="directories to scan")
+    update_parser.add_argument("--no-prune", action="store_true")
+
+    subparsers.add_parser("sessions", help="list catalogued sessions")
+
+    query_parser = subparsers.add_parser("query", help="list tags across sessions")
+    add_filter_arguments(query_parser)
+    query_parser.add_argument("--limit", type=int)
+
+    stats_parser = subparsers.add_parser("stats", help="count tags across sessions")
+    add_filter_arguments(stats_parser)
+    stats_parser.add_argument(
+        "--by", action="append", choices=list(GROUP_COLUMNS), help="group column (repeatable)"
+    )
+    stats_parser.add_argument("--bucket-ms", type=int)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    with TagCatalog(args.catalog) as catalog:
+        if args.command == "update":
+            stats = catalog.update(args.roots, prune=not args.no_prune)
+            print(
+                f"Indexed {stats['indexed']}, unchanged {stats['unchanged']}, "
+                f"removed {stats['removed']} session(s)"
+            )
+        elif args.command == "sessions":
+            write_rows(
+                ["data_dir", "db_path", "video_start_time_utc", "tag_count", "indexed_at"],
+                catalog.sessions(),
+            )
+        elif args.command == "query":
+            rows = catalog.query_tags(
+                args.tag_names,
+                args.tag_types,
+                args.data_dirs,
+                args.start_ms,
+                args.end_ms,
+                args.limit,
+            )
+            write_rows(["session", "time_ms", "tag_name", "tag_type"], rows)
+        elif args.command == "stats":
+            by = args.by if args.by is not None else ["tag_name"]
+            rows = catalog.aggregate(
+                by,
+                args.bucket_ms,
+                args.tag_names,
+                args.tag_types,
+                args.data_dirs,
+                args.start_ms,
+                args.end_ms,
+            )
+            header = list(by) + (["bucket_ms"] if args.bucket_ms is not None else [])
+            write_rows((header or ["all"]) + ["count"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,15 @@
 import math
-from bisect import bisect_left
 from typing import Optional
 
 import numpy as np
 import pandas as pd
 from OpenGL.GL import *
 from OpenGL.GLU import *
-from PyQt5.QtCore import QPoint, Qt, QTimer
+from PyQt5.QtCore import QPoint, Qt
 from PyQt5.QtGui import QFont, QImage, QPainter
 from PyQt5.QtWidgets import QOpenGLWidget
 
-from .utils import get_video_time_ms, load_fusion_data
+from .utils import epoch_ms, load_fusion_data, to_epoch_ms
 
 
 class Cell3dCuboid(QOpenGLWidget):
@@ -26,17 +25,17 @@ class Cell3dCuboid(QOpenGLWidget):
         self.datetimes = self.fusion_data["datetime"]
         print(f"Loaded {len(self.datetimes)} data points from {fusion_data_filename}")
 
+        # 센서 시각은 한 번만 절대 시간(ms)으로 바꿔 두고 영상 시작 시각은 offset 으로만 반영
+        self.epoch_ms = epoch_ms(self.datetimes)
         self.video_start_time_utc = None
-        self.video_time_ms = None
-        self.set_video_start_time_utc(video_start_time_utc)
-        self.euler_angles = self.fusion_data[["euler_x", "euler_y", "euler_z"]].to_numpy()
-
+        self.start_epoch_ms = 0
         self.current_time_ms = 0
-        self.data_index = 0
-
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.updateScene)
-        self.timer.start(10)
+        self.euler_angles = self.fusion_data[["euler_x", "euler_y", "euler_z"]].to_numpy()
+        self.x_angle = 0
+        self.y_angle = 0
+        self.z_angle = 0
+        self.data_index = None
+        self.set_video_start_time_utc(video_start_time_utc)
 
         # Device parameters
         self.device_height = 1.0
@@ -58,10 +57,6 @@ class Cell3dCuboid(QOpenGLWidget):
         self.camera_distance = 20.0
         self.zoom_sensitivy = 1.0
 
-        self.x_angle = 0
-        self.y_angle = 0
-        self.z_angle = 0
-
         self.last_mouse_pos = QPoint()
         self.mouse_left_down = False
 
@@ -77,16 +72,29 @@ class Cell3dCuboid(QOpenGLWidget):
         self.textures = {}
 
     def set_video_start_time_utc(self, video_start_time_utc):
-        if video_start_time_utc is pd.NaT:
+        if video_start_time_utc is None or video_start_time_utc is pd.NaT:
             video_start_time_utc = self.datetimes[0]
 
         self.video_start_time_utc = video_start_time_utc
-        self.video_time_ms = get_video_time_ms(self.datetimes, self.video_start_time_utc)
-        print(f"Updated video start time: {self.video_start_time_utc}")
+        self.start_epoch_ms = to_epoch_ms(video_start_time_utc)
+        self.set_current_video_time_ms(self.current_time_ms)
+
+    @property
+    def video_time_ms(self):
+        return self.epoch_ms - self.start_epoch_ms
 
     def set_current_video_time_ms(self, time_ms):
         self.current_time_ms = time_ms
-        self.data_index = bisect_left(self.video_time_ms, time_ms)
+        if len(self.epoch_ms) == 0:
+            self.data_index = 0
+            return
+        index = np.searchsorted(self.epoch_ms, time_ms + self.start_epoch_ms, side="left")
+        # 데이터 끝을 지나면 마지막 값을 유지
+        index = min(int(index), len(self.epoch_ms) - 1)
+        # 보여줄 센서 값이 바뀔 때만 다시 그림 (재생 위치는 FrameClock 이 알려줌)
+        if index != self.data_index:
+            self.data_index = index
+            self.updateScene()
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
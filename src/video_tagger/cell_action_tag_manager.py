@@ -1,14 +1,26 @@
-import pandas as pd
-from PyQt5.QtCore import QObject, Qt, pyqtSignal
-from PyQt5.QtWidgets import QFileDialog, QListWidgetItem
+from bisect import bisect_right
+from operator import itemgetter
 
-from .utils import format_time
+import pandas as pd
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QFileDialog
 
-TAG_TYPE = "CELL_ACTION"
+from .cell_actions import cell_action_tags, read_cell_action
+from .utils import to_epoch_ms
 
 
 class CellActionTagManager(QObject):
-    tagAdded = pyqtSignal(QListWidgetItem)
+    """Cell action tags built once from the IMU action CSV.
+
+    Tags keep their absolute start time in ``epoch_ms`` and are sorted by it. The position in
+    the video is ``epoch_ms - start_epoch_ms``, so changing the video start time only moves
+    ``start_epoch_ms`` and never rebuilds the tags.
+    """
+
+    # (첫 행, 개수): 정렬된 tags 에서 추가된 위치
+    tagsInserted = pyqtSignal(int, int)
+    # list 로 선언하면 QVariantList 로 변환되며 태그마다 복사되므로 object 로 전달
+    tagsLoaded = pyqtSignal(object)
 
     def __init__(self, parent=None):
         super().__init__()
@@ -16,25 +28,30 @@ class CellActionTagManager(QObject):
         self.tags = []
         self.csv_filename = None
         self.video_start_time = None
+        self.start_epoch_ms = 0
         self.cell_action = None
 
-    def add_tag(self, tag):
-        self.tags.append(tag)
-        time_ms = tag.get("time_ms")
-        action_type = tag.get("action_type")
+    @staticmethod
+    def tag_label(tag):
         direction = tag.get("direction")
         if pd.isna(direction):
             direction = ""
-        value = tag.get("value")
-        level = tag.get("level")
-        tag_name = " ".join(filter(lambda a: a != "", [action_type, direction, str(value), level]))
-        tag_text = f"[{format_time(time_ms)}] {tag_name}"
-        item = QListWidgetItem(tag_text)
-        item.setData(Qt.UserRole, tag)
-        self.tagAdded.emit(item)
+        parts = [tag.get("action_type"), direction, str(tag.get("value")), tag.get("level")]
+        return " ".join(filter(lambda a: a != "", parts))
+
+    def time_ms(self, tag):
+        return tag["epoch_ms"] - self.start_epoch_ms
+
+    def add_tag(self, tag):
+        tag.setdefault("label", self.tag_label(tag))
+        index = bisect_right(self.tags, tag["epoch_ms"], key=itemgetter("epoch_ms"))
+        self.tags.insert(index, tag)
+        self.tagsInserted.emit(index, 1)
 
     def set_video_start_time(self, start_time):
+        """Move the video start time; tag positions shift by the difference."""
         self.video_start_time = start_time
+        self.start_epoch_ms = to_epoch_ms(start_time) or 0
 
     def load_cell_action(self, csv_filename):
         if csv_filename is None or csv_filename == "":
@@ -48,45 +65,17 @@ class CellActionTagManager(QObject):
 
         if csv_filename != "":
             self.csv_filename = csv_filename
-            self.cell_action = pd.read_csv(
-                self.csv_filename, parse_dates=["initial_time", "final_time"]
-            )
+            self.cell_action = read_cell_action(self.csv_filename)
 
             print(f"Loading cell action from {self.csv_filename}")
 
     def load_cell_action_tags(self):
-        self.tags = []
-        if self.cell_action is not None:
-            for _, row in self.cell_action.iterrows():
-                if self.video_start_time is None:
-                    self.set_video_start_time(row["initial_time"])
-
-                time_ms = int((row["initial_time"] - self.video_start_time).total_seconds() * 1000)
-                initial_time = row["initial_time"]
-                final_time = row["final_time"]
-                action_type = row["type"]
-                direction = row["direction"]
-                value = row["value"]
-                level = row["level"]
-
-                if action_type == "JUM":
-                    value = round(value * 100, 1)
-                    level = ""
-                elif action_type == "DIV":
-                    value = ""
-
-                tag = {
-                    "time_ms": time_ms,
-                    "initial_time": initial_time,
-                    "final_time": final_time,
-                    "action_type": action_type,
-                    "direction": direction,
-                    "value": value,
-                    "level": level,
-                    "tag_type": TAG_TYPE,
-                }
-
-                self.add_tag(tag)
+        """Build all cell action tags and emit ``tagsLoaded`` once with the full list."""
+        if self.video_start_time is None and self.cell_action is not None:
+            if len(self.cell_action) > 0:
+                self.set_video_start_time(self.cell_action["initial_time"].iloc[0])
+        self.tags = cell_action_tags(self.cell_action)
+        self.tagsLoaded.emit(self.tags)
 
     def get_tags(self):
         return self.tags
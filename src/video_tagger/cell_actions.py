@@ -0,0 +1,137 @@
+"""Cell action tags from the IMU action CSV, without Qt.
+
+``CellActionTagManager`` shows these tags in the app; the command line tools use this module
+directly so they run without a display.
+"""
+
+import csv
+import os
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+from .data_cache import read_csv_cached
+from .utils import epoch_ms, timedelta_ms
+
+TAG_TYPE = "CELL_ACTION"
+COLUMNS = ("initial_time", "final_time", "type", "direction", "value", "level")
+EXPORT_COLUMNS = (
+    "time_ms",
+    "tag_name",
+    "tag_type",
+    "duration_ms",
+    "initial_time",
+    "final_time",
+    "action_type",
+    "direction",
+    "value",
+    "level",
+)
+
+
+def read_cell_action(csv_filename):
+    """Read the IMU action table, raising ``ValueError`` when a column is missing."""
+    cell_action = read_csv_cached(csv_filename, parse_dates=["initial_time", "final_time"])
+    missing = [column for column in COLUMNS if column not in cell_action.columns]
+    if missing:
+        raise ValueError(f"Missing column(s) {missing} in cell action file")
+    return cell_action
+
+
+def build_cell_action_tags(cell_action):
+    """Turn the IMU action table into cell action tag columns in one vectorized pass.
+
+    JUM actions show their value in percent and no level, DIV actions show no value. Times are
+    absolute (``epoch_ms``), so the columns do not depend on the video start time.
+
+    Args:
+        cell_action (pd.DataFrame): Rows with ``initial_time``, ``final_time``, ``type``,
+            ``direction``, ``value`` and ``level``.
+
+    Returns:
+        dict[str, list]: Equal-length columns ``epoch_ms``, ``duration_ms``, ``initial_time``,
+        ``final_time``, ``action_type``, ``direction``, ``value``, ``level`` and ``label`` (the
+        text shown in the tag list).
+    """
+    initial_time = cell_action["initial_time"]
+    final_time = cell_action["final_time"]
+    action_type = cell_action["type"]
+    is_jum = (action_type == "JUM").to_numpy()
+    is_div = (action_type == "DIV").to_numpy()
+
+    value = cell_action["value"].astype(object)
+    # np.round 는 round() 와 반올림 결과가 다를 수 있으므로 JUM 값만 파이썬 round 로 계산
+    value[is_jum] = [round(v * 100, 1) for v in cell_action["value"][is_jum].tolist()]
+    value[is_div] = ""
+    level = cell_action["level"].astype(object).where(~is_jum, "")
+
+    label = action_type.astype(str)
+    for part in (cell_action["direction"].fillna(""), value, level.fillna("")):
+        part = part.astype(str)
+        label = label.where(part == "", label + " " + part)
+
+    return {
+        "epoch_ms": epoch_ms(initial_time).tolist(),
+        "duration_ms": np.maximum(timedelta_ms(final_time - initial_time), 0).tolist(),
+        # pd.Timestamp 를 행마다 만드는 것보다 datetime 으로 한 번에 변환하는 편이 훨씬 빠름
+        # (Series.dt.to_pydatetime 은 pandas 2.2 에서 FutureWarning 을 내므로 배열에서 변환)
+        "initial_time": initial_time.array.to_pydatetime().tolist(),
+        "final_time": final_time.array.to_pydatetime().tolist(),
+        "action_type": action_type.tolist(),
+        "direction": cell_action["direction"].tolist(),
+        "value": value.tolist(),
+        "level": level.tolist(),
+        "label": label.tolist(),
+    }
+
+
+def cell_action_tags(cell_action):
+    """Return the cell action tags as dicts sorted by ``epoch_ms``."""
+    if cell_action is None or len(cell_action) == 0:
+        return []
+    columns = build_cell_action_tags(cell_action)
+    columns["tag_type"] = [TAG_TYPE] * len(cell_action)
+    names = list(columns)
+    tags = [dict(zip(names, values)) for values in zip(*columns.values())]
+    # CSV 가 이미 시간순이면 O(n)
+    tags.sort(key=itemgetter("epoch_ms"))
+    return tags
+
+
+def export_cell_action_tags(tags, filename, start_epoch_ms):
+    """Write cell action tags as a CSV that ``tag_import`` can read back.
+
+    ``time_ms`` is relative to the video start (``epoch_ms - start_epoch_ms``) and ``tag_name``
+    is the label shown in the tag list. Returns the number of rows written.
+    """
+    output_dir = os.path.dirname(filename)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_filename, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            for tag in tags:
+                writer.writerow(
+                    (
+                        tag["epoch_ms"] - start_epoch_ms,
+                        tag["label"],
+                        tag["tag_type"],
+                        tag["duration_ms"],
+                        tag["initial_time"].isoformat(sep=" ", timespec="milliseconds"),
+                        tag["final_time"].isoformat(sep=" ", timespec="milliseconds"),
+                        tag["action_type"],
+                        # 빈 칸은 NaN 으로 읽히므로 "nan" 대신 빈 문자열로 씀
+                        "" if pd.isna(tag["direction"]) else tag["direction"],
+                        tag["value"],
+                        "" if pd.isna(tag["level"]) else tag["level"],
+                    )
+                )
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+    return len(tags)
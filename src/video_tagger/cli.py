@@ -0,0 +1,397 @@
+"""Headless batch processing of data directories.
+
+Runs the same export, import and start time logic as the app without a display, so it can be
+scripted over many sessions. Nothing on this code path imports Qt. Each data directory is
+processed on its own in a worker process (``--workers``); a failure in one directory is reported
+and the others go on. The exit status is 1 if any directory failed.
+
+Settings are read from each directory's ``config.yaml`` like in the app (``database``,
+``export`` and ``import`` sections); command line options override them.
+
+Usage:
+    video-tagger export /data/matches/* --format parquet --cell-actions
+    video-tagger import /data/matches/* --file tags.csv --on-conflict replace
+    video-tagger retime /data/matches/match1 --offset-ms -1500
+    video-tagger validate --recursive /data/matches
+    video-tagger stats /data/matches/* --workers 8
+"""
+
+import argparse
+import csv
+import multiprocessing
+import os
+import sqlite3
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from functools import partial
+
+from .cell_actions import TAG_TYPE, cell_action_tags, export_cell_action_tags, read_cell_action
+from .config import load_data_config, save_data_config
+from .database import IMPORT_CONFLICT_POLICIES, TagDatabase
+from .migrations import LATEST_VERSION, get_schema_version
+from .tag_export import EXPORT_FORMATS, export_tags
+from .tag_import import IMPORT_FORMATS, iter_import
+from .utils import load_settings, to_epoch_ms
+
+DATA_CONFIG_FILENAME = "data_config.yaml"
+SETTINGS_FILENAME = "config.yaml"
+DEFAULT_DB_FILENAME = "tags.db"
+CELL_ACTION_SUFFIX = ".cell_actions.csv"
+
+
+def find_data_dirs(paths, recursive=False):
+    """Return the data directories given on the command line, in order and without duplicates.
+
+    With ``recursive``, every directory under ``paths`` that has a ``data_config.yaml`` or a
+    ``tags.db`` is a data directory.
+    """
+    data_dirs = []
+    for path in paths:
+        if not recursive:
+            data_dirs.append(os.path.abspath(path))
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            if DATA_CONFIG_FILENAME in filenames or DEFAULT_DB_FILENAME in filenames:
+                data_dirs.append(os.path.abspath(dirpath))
+    return list(dict.fromkeys(data_dirs))
+
+
+def resolve_path(data_dir, path):
+    """Resolve a path from ``data_config.yaml``.
+
+    The app stores paths as they were opened (relative to its working directory), so a relative
+    path that does not exist from here is taken relative to the data directory.
+    """
+    if not path or os.path.isabs(path) or os.path.exists(path):
+        return path
+    return os.path.join(data_dir, path)
+
+
+def parse_start_time(value):
+    """Parse ``video_start_time_utc`` (``YYYY-MM-DD HH:MM:SS.fff``), or None when unset."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+
+def format_start_time(value):
+    return value.isoformat(sep=" ", timespec="milliseconds")
+
+
+class Session:
+    """Paths and settings of one data directory."""
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        if not os.path.isdir(data_dir):
+            raise FileNotFoundError(f'Not a directory: "{data_dir}"')
+        self.data_config_path = os.path.join(data_dir, DATA_CONFIG_FILENAME)
+        self.data_config = load_data_config(self.data_config_path)
+        self.settings = load_settings(os.path.join(data_dir, SETTINGS_FILENAME))
+        self.db_path = resolve_path(data_dir, self.data_config.db_path) or os.path.join(
+            data_dir, DEFAULT_DB_FILENAME
+        )
+
+    def options(self, section):
+        return self.settings.get(section) or {}
+
+    @property
+    def video_start_time(self):
+        return parse_start_time(self.data_config.video_start_time_utc)
+
+    def path(self, name):
+        return resolve_path(self.data_dir, getattr(self.data_config, name))
+
+    def open_db(self, create=False):
+        if not create and not os.path.exists(self.db_path):
+            raise FileNotFoundError(f'No tag database "{self.db_path}"')
+        return TagDatabase(self.db_path, **self.options("database"))
+
+    def cell_action_tags(self):
+        """Cell action tags and the video start in epoch ms (the first action if unset)."""
+        csv_filename = self.path("imu_action_path")
+        if not csv_filename:
+            raise ValueError("No imu_action_path in data_config.yaml")
+        tags = cell_action_tags(read_cell_action(csv_filename))
+        start_epoch_ms = to_epoch_ms(self.video_start_time)
+        if start_epoch_ms is None:
+            # 앱과 같이 시작 시각이 없으면 첫 액션 시각을 영상 시작으로 봄
+            start_epoch_ms = min((tag["epoch_ms"] for tag in tags), default=0)
+        return tags, start_epoch_ms
+
+
+def export_session(
+    data_dir, export_format=None, output_dir=None, cell_actions=False, chunk_size=None
+):
+    session = Session(data_dir)
+    export_options = session.options("export")
+    export_format = export_format or export_options.get("format", "csv")
+    # 기본은 앱의 Ctrl+S 와 같이 tags.db 옆에 저장
+    stem = os.path.splitext(session.db_path)[0]
+    if output_dir is not None:
+        stem = os.path.join(output_dir, os.path.basename(data_dir))
+    filename = stem + EXPORT_FORMATS[export_format]
+
+    with session.open_db() as db:
+        count = export_tags(
+            db,
+            filename,
+            export_format,
+            session.video_start_time,
+            chunk_size or export_options.get("chunk_size"),
+        )
+    message = f'Saved {count} tags to "{filename}"'
+
+    if cell_actions:
+        tags, start_epoch_ms = session.cell_action_tags()
+        cell_action_filename = stem + CELL_ACTION_SUFFIX
+        count = export_cell_action_tags(tags, cell_action_filename, start_epoch_ms)
+        message += f', {count} cell actions to "{cell_action_filename}"'
+    return message
+
+
+def import_session(data_dir, filename, import_format=None, on_conflict=None, chunk_size=None):
+    session = Session(data_dir)
+    import_options = session.options("import")
+    filename = resolve_path(data_dir, filename)
+    with session.open_db(create=True) as db:
+        result = db.import_tags(
+            iter_import(filename, import_format, chunk_size or import_options.get("chunk_size")),
+            on_conflict or import_options.get("on_conflict", "skip"),
+        )
+    return (
+        f'Imported {result.added} of {result.read} tags from "{filename}"'
+        f" ({result.removed} replaced)"
+    )
+
+
+def retime_session(data_dir, offset_ms=None, start_time=None, dry_run=False):
+    session = Session(data_dir)
+    if not os.path.exists(session.data_config_path):
+        raise FileNotFoundError(f'No "{session.data_config_path}"')
+    old_start_time = session.video_start_time
+    if start_time is not None:
+        new_start_time = parse_start_time(start_time)
+    elif old_start_time is None:
+        raise ValueError("No video_start_time_utc to offset")
+    else:
+        new_start_time = old_start_time + timedelta(milliseconds=offset_ms)
+
+    old_value = session.data_config.video_start_time_utc or "(unset)"
+    new_value = format_start_time(new_start_time)
+    if not dry_run:
+        session.data_config.video_start_time_utc = new_value
+        save_data_config(session.data_config, session.data_config_path)
+    return f"Video start time {old_value} -> {new_value}" + (" (dry run)" if dry_run else "")
+
+
+def _check_db(db_path):
+    # 검사만 하므로 읽기 전용으로 열어 마이그레이션이나 WAL 파일이 생기지 않도록 함
+    uri = "file:" + db_path.replace("?", "%3f").replace("#", "%23") + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        cursor = conn.cursor()
+        result = cursor.execute("PRAGMA quick_check").fetchone()[0]
+        if result != "ok":
+            return [f"tag database is damaged: {result}"]
+        version = get_schema_version(cursor)
+        if version > LATEST_VERSION:
+            return [
+                f"tag database schema v{version} is newer than this version (v{LATEST_VERSION})"
+            ]
+        return []
+    finally:
+        conn.close()
+
+
+def validate_session(data_dir):
+    session = Session(data_dir)
+    data_config = session.data_config
+    problems = []
+    if not os.path.exists(session.data_config_path):
+        problems.append(f"missing {DATA_CONFIG_FILENAME}")
+    try:
+        session.video_start_time
+    except ValueError:
+        problems.append(f'invalid video_start_time_utc "{data_config.video_start_time_utc}"')
+
+    for name in ("video_path", "fusion_data_path"):
+        path = session.path(name)
+        if path and not os.path.exists(path):
+            problems.append(f'{name} "{path}" not found')
+
+    if not os.path.exists(session.db_path):
+        problems.append(f'tag database "{session.db_path}" not found')
+    else:
+        try:
+            problems.extend(_check_db(session.db_path))
+        except sqlite3.Error as e:
+            problems.append(f"tag database cannot be read: {e}")
+
+    csv_filename = session.path("imu_action_path")
+    if csv_filename:
+        try:
+            cell_action_tags(read_cell_action(csv_filename))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            problems.append(f'cell action file "{csv_filename}" cannot be read: {e}')
+
+    if problems:
+        raise ValueError("; ".join(problems))
+    return "OK"
+
+
+def session_stats(data_dir):
+    """Return ``(tag_type, tag_name, count)`` rows for the tags and cell actions of a session."""
+    session = Session(data_dir)
+    counts = Counter()
+    with session.open_db() as db:
+        for chunk in db.iter_tags():
+            counts.update((tag_type, tag_name) for _, tag_name, tag_type in chunk)
+    if session.data_config.imu_action_path:
+        tags, _ = session.cell_action_tags()
+        counts.update((TAG_TYPE, tag["action_type"]) for tag in tags)
+    return [(tag_type, tag_name, count) for (tag_type, tag_name), count in sorted(counts.items())]
+
+
+def _run(task, data_dir):
+    try:
+        return data_dir, task(data_dir), None
+    except Exception as e:
+        # 한 디렉터리의 오류로 나머지 디렉터리 처리가 멈추지 않도록 결과로 돌려줌
+        return data_dir, None, f"{type(e).__name__}: {e}"
+
+
+def run_tasks(task, data_dirs, workers=None):
+    """Yield ``(data_dir, result, error)`` for every directory as it finishes.
+
+    Directories are processed in ``workers`` processes (one per CPU by default). ``task`` must
+    be a picklable top-level function or ``functools.partial`` of one.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(data_dirs))
+    if workers <= 1:
+        for data_dir in data_dirs:
+            yield _run(task, data_dir)
+        return
+
+    # fork 는 부모의 sqlite 연결이나 스레드까지 복제하므로 썸네일 작업과 같이 spawn 사용
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = [executor.submit(_run, task, data_dir) for data_dir in data_dirs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def add_common_arguments(parser):
+    parser.add_argument("data_dirs", nargs="+", help="data directories")
+    parser.add_argument(
+        "-r", "--recursive", action="store_true", help="process every data directory below"
+    )
+    parser.add_argument("-j", "--workers", type=int, help="worker processes (default: one per CPU)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="video-tagger", description="Process video tagger data directories without the GUI"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="export the tags of each directory")
+    add_common_arguments(export_parser)
+    export_parser.add_argument("--format", choices=list(EXPORT_FORMATS), dest="export_format")
+    export_parser.add_argument(
+        "--output-dir", help="write <directory name>.<format> here instead of next to tags.db"
+    )
+    export_parser.add_argument(
+        "--cell-actions", action="store_true", help="also convert the cell action CSV to tags"
+    )
+    export_parser.add_argument("--chunk-size", type=int)
+
+    import_parser = subparsers.add_parser("import", help="import a tag file into each directory")
+    add_common_arguments(import_parser)
+    import_parser.add_argument(
+        "--file", required=True, help="tag file; relative paths are looked up in each directory"
+    )
+    import_parser.add_argument("--format", choices=list(IMPORT_FORMATS), dest="import_format")
+    import_parser.add_argument("--on-conflict", choices=IMPORT_CONFLICT_POLICIES)
+    import_parser.add_argument("--chunk-size", type=int)
+
+    retime_parser = subparsers.add_parser("retime", help="change the video start time")
+    add_common_arguments(retime_parser)
+    group = retime_parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--offset-ms", type=int, help="move the start time by this much")
+    group.add_argument("--set", dest="start_time", help='"YYYY-MM-DD HH:MM:SS.fff" (UTC)')
+    retime_parser.add_argument("--dry-run", action="store_true")
+
+    validate_parser = subparsers.add_parser("validate", help="check files, database and CSV")
+    add_common_arguments(validate_parser)
+
+    stats_parser = subparsers.add_parser("stats", help="count tags by type and name as CSV")
+    add_common_arguments(stats_parser)
+    return parser
+
+
+def make_task(args):
+    if args.command == "export":
+        return partial(
+            export_session,
+            export_format=args.export_format,
+            output_dir=args.output_dir,
+            cell_actions=args.cell_actions,
+            chunk_size=args.chunk_size,
+        )
+    if args.command == "import":
+        return partial(
+            import_session,
+            filename=args.file,
+            import_format=args.import_format,
+            on_conflict=args.on_conflict,
+            chunk_size=args.chunk_size,
+        )
+    if args.command == "retime":
+        if args.start_time is not None:
+            parse_start_time(args.start_time)
+        return partial(
+            retime_session,
+            offset_ms=args.offset_ms,
+            start_time=args.start_time,
+            dry_run=args.dry_run,
+        )
+    if args.command == "validate":
+        return validate_session
+    return session_stats
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        task = make_task(args)
+    except ValueError as e:
+        parser.error(str(e))
+    data_dirs = find_data_dirs(args.data_dirs, args.recursive)
+    if not data_dirs:
+        parser.error("no data directories found")
+
+    writer = csv.writer(sys.stdout) if args.command == "stats" else None
+    if writer is not None:
+        writer.writerow(["data_dir", "tag_type", "tag_name", "count"])
+    failed = 0
+    for data_dir, result, error in run_tasks(task, data_dirs, args.workers):
+        if error is not None:
+            failed += 1
+            print(f"{data_dir}: {error}", file=sys.stderr)
+        elif writer is not None:
+            writer.writerows((data_dir,) + row for row in result)
+        else:
+            print(f"{data_dir}: {result}")
+
+    print(f"Processed {len(data_dirs)} data dir(s), {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
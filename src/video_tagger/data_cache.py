@@ -0,0 +1,106 @@
+"""Sidecar cache for parsed CSV data.
+
+Parsing large sensor CSVs (and their date columns) from text dominates session start-up. The
+parsed DataFrame is stored as a Feather (Arrow IPC) file in a ``.video_tagger_cache`` directory
+next to the CSV. The cache file name includes a key built from the CSV's absolute path, size and
+modification time and the parse options, so editing or replacing the CSV invalidates the cache
+automatically. The cache needs the optional ``pyarrow`` package. Without it the CSV is simply
+parsed every time.
+"""
+
+import glob
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIRNAME = ".video_tagger_cache"
+# 저장 형식이 바뀌면 올려서 이전 캐시를 무효화
+CACHE_VERSION = 1
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def cache_key(filename, parse_dates=None):
+    stat = os.stat(filename)
+    source = "|".join(
+        [
+            str(CACHE_VERSION),
+            os.path.abspath(filename),
+            str(stat.st_size),
+            str(stat.st_mtime_ns),
+            ",".join(parse_dates or []),
+        ]
+    )
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_path(filename, parse_dates=None):
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(filename)), CACHE_DIRNAME)
+    name = f"{os.path.basename(filename)}.{cache_key(filename, parse_dates)}.feather"
+    return os.path.join(cache_dir, name)
+
+
+def _remove_stale(filename, path):
+    pattern = os.path.join(
+        os.path.dirname(path), f"{glob.escape(os.path.basename(filename))}.*.feather"
+    )
+    for stale in glob.glob(pattern):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def _write(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        df.reset_index(drop=True).to_feather(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _restore_nan(df):
+    # Feather 는 object 컬럼의 NaN 을 None 으로 돌려주므로 read_csv 결과와 같도록 NaN 으로 맞춤
+    for column in df.columns[df.dtypes == object]:
+        missing = df[column].isna()
+        if missing.any():
+            df.loc[missing, column] = np.nan
+    return df
+
+
+def read_csv_cached(filename, parse_dates=None):
+    """``pd.read_csv(filename, parse_dates=parse_dates)``, served from the sidecar cache when the
+    CSV has not changed since it was cached.
+    """
+    if not _has_pyarrow():
+        return pd.read_csv(filename, parse_dates=parse_dates)
+    from pyarrow import ArrowException
+
+    path = cache_path(filename, parse_dates)
+    if os.path.exists(path):
+        try:
+            return _restore_nan(pd.read_feather(path))
+        except (OSError, ValueError, ArrowException) as e:
+            # 깨진 캐시는 무시하고 다시 만듦
+            print(f'Ignoring unreadable cache "{path}": {e}')
+
+    df = pd.read_csv(filename, parse_dates=parse_dates)
+    try:
+        _write(df, path)
+        _remove_stale(filename, path)
+    except (OSError, ValueError, TypeError, ArrowException) as e:
+        # 읽기 전용 디렉터리, Arrow 로 바꿀 수 없는 (여러 타입이 섞인) 컬럼 등: 캐시 없이 계속 진행
+        print(f'Could not cache "{filename}": {e}')
+    return df
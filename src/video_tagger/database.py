@@ -1,84 +1,587 @@
 import os
 import sqlite3
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from .migrations import get_schema_version, migrate
+
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+INSERT_TAG_SQL = "INSERT OR IGNORE INTO tag_events (time_ms, name_id, type_id) VALUES (?, ?, ?)"
+DELETE_TAG_SQL = "DELETE FROM tag_events WHERE time_ms = ? AND name_id = ? AND type_id = ?"
+SELECT_TAGS_SQL = "SELECT time_ms, name_id, type_id FROM tag_events"
+
+IMPORT_CONFLICT_POLICIES = ("skip", "replace")
+ImportResult = namedtuple("ImportResult", ["read", "added", "removed"])
+
+# kind -> (table, id column, value column)
+DICTIONARY_TABLES = {
+    "tag_name": ("tag_names", "name_id", "tag_name"),
+    "tag_type": ("tag_types", "type_id", "tag_type"),
+}
 
 
 class TagDatabase:
-    def __init__(self, db_path="data/tagged_data/tags.db"):
+    """SQLite storage for tags.
+
+    A single connection is kept open for the whole session. It runs in WAL journal mode by
+    default, so a tag insert only appends to the write-ahead log instead of rewriting and
+    syncing the rollback journal. Call ``close()`` (or use the instance as a context manager)
+    when the session ends.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+        journal_mode (str): SQLite journal mode (``PRAGMA journal_mode``).
+        synchronous (str): SQLite synchronous level (``PRAGMA synchronous``).
+        cache_size_kb (int): Page cache size in KiB (``PRAGMA cache_size``).
+    """
+
+    def __init__(
+        self,
+        db_path="data/tagged_data/tags.db",
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        cache_size_kb=8192,
+    ):
         self.db_path = db_path
+        self.journal_mode = journal_mode.upper()
+        self.synchronous = synchronous.upper()
+        self.cache_size_kb = int(cache_size_kb)
+        if self.journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"Unknown journal mode: {journal_mode}")
+        if self.synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Unknown synchronous mode: {synchronous}")
+
+        self.conn = None
+        self.cursor = None
+        self._id_cache = {kind: {} for kind in DICTIONARY_TABLES}
+        self._names_by_id = {}
+        self._types_by_id = {}
+        self.statement_count = 0
+        self._connect()
         self._init_db()
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _connect(self):
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, cached_statements=128)
+        self.conn.set_trace_callback(self._count_statement)
+        self.cursor = self.conn.cursor()
+        self.cursor.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        self.cursor.execute(f"PRAGMA synchronous = {self.synchronous}")
+        # 음수 값은 페이지 수가 아닌 KiB 단위
+        self.cursor.execute(f"PRAGMA cache_size = {-self.cache_size_kb}")
+        self.cursor.execute("PRAGMA temp_store = MEMORY")
+        # INSERT OR REPLACE 가 지운 행에도 DELETE 트리거가 실행되도록
+        self.cursor.execute("PRAGMA recursive_triggers = ON")
+
+    def _count_statement(self, statement):
+        # 성능 계측용: 이 연결에서 실행된 SQL 문 수
+        self.statement_count += 1
+
     def _init_db(self):
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        version_before = get_schema_version(self.cursor)
+        applied = migrate(self.conn)
+        if applied and version_before > 0:
+            print(f'Migrated "{self.db_path}" to schema version {applied[-1]}')
+        self.has_fts = self._init_fts()
+        self.conn.commit()
+        if version_before == 1 and 2 in applied:
+            # 텍스트 컬럼과 인덱스가 차지하던 공간을 반환
+            self.cursor.execute("VACUUM")
+
+    def _init_fts(self):
+        """Create the FTS5 index over the tag name dictionary and keep it in sync with triggers.
+
+        Returns:
+            bool: False when the SQLite build has no FTS5 support.
+        """
+        cursor = self.cursor
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tag_names_fts'"
+        )
+        exists = cursor.fetchone() is not None
+        try:
             cursor.execute(
                 """
-                CREATE TABLE IF NOT EXISTS tags (
-                    time_ms INTEGER,
-                    tag_name TEXT,
-                    tag_type TEXT,
-                    PRIMARY KEY (time_ms, tag_name, tag_type)
+                CREATE VIRTUAL TABLE IF NOT EXISTS tag_names_fts USING fts5(
+                    tag_name,
+                    content = 'tag_names',
+                    content_rowid = 'name_id',
+                    prefix = '1 2 3'
                 )
             """
             )
-            # Create composite index for both columns
-            cursor.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_time_tag
-                ON tags(time_ms ASC, tag_name ASC)
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 is not available, falling back to LIKE search: {e}")
+            return False
+
+        cursor.execute(
             """
-            )
-            # Create individual index for tag_name for tag-based searches
-            cursor.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_tag_name
-                ON tags(tag_name ASC)
+            CREATE TRIGGER IF NOT EXISTS tag_names_fts_insert AFTER INSERT ON tag_names BEGIN
+                INSERT INTO tag_names_fts (rowid, tag_name) VALUES (new.name_id, new.tag_name);
+            END
+        """
+        )
+        cursor.execute(
             """
-            )
-            conn.commit()
+            CREATE TRIGGER IF NOT EXISTS tag_names_fts_delete AFTER DELETE ON tag_names BEGIN
+                INSERT INTO tag_names_fts (tag_names_fts, rowid, tag_name)
+                VALUES ('delete', old.name_id, old.tag_name);
+            END
+        """
+        )
+        if not exists:
+            # 이미 들어있는 태그 이름으로 색인을 채움
+            cursor.execute("INSERT INTO tag_names_fts (tag_names_fts) VALUES ('rebuild')")
+        return True
+
+    @property
+    def schema_version(self):
+        return get_schema_version(self.cursor)
+
+    def _get_id(self, kind, value, create=True):
+        """Return the dictionary key of a tag name or type, inserting it when ``create`` is set.
+
+        Keys are never reassigned, so they are cached for the lifetime of the connection.
+        """
+        cache = self._id_cache[kind]
+        if value in cache:
+            return cache[value]
+        table, id_column, column = DICTIONARY_TABLES[kind]
+        if create:
+            self.cursor.execute(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", (value,))
+        self.cursor.execute(f"SELECT {id_column} FROM {table} WHERE {column} = ?", (value,))
+        row = self.cursor.fetchone()
+        if row is None:
+            return None
+        cache[value] = row[0]
+        return row[0]
+
+    def _execute_add(self, time_ms, tag_name, tag_type):
+        name_id = self._get_id("tag_name", tag_name)
+        type_id = self._get_id("tag_type", tag_type)
+        self.cursor.execute(INSERT_TAG_SQL, (time_ms, name_id, type_id))
+
+    def _execute_remove(self, time_ms, tag_name, tag_type):
+        name_id = self._get_id("tag_name", tag_name, create=False)
+        type_id = self._get_id("tag_type", tag_type, create=False)
+        if name_id is None or type_id is None:
+            return
+        self.cursor.execute(DELETE_TAG_SQL, (time_ms, name_id, type_id))
+
+    def _rollback(self):
+        self.conn.rollback()
+        # 롤백된 트랜잭션에서 새로 만든 키가 캐시에 남지 않도록
+        self._id_cache = {kind: {} for kind in DICTIONARY_TABLES}
+
+    @property
+    def is_open(self):
+        return self.conn is not None
+
+    def close(self):
+        if self.conn is None:
+            return
+        self.cursor.close()
+        self.conn.commit()
+        self.conn.close()
+        self.conn = None
+        self.cursor = None
 
     def load_tags(self):
-        if not os.path.exists(self.db_path):
-            print(f'"{self.db_path}" Database not found')
-            return []
+        self.cursor.execute(f"{SELECT_TAGS_SQL} ORDER BY time_ms")
+        return self._decode(self.cursor.fetchall())
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
+    def iter_tags(self, chunk_size=10000):
+        """Yield all tags in time order as lists of at most ``chunk_size`` rows.
+
+        Uses its own cursor, so other queries may run between chunks.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"{SELECT_TAGS_SQL} ORDER BY time_ms, name_id, type_id")
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield self._decode(rows)
+        finally:
+            cursor.close()
+
+    def add_tag(self, time_ms, tag_name, tag_type):
+        try:
+            self._execute_add(time_ms, tag_name, tag_type)
+            self.conn.commit()
+        except Exception:
+            self._rollback()
+            raise
+
+    def remove_tag(self, time_ms, tag_name, tag_type):
+        try:
+            self._execute_remove(time_ms, tag_name, tag_type)
+            self.conn.commit()
+        except Exception:
+            self._rollback()
+            raise
+
+    def apply_batch(self, operations):
+        """Apply ``("add" | "remove", time_ms, tag_name, tag_type)`` operations in one transaction.
+
+        The whole batch is rolled back if any statement fails.
+        """
+        try:
+            for kind, time_ms, tag_name, tag_type in operations:
+                if kind == "add":
+                    self._execute_add(time_ms, tag_name, tag_type)
+                elif kind == "remove":
+                    self._execute_remove(time_ms, tag_name, tag_type)
+                else:
+                    raise ValueError(f"Unknown tag operation: {kind}")
+            self.conn.commit()
+        except Exception:
+            self._rollback()
+            raise
+
+    def import_tags(self, chunks, on_conflict="skip"):
+        """Insert tags from an iterable of ``(time_ms, tag_name, tag_type)`` chunks.
+
+        Everything runs in one transaction: each chunk is staged with ``executemany`` into a
+        temporary table, which is then merged into ``tag_events`` with set-based statements.
+        A conflict is a tag with the same time and name, either already in the database or
+        earlier in ``chunks``.
+
+        Args:
+            chunks (Iterable[list[tuple[int, str, str]]]): Tags to import.
+            on_conflict (str): ``"skip"`` keeps the existing (or first imported) tag,
+                ``"replace"`` removes it in favour of the imported (or last imported) one.
+
+        Returns:
+            ImportResult: Rows read, tags added and existing tags removed.
+        """
+        if on_conflict not in IMPORT_CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy: {on_conflict}")
+
+        read = 0
+        try:
+            self.cursor.execute("DROP TABLE IF EXISTS temp.import_events")
+            self.cursor.execute(
                 """
-                SELECT time_ms, tag_name, tag_type FROM tags INDEXED
-                BY idx_time_tag
-                ORDER BY time_ms, tag_name, tag_type
+                CREATE TEMP TABLE import_events (
+                    time_ms INTEGER, name_id INTEGER, type_id INTEGER,
+                    PRIMARY KEY (name_id, time_ms)
+                ) WITHOUT ROWID
                 """
             )
-            return cursor.fetchall()
+            # 파일 안에서 같은 시각과 이름이 다시 나오면 그것도 충돌:
+            # skip 은 먼저 나온 행, replace 는 나중에 나온 행을 남김
+            insert = "INSERT OR IGNORE" if on_conflict == "skip" else "INSERT OR REPLACE"
+            for chunk in chunks:
+                # 사전 키는 파일에 나온 이름/종류마다 한 번만 조회
+                for tag_name in {tag_name for _, tag_name, _ in chunk}:
+                    self._get_id("tag_name", tag_name)
+                for tag_type in {tag_type for _, _, tag_type in chunk}:
+                    self._get_id("tag_type", tag_type)
+                name_ids = self._id_cache["tag_name"]
+                type_ids = self._id_cache["tag_type"]
+                self.cursor.executemany(
+                    f"{insert} INTO import_events VALUES (?, ?, ?)",
+                    [
+                        (time_ms, name_ids[tag_name], type_ids[tag_type])
+                        for time_ms, tag_name, tag_type in chunk
+                    ],
+                )
+                read += len(chunk)
 
-    def add_tag(self, time_ms, tag_name, tag_type):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT OR REPLACE INTO tags (time_ms, tag_name, tag_type) VALUES (?, ?, ?)",
-                (time_ms, tag_name, tag_type),
+            removed = 0
+            if on_conflict == "replace":
+                self.cursor.execute(
+                    """
+                    DELETE FROM tag_events
+                    WHERE (name_id, time_ms) IN (SELECT name_id, time_ms FROM import_events)
+                        AND (time_ms, name_id, type_id) NOT IN (
+                            SELECT time_ms, name_id, type_id FROM import_events
+                        )
+                    """
+                )
+                removed = self.cursor.rowcount
+            self.cursor.execute(
+                """
+                INSERT OR IGNORE INTO tag_events (time_ms, name_id, type_id)
+                SELECT time_ms, name_id, type_id FROM import_events AS imported
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM tag_events
+                    WHERE name_id = imported.name_id AND time_ms = imported.time_ms
+                )
+                """
             )
-            conn.commit()
+            added = self.cursor.rowcount
+            self.cursor.execute("DROP TABLE import_events")
+            self.conn.commit()
+        except Exception:
+            self._rollback()
+            raise
+        return ImportResult(read, added, removed)
 
-    def remove_tag(self, time_ms, tag_name, tag_type):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "DELETE FROM tags WHERE time_ms = ? AND tag_name = ? AND tag_type = ?",
-                (time_ms, tag_name, tag_type),
+    @staticmethod
+    def _range_filter(start_ms, end_ms, tag_names=None, tag_types=None):
+        # 이름/종류 조건은 사전 테이블에서 키로 바꿔 tag_events 만으로 검색되도록 함
+        conditions = ["time_ms >= ?", "time_ms < ?"]
+        params = [start_ms, end_ms]
+        if tag_names is not None:
+            tag_names = list(tag_names)
+            conditions.append(
+                "name_id IN (SELECT name_id FROM tag_names "
+                f"WHERE tag_name IN ({', '.join('?' * len(tag_names))}))"
+            )
+            params.extend(tag_names)
+        if tag_types is not None:
+            tag_types = list(tag_types)
+            conditions.append(
+                "type_id IN (SELECT type_id FROM tag_types "
+                f"WHERE tag_type IN ({', '.join('?' * len(tag_types))}))"
             )
-            conn.commit()
+            params.extend(tag_types)
+        return " AND ".join(conditions), params
+
+    def _tags_in_range_query(self, start_ms, end_ms, tag_names=None, tag_types=None):
+        where, params = self._range_filter(start_ms, end_ms, tag_names, tag_types)
+        return f"{SELECT_TAGS_SQL} WHERE {where} ORDER BY time_ms", params
+
+    def _count_tags_in_range_query(
+        self, start_ms, end_ms, bucket_ms, tag_names=None, tag_types=None
+    ):
+        if bucket_ms <= 0:
+            raise ValueError("bucket_ms must be positive")
+        where, params = self._range_filter(start_ms, end_ms, tag_names, tag_types)
+        sql = f"""
+            SELECT ? + ((time_ms - ?) / ?) * ? AS bucket_ms, name_id, COUNT(*)
+            FROM tag_events
+            WHERE {where}
+            GROUP BY bucket_ms, name_id
+            """
+        return sql, [start_ms, start_ms, bucket_ms, bucket_ms] + params
+
+    def _refresh_dictionaries(self):
+        self.cursor.execute("SELECT name_id, tag_name FROM tag_names")
+        self._names_by_id = dict(self.cursor.fetchall())
+        self.cursor.execute("SELECT type_id, tag_type FROM tag_types")
+        self._types_by_id = dict(self.cursor.fetchall())
+
+    def _decode(self, rows):
+        """Turn ``(time_ms, name_id, type_id)`` rows into sorted ``(time_ms, name, type)`` rows."""
+        try:
+            names, types = self._names_by_id, self._types_by_id
+            tags = [(time_ms, names[name_id], types[type_id]) for time_ms, name_id, type_id in rows]
+        except KeyError:
+            # 다른 연결(백그라운드 writer)이 새 이름을 추가한 경우
+            self._refresh_dictionaries()
+            names, types = self._names_by_id, self._types_by_id
+            tags = [(time_ms, names[name_id], types[type_id]) for time_ms, name_id, type_id in rows]
+        # 행은 이미 time_ms 순이므로 같은 시간 안에서 이름/종류 순으로만 정렬됨
+        tags.sort()
+        return tags
+
+    def tags_in_range(self, start_ms, end_ms, tag_names=None, tag_types=None):
+        """Return tags with ``start_ms <= time_ms < end_ms`` ordered by time.
+
+        Args:
+            start_ms (int): Inclusive start of the window in milliseconds.
+            end_ms (int): Exclusive end of the window in milliseconds.
+            tag_names (Iterable[str], optional): Only return these tag names.
+            tag_types (Iterable[str], optional): Only return these tag types.
+
+        Returns:
+            list[tuple[int, str, str]]: ``(time_ms, tag_name, tag_type)`` rows.
+        """
+        self.cursor.execute(*self._tags_in_range_query(start_ms, end_ms, tag_names, tag_types))
+        return self._decode(self.cursor.fetchall())
+
+    def count_tags_in_range(self, start_ms, end_ms, bucket_ms, tag_names=None, tag_types=None):
+        """Count tags per time bucket and tag name inside ``[start_ms, end_ms)``.
+
+        Args:
+            start_ms (int): Inclusive start of the window in milliseconds.
+            end_ms (int): Exclusive end of the window in milliseconds.
+            bucket_ms (int): Bucket width in milliseconds.
+            tag_names (Iterable[str], optional): Only count these tag names.
+            tag_types (Iterable[str], optional): Only count these tag types.
+
+        Returns:
+            list[tuple[int, str, int]]: ``(bucket_start_ms, tag_name, count)`` rows ordered by
+            bucket. Empty buckets are omitted.
+        """
+        self.cursor.execute(
+            *self._count_tags_in_range_query(start_ms, end_ms, bucket_ms, tag_names, tag_types)
+        )
+        rows = self.cursor.fetchall()
+        try:
+            counts = [
+                (bucket, self._names_by_id[name_id], count) for bucket, name_id, count in rows
+            ]
+        except KeyError:
+            self._refresh_dictionaries()
+            counts = [
+                (bucket, self._names_by_id[name_id], count) for bucket, name_id, count in rows
+            ]
+        counts.sort()
+        return counts
+
+    def explain_query_plan(self, sql, params=()):
+        """Return the ``EXPLAIN QUERY PLAN`` detail lines for a statement."""
+        self.cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in self.cursor.fetchall()]
+
+    @staticmethod
+    def _fts_query(query):
+        # 각 단어를 접두어 검색어로 바꾸고 AND 로 묶음: "ju h" -> "ju"* "h"*
+        terms = [term.replace('"', '""') for term in query.split()]
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search_tags(self, query, tag_types=None, limit=None):
+        """Search tag names by word prefixes, ordered by time.
+
+        Every whitespace separated term in ``query`` must match the start of a word in the
+        tag name, so ``"ju h"`` matches ``"JUM H"``. Matching is case-insensitive.
+
+        Args:
+            query (str): Search text.
+            tag_types (Iterable[str], optional): Only return these tag types.
+            limit (int, optional): Maximum number of rows to return.
+
+        Returns:
+            list[tuple[int, str, str]]: ``(time_ms, tag_name, tag_type)`` rows.
+        """
+        if not query.split():
+            return self.load_tags()
+
+        if self.has_fts:
+            conditions = [
+                "name_id IN (SELECT rowid FROM tag_names_fts WHERE tag_names_fts MATCH ?)"
+            ]
+            params = [self._fts_query(query)]
+        else:
+            conditions = ["name_id IN (SELECT name_id FROM tag_names WHERE tag_name LIKE ?)"]
+            params = [f"%{query.strip()}%"]
+        if tag_types is not None:
+            tag_types = list(tag_types)
+            conditions.append(
+                "type_id IN (SELECT type_id FROM tag_types "
+                f"WHERE tag_type IN ({', '.join('?' * len(tag_types))}))"
+            )
+            params.extend(tag_types)
+        sql = f"{SELECT_TAGS_SQL} WHERE {' AND '.join(conditions)} ORDER BY time_ms"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        self.cursor.execute(sql, params)
+        return self._decode(self.cursor.fetchall())
 
     def find_tags_by_name(self, tag_name):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        # 이름 사전만 LIKE 로 훑고 해당 키의 태그를 가져옴
+        self.cursor.execute(
+            f"""
+            {SELECT_TAGS_SQL}
+            WHERE name_id IN (SELECT name_id FROM tag_names WHERE tag_name LIKE ?)
+            ORDER BY time_ms
+            """,
+            (f"%{tag_name}%",),
+        )
+        return self._decode(self.cursor.fetchall())
+
+    @property
+    def revision(self):
+        """Revision of the most recent tag change, 0 if nothing was ever changed."""
+        self.cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tag_changes'")
+        row = self.cursor.fetchone()
+        return row[0] if row is not None else 0
+
+    def change_horizon(self):
+        """Return the newest revision that is no longer in the change log.
+
+        A change feed that was last exported before this revision has missed pruned changes and
+        must start again from a snapshot.
+        """
+        self.cursor.execute("SELECT MIN(revision) FROM tag_changes")
+        oldest = self.cursor.fetchone()[0]
+        return oldest - 1 if oldest is not None else self.revision
+
+    def _decode_changes(self, rows):
+        try:
+            names, types = self._names_by_id, self._types_by_id
+            return [
+                (revision, op, time_ms, names[name_id], types[type_id])
+                for revision, op, time_ms, name_id, type_id in rows
+            ]
+        except KeyError:
+            self._refresh_dictionaries()
+            return self._decode_changes(rows)
+
+    def iter_changes(self, after_revision, up_to_revision=None, chunk_size=10000):
+        """Yield logged changes with ``after_revision < revision <= up_to_revision`` in order.
+
+        Rows are ``(revision, op, time_ms, tag_name, tag_type)`` with ``op`` ``"add"`` or
+        ``"remove"``, in lists of at most ``chunk_size`` rows.
+        """
+        if up_to_revision is None:
+            up_to_revision = self.revision
+        cursor = self.conn.cursor()
+        try:
             cursor.execute(
                 """
-                SELECT time_ms, tag_name, tag_type FROM tags
-                WHERE tag_name LIKE ? ORDER BY time_ms
+                SELECT revision, op, time_ms, name_id, type_id FROM tag_changes
+                WHERE revision > ? AND revision <= ?
+                ORDER BY revision
                 """,
-                (f"%{tag_name}%",),
+                (after_revision, up_to_revision),
             )
-            return cursor.fetchall()
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield self._decode_changes(rows)
+        finally:
+            cursor.close()
+
+    def get_export_revision(self, target):
+        self.cursor.execute("SELECT revision FROM export_state WHERE target = ?", (target,))
+        row = self.cursor.fetchone()
+        return row[0] if row is not None else None
+
+    def set_export_revision(self, target, revision):
+        try:
+            self.cursor.execute(
+                "INSERT OR REPLACE INTO export_state (target, revision, exported_at) "
+                "VALUES (?, ?, ?)",
+                (target, revision, datetime.now(timezone.utc).isoformat()),
+            )
+            self.conn.commit()
+        except Exception:
+            self._rollback()
+            raise
+
+    def prune_changes(self):
+        """Drop changes every change feed has exported, or all of them if there is no feed.
+
+        Returns:
+            int: Number of pruned changes.
+        """
+        try:
+            self.cursor.execute("SELECT MIN(revision) FROM export_state")
+            horizon = self.cursor.fetchone()[0]
+            if horizon is None:
+                horizon = self.revision
+            self.cursor.execute("DELETE FROM tag_changes WHERE revision <= ?", (horizon,))
+            pruned = self.cursor.rowcount
+            self.conn.commit()
+        except Exception:
+            self._rollback()
+            raise
+        return pruned
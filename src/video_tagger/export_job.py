@@ -0,0 +1,147 @@
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from .database import TagDatabase
+from .tag_export import iter_export
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ExportJob:
+    def __init__(
+        self,
+        db_path,
+        filename,
+        export_format,
+        video_start_time=None,
+        chunk_size=None,
+        total=0,
+        db_options=None,
+        before=None,
+    ):
+        self.db_path = db_path
+        self.filename = filename
+        self.export_format = export_format
+        self.video_start_time = video_start_time
+        self.chunk_size = chunk_size
+        self.total = total
+        self.db_options = db_options or {}
+        # 내보내기 직전에 worker 스레드에서 호출 (예: TagManager.flush), False 를 돌려주면 실패
+        self.before = before
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self, progress):
+        if self.before is not None and not self.before():
+            raise RuntimeError("Queued tag changes could not be saved")
+        db = TagDatabase(self.db_path, **self.db_options)
+        try:
+            written = 0
+            chunks = iter_export(
+                db, self.filename, self.export_format, self.video_start_time, self.chunk_size
+            )
+            try:
+                for count in chunks:
+                    if self.cancel_event.is_set():
+                        raise ExportCancelled()
+                    written += count
+                    progress(written, max(self.total, written))
+            finally:
+                # 중간에 멈춘 경우 임시 파일을 지움
+                chunks.close()
+            return written
+        finally:
+            db.close()
+
+
+class ExportJobRunner(QObject):
+    """Runs tag exports on a thread pool so the GUI thread never touches the output file.
+
+    Each job opens its own connection to the database. At most one job per output file runs at
+    a time. Submitting again while it runs queues a single pending job that replaces any
+    earlier pending one, so repeated saves collapse into one extra export of the latest state.
+
+    Signals are emitted from worker threads, so connected slots on GUI objects run as queued
+    calls on the GUI thread.
+    """
+
+    progress = pyqtSignal(str, int, int)
+    finished = pyqtSignal(str, int)
+    failed = pyqtSignal(str, str)
+    cancelled = pyqtSignal(str)
+
+    def __init__(self, max_workers=2):
+        super().__init__()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Export")
+        self.lock = threading.RLock()
+        self.running = {}
+        self.pending = {}
+        self.futures = set()
+
+    def submit(self, job):
+        """Start ``job``, or keep it as the pending job for its file if an export is running.
+
+        Returns:
+            bool: True if the job started now, False if it was queued behind a running job.
+        """
+        with self.lock:
+            if job.filename in self.running:
+                self.pending[job.filename] = job
+                return False
+            self._start(job)
+            return True
+
+    def _start(self, job):
+        self.running[job.filename] = job
+        future = self.executor.submit(self._run, job)
+        self.futures.add(future)
+        future.add_done_callback(self._discard)
+
+    def _discard(self, future):
+        with self.lock:
+            self.futures.discard(future)
+
+    def is_running(self):
+        with self.lock:
+            return bool(self.running)
+
+    def cancel(self):
+        """Cancel every running export and drop the pending ones."""
+        with self.lock:
+            self.pending.clear()
+            for job in self.running.values():
+                job.cancel()
+
+    def wait(self, timeout=None):
+        # 끝나는 job 이 대기 중인 job 을 시작할 수 있으므로 더 이상 없을 때까지 반복
+        while True:
+            with self.lock:
+                futures = list(self.futures)
+            if not futures:
+                return True
+            done, not_done = wait(futures, timeout)
+            if not_done:
+                return False
+
+    def _run(self, job):
+        try:
+            count = job.run(lambda written, total: self.progress.emit(job.filename, written, total))
+        except ExportCancelled:
+            self.cancelled.emit(job.filename)
+        except (sqlite3.Error, OSError, RuntimeError, ValueError) as e:
+            self.failed.emit(job.filename, str(e))
+        else:
+            self.finished.emit(job.filename, count)
+        finally:
+            with self.lock:
+                del self.running[job.filename]
+                pending = self.pending.pop(job.filename, None)
+                if pending is not None:
+                    self._start(pending)
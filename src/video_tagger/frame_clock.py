@@ -0,0 +1,58 @@
+from PyQt5.QtCore import QElapsedTimer, QObject, Qt, QTimer
+from PyQt5.QtGui import QGuiApplication
+
+
+def display_interval_ms():
+    """Frame interval of the primary screen (16 ms at 60 Hz)."""
+    screen = QGuiApplication.primaryScreen()
+    refresh_rate = screen.refreshRate() if screen is not None else 0
+    return max(1, round(1000 / refresh_rate)) if refresh_rate > 0 else 16
+
+
+class FrameClock(QObject):
+    """Updates every playhead-synced view at most once per display frame.
+
+    The player's position notifications only mark the clock dirty. The views registered with
+    ``add_view`` are then called together with the current position, right away if the last
+    update is at least one frame old and otherwise when the frame is due, so any number of
+    notifications in between cost one update. While playing this runs once per frame; while
+    paused it runs once per seek; when the position does not change no timer runs at all.
+
+    Views should return early when their own state (the pixel of a handle, the text of a label,
+    the sensor sample shown) is the same as last time.
+    """
+
+    def __init__(self, player, interval_ms=None, parent=None):
+        super().__init__(parent)
+        self.player = player
+        self.interval_ms = interval_ms or display_interval_ms()
+        self.views = []
+        self.updates = 0
+
+        self.last_update = QElapsedTimer()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.update_views)
+        player.positionChanged.connect(self.request_update)
+
+    def add_view(self, view):
+        """Call ``view(position_ms)`` on every update."""
+        self.views.append(view)
+
+    def request_update(self, *args):
+        if self.timer.isActive():
+            return
+        if self.last_update.isValid():
+            wait_ms = self.interval_ms - self.last_update.elapsed()
+            if wait_ms > 0:
+                self.timer.start(wait_ms)
+                return
+        self.update_views()
+
+    def update_views(self):
+        self.last_update.start()
+        self.updates += 1
+        position = self.player.position()
+        for view in self.views:
+            view(position)
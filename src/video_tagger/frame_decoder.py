@@ -0,0 +1,130 @@
+"""Sequential video frame decoding for the frame playback engine.
+
+Decoders seek to the keyframe before a frame index and then yield every frame from that index
+on as RGB ``numpy`` arrays, optionally scaled down to ``max_width``. ``keyframe`` decodes only the
+keyframe before an index, for fast approximate seeks. PyAV (``av``) is preferred and OpenCV
+(``cv2``) is the fallback. Both are optional packages.
+"""
+
+import importlib.util
+
+BACKENDS = ("pyav", "opencv")
+_MODULES = {"pyav": "av", "opencv": "cv2"}
+
+
+def available_backends():
+    return [backend for backend in BACKENDS if importlib.util.find_spec(_MODULES[backend])]
+
+
+def _scaled_size(width, height, max_width=None):
+    if max_width and width > max_width:
+        # 짝수 크기로 맞춤 (일부 변환기가 홀수 크기를 지원하지 않음)
+        return max_width // 2 * 2, round(height * max_width / width) // 2 * 2
+    return width, height
+
+
+class PyAVDecoder:
+    def __init__(self, filename, max_width=None):
+        import av
+
+        self.container = av.open(filename)
+        self.stream = self.container.streams.video[0]
+        self.stream.thread_type = "AUTO"
+        self.fps = float(self.stream.average_rate or self.stream.guessed_rate or 30)
+        self.start_pts = self.stream.start_time or 0
+        if self.stream.frames:
+            self.frame_count = self.stream.frames
+        elif self.stream.duration is not None:
+            self.frame_count = int(self.stream.duration * self.stream.time_base * self.fps)
+        else:
+            self.frame_count = int(self.container.duration / av.time_base * self.fps)
+        self.width, self.height = _scaled_size(
+            self.stream.codec_context.width, self.stream.codec_context.height, max_width
+        )
+
+    def _seek(self, index):
+        self.container.seek(
+            self.start_pts + int(index / self.fps / self.stream.time_base),
+            stream=self.stream,
+            backward=True,
+        )
+
+    def _index(self, frame):
+        time_base = self.stream.time_base
+        return round((frame.pts - self.start_pts) * time_base * self.fps)
+
+    def _to_ndarray(self, frame):
+        return frame.to_ndarray(format="rgb24", width=self.width, height=self.height)
+
+    def iter_frames(self, start_index):
+        self._seek(start_index)
+        for frame in self.container.decode(self.stream):
+            if frame.pts is None:
+                continue
+            index = self._index(frame)
+            if index < start_index:
+                continue
+            yield index, self._to_ndarray(frame)
+
+    def keyframe(self, index):
+        """The keyframe at or before ``index`` as ``(index, frame)``, decoding only that frame."""
+        self._seek(index)
+        for frame in self.container.decode(self.stream):
+            if frame.pts is not None:
+                return self._index(frame), self._to_ndarray(frame)
+        return None
+
+    def close(self):
+        self.container.close()
+
+
+class OpenCVDecoder:
+    def __init__(self, filename, max_width=None):
+        import cv2
+
+        self.cv2 = cv2
+        self.capture = cv2.VideoCapture(filename)
+        if not self.capture.isOpened():
+            raise OSError(f'Cannot open video "{filename}"')
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.source_size = (
+            int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        )
+        self.width, self.height = _scaled_size(*self.source_size, max_width)
+
+    def iter_frames(self, start_index):
+        cv2 = self.cv2
+        self.capture.set(cv2.CAP_PROP_POS_FRAMES, start_index)
+        index = start_index
+        while True:
+            ok, frame = self.capture.read()
+            if not ok:
+                return
+            if (self.width, self.height) != self.source_size:
+                frame = cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_AREA)
+            yield index, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            index += 1
+
+    def keyframe(self, index):
+        """``(index, frame)``; OpenCV cannot stop at keyframes, so this is the exact frame."""
+        return next(self.iter_frames(index), None)
+
+    def close(self):
+        self.capture.release()
+
+
+def open_decoder(filename, backend="auto", max_width=None):
+    """Open ``filename`` with the first available backend (``auto``) or the given one."""
+    if backend != "auto" and backend not in BACKENDS:
+        raise ValueError(f"Unknown frame decoder backend: {backend}")
+    backends = [name for name in available_backends() if backend in ("auto", name)]
+    if not backends:
+        raise RuntimeError(
+            "Frame playback needs the optional 'av' (PyAV) or 'opencv-python' package"
+            " (pip install av)"
+        )
+    if backends[0] == "pyav":
+        return PyAVDecoder(filename, max_width)
+    return OpenCVDecoder(filename, max_width)
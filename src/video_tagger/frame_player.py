@@ -0,0 +1,414 @@
+import math
+import threading
+
+from PyQt5.QtCore import QElapsedTimer, QObject, QRect, Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QWidget
+
+from .frame_decoder import open_decoder
+
+
+class FrameCache:
+    """Decoded frames keyed by frame index, capped at ``max_bytes``.
+
+    When the cap is exceeded the frames farthest outside the prefetch window around the playhead
+    are evicted first, so the cache keeps the neighbourhood of the playhead in both directions.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.frames = {}
+        self.nbytes = 0
+        self.lock = threading.Lock()
+
+    def __contains__(self, index):
+        return index in self.frames
+
+    def __len__(self):
+        return len(self.frames)
+
+    def get(self, index):
+        return self.frames.get(index)
+
+    def put(self, index, image, window):
+        """Store a frame; returns False if it was the farthest frame and got evicted at once.
+
+        Args:
+            window (tuple[int, int]): First and last frame index of the prefetch window.
+        """
+        lo, hi = window
+        with self.lock:
+            if index in self.frames:
+                return True
+            self.frames[index] = image
+            self.nbytes += image.sizeInBytes()
+            while self.nbytes > self.max_bytes and len(self.frames) > 1:
+                farthest = max(self.frames, key=lambda i: max(lo - i, i - hi))
+                self.nbytes -= self.frames.pop(farthest).sizeInBytes()
+                if farthest == index:
+                    return False
+        return True
+
+    def clear(self):
+        with self.lock:
+            self.frames = {}
+            self.nbytes = 0
+
+
+class FramePlayer(QObject):
+    """Playback engine that shows frames decoded ahead of time instead of using ``QMediaPlayer``.
+
+    A worker thread decodes frames with PyAV or OpenCV into a ``FrameCache`` around the
+    playhead: ``prefetch_ms`` ahead in the play direction and half of that behind it. Reverse
+    play, frame stepping and short back-and-forth scrubs are then served from memory at full
+    frame rate. A seek outside the cached window aborts the current decode run.
+
+    ``setPosition(position, exact=False)`` is a fast approximate seek for scrubbing: it shows the
+    keyframe before the position, which needs a single decoded frame, and prefetching waits
+    until the next exact seek or ``play()``.
+
+    The methods and signals that ``VideoPlayer`` uses mirror ``QMediaPlayer``. A negative
+    playback rate plays backwards. Frames are shown by a ``FrameView``; there is no audio.
+    """
+
+    StoppedState = 0
+    PlayingState = 1
+    PausedState = 2
+
+    positionChanged = pyqtSignal(int)
+    durationChanged = pyqtSignal(int)
+    stateChanged = pyqtSignal(int)
+    frameReady = pyqtSignal(QImage)
+    # 디코딩 스레드에서 보내므로 GUI 스레드에서 queued 로 처리됨
+    frameDecoded = pyqtSignal(int)
+    previewDecoded = pyqtSignal(int, QImage)
+
+    def __init__(self, max_memory_mb=512, prefetch_ms=2000, backend="auto", max_width=1280):
+        super().__init__()
+        self.cache = FrameCache(max_memory_mb * 2**20)
+        self.prefetch_ms = prefetch_ms
+        self.backend = backend
+        self.max_width = max_width
+        self.decoder = None
+        self.thread = None
+        self.fps = 30.0
+        self.frame_count = 0
+        self.frame_index = 0
+        self.shown_index = None
+        self.preview_index = None
+        self.position_ms = 0
+        self.rate = 1.0
+        self._state = self.StoppedState
+
+        # 재생 시계: anchor_ms 에서 clock 이 흐른 만큼 rate 배로 진행
+        self.clock = QElapsedTimer()
+        self.anchor_ms = 0
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+
+        # 디코딩 스레드와 공유하는 상태 (condition 으로 보호)
+        self.condition = threading.Condition()
+        self.playhead = 0
+        self.direction = 1
+        self.generation = 0
+        self.failed_generation = None
+        self.preview_request = None
+        # 빠른 탐색 중 (드래그): 키프레임만 디코딩하고 주변 프레임은 미리 읽지 않음
+        self.scrubbing = False
+        self.last_index = -1
+        self.ahead = 0
+        self.behind = 0
+        self.chunk = 1
+        self.stopped = False
+
+        self.frameDecoded.connect(self._on_frame_decoded)
+        self.previewDecoded.connect(self._on_preview_decoded)
+
+    def load(self, filename):
+        self.set_decoder(open_decoder(filename, self.backend, self.max_width))
+
+    def set_decoder(self, decoder):
+        """Play frames from an opened decoder (see ``frame_decoder``)."""
+        self.close()
+        self.decoder = decoder
+        self.fps = self.decoder.fps
+        self.frame_count = self.decoder.frame_count
+        self.last_index = self.frame_count - 1
+
+        # 미리 읽을 구간이 메모리 한도 안에 들어가도록 줄임 (넘치면 같은 프레임을 계속 다시 디코딩)
+        frame_bytes = (self.decoder.width * 3 + 3) // 4 * 4 * self.decoder.height
+        capacity = max(1, self.cache.max_bytes // frame_bytes)
+        self.ahead = max(1, round(self.prefetch_ms * self.fps / 1000))
+        self.behind = self.ahead // 2
+        if self.ahead + self.behind + 1 > capacity:
+            self.ahead = max(0, (capacity - 1) * 2 // 3)
+            self.behind = max(0, capacity - 1 - self.ahead)
+        self.chunk = max(1, self.ahead // 3)
+
+        self.stopped = False
+        self.failed_generation = None
+        self.preview_request = None
+        self.thread = threading.Thread(target=self._run, name="FrameDecoder", daemon=True)
+        self.thread.start()
+        self.timer.setInterval(max(1, int(500 / self.fps)))
+        self.durationChanged.emit(self.duration())
+        self.setPosition(0)
+
+    def close(self):
+        self.pause()
+        if self.thread is not None:
+            with self.condition:
+                self.stopped = True
+                self.condition.notify()
+            self.thread.join()
+            self.thread = None
+        if self.decoder is not None:
+            self.decoder.close()
+            self.decoder = None
+        self.cache.clear()
+        self.shown_index = None
+
+    def index_at(self, position_ms):
+        return min(max(int(position_ms * self.fps / 1000), 0), max(self.last_index, 0))
+
+    def time_of(self, index):
+        return math.ceil(index * 1000 / self.fps)
+
+    def duration(self):
+        return self.time_of(self.frame_count) if self.decoder is not None else 0
+
+    def position(self):
+        return self.position_ms
+
+    def state(self):
+        return self._state
+
+    def setNotifyInterval(self, interval_ms):
+        """위치는 새 프레임을 보여줄 때마다 알리므로 무시 (QMediaPlayer 호환)"""
+
+    def setPlaybackRate(self, rate):
+        self.anchor_ms = self.position_ms
+        self.clock.restart()
+        self.rate = rate
+        with self.condition:
+            self.direction = 1 if rate >= 0 else -1
+            self.condition.notify()
+
+    def play(self):
+        if self.decoder is None:
+            return
+        with self.condition:
+            self.scrubbing = False
+            self.condition.notify()
+        self.anchor_ms = self.position_ms
+        self.clock.restart()
+        self.timer.start()
+        self._set_state(self.PlayingState)
+
+    def pause(self):
+        self.timer.stop()
+        if self._state == self.PlayingState:
+            self._set_state(self.PausedState)
+
+    def stop(self):
+        self.timer.stop()
+        self._set_state(self.StoppedState)
+
+    def setPosition(self, position_ms, exact=True):
+        if self.decoder is None:
+            return
+        position_ms = int(min(max(position_ms, 0), self.time_of(self.last_index)))
+        index = self.index_at(position_ms)
+        self.position_ms = position_ms
+        self.frame_index = index
+        self._set_playhead(index)
+        self.preview_index = None if exact or index in self.cache else index
+        with self.condition:
+            self.preview_request = self.preview_index
+            self.scrubbing = not exact
+            self.condition.notify()
+        self.anchor_ms = position_ms
+        self.clock.restart()
+        if index != self.shown_index:
+            self._show(index)
+        self.positionChanged.emit(position_ms)
+
+    def step_frame(self, frames):
+        """Pause and move ``frames`` frames forward (negative: backward)."""
+        self.pause()
+        self.setPosition(self.time_of(self.frame_index + frames))
+
+    def _set_state(self, state):
+        if state != self._state:
+            self._state = state
+            self.stateChanged.emit(state)
+
+    def _show(self, index):
+        image = self.cache.get(index)
+        if image is None:
+            return False
+        self.shown_index = index
+        self.frameReady.emit(image)
+        return True
+
+    def _on_frame_decoded(self, index):
+        # 기다리던 프레임이 디코딩되면 바로 보여줌
+        if index == self.frame_index and index != self.shown_index:
+            self._show(index)
+
+    def _on_preview_decoded(self, index, image):
+        # 정확한 프레임이 아직 없으면 키프레임을 대신 보여줌
+        if index == self.preview_index and self.shown_index != self.frame_index:
+            self.shown_index = None
+            self.frameReady.emit(image)
+
+    def _tick(self):
+        target_ms = self.anchor_ms + self.clock.elapsed() * self.rate
+        target_ms = min(max(target_ms, 0), self.time_of(self.last_index))
+        index = self.index_at(target_ms)
+        if index != self.shown_index and not self._show(index):
+            # 아직 디코딩되지 않은 프레임: 재생 시계를 멈추고 기다림
+            self._set_playhead(index)
+            self.anchor_ms = self.position_ms
+            self.clock.restart()
+            return
+
+        self._set_playhead(index)
+        self.frame_index = index
+        if int(target_ms) != self.position_ms:
+            self.position_ms = int(target_ms)
+            self.positionChanged.emit(self.position_ms)
+        if (self.rate >= 0 and index >= self.last_index) or (self.rate < 0 and index <= 0):
+            self.pause()
+
+    def _set_playhead(self, index):
+        with self.condition:
+            lo, hi = self._window()
+            if not lo <= index <= hi:
+                # 미리 읽는 구간 밖으로 이동: 진행 중인 디코딩을 멈추고 새 위치부터 읽음
+                self.generation += 1
+            self.playhead = index
+            self.condition.notify()
+
+    def _window(self):
+        if self.direction >= 0:
+            lo, hi = self.playhead - self.behind, self.playhead + self.ahead
+        else:
+            lo, hi = self.playhead - self.ahead, self.playhead + self.behind
+        return max(lo, 0), min(hi, self.last_index)
+
+    def _next_run(self):
+        """Next range of missing frames to decode, nearest to the playhead in play direction."""
+        if self.scrubbing or self.failed_generation == self.generation:
+            return None
+        playhead = self.playhead
+        lo, hi = self._window()
+        if self.direction >= 0:
+            order = (range(playhead, hi + 1), range(playhead - 1, lo - 1, -1))
+        else:
+            order = (range(playhead, lo - 1, -1), range(playhead + 1, hi + 1))
+        for candidates in order:
+            for index in candidates:
+                if index in self.cache:
+                    continue
+                start = end = index
+                if index < playhead:
+                    # 뒤쪽 프레임은 구간 시작부터 앞으로 한 번에 디코딩
+                    while start - 1 >= lo and start - 1 not in self.cache:
+                        start -= 1
+                    # 빈 구간이 chunk 만큼 모일 때까지 기다렸다가 한 번에 디코딩 (키프레임 탐색 횟수 줄임)
+                    if playhead - index > self.ahead - self.chunk:
+                        break
+                else:
+                    while end + 1 <= hi and end + 1 not in self.cache:
+                        end += 1
+                return start, end
+        return None
+
+    def _run(self):
+        frames = None
+        next_index = None
+        while True:
+            with self.condition:
+                while True:
+                    if self.stopped:
+                        return
+                    # 빠른 탐색 요청을 먼저 처리
+                    preview, self.preview_request = self.preview_request, None
+                    run = None if preview is not None else self._next_run()
+                    if preview is not None or run is not None:
+                        break
+                    self.condition.wait()
+                generation = self.generation
+
+            if preview is not None:
+                frames = None
+                self._decode_preview(preview)
+                continue
+
+            start, end = run
+            try:
+                # 바로 앞 구간에 이어지면 탐색 없이 계속 디코딩
+                if frames is None or start != next_index:
+                    frames = self.decoder.iter_frames(start)
+                    next_index = start
+                for index, frame in frames:
+                    if index > end:
+                        frames = None
+                        break
+                    height, width = frame.shape[:2]
+                    image = QImage(
+                        frame.data, width, height, frame.strides[0], QImage.Format_RGB888
+                    ).copy()
+                    next_index = index + 1
+                    stored = self.cache.put(index, image, self._window())
+                    if stored:
+                        self.frameDecoded.emit(index)
+                    if index == end or not stored or generation != self.generation:
+                        break
+                else:
+                    # 예상보다 일찍 끝남: 실제 마지막 프레임까지만 읽도록 줄임
+                    frames = None
+                    with self.condition:
+                        self.last_index = min(self.last_index, max(next_index - 1, 0))
+            except (OSError, ValueError, RuntimeError) as e:
+                print(f"Failed to decode frames {start}-{end}: {e}")
+                frames = None
+                with self.condition:
+                    self.failed_generation = generation
+
+    def _decode_preview(self, index):
+        try:
+            result = self.decoder.keyframe(index)
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"Failed to decode the keyframe before frame {index}: {e}")
+            return
+        if result is not None:
+            frame = result[1]
+            height, width = frame.shape[:2]
+            image = QImage(frame.data, width, height, frame.strides[0], QImage.Format_RGB888)
+            self.previewDecoded.emit(index, image.copy())
+
+
+class FrameView(QWidget):
+    """Shows the frames of a ``FramePlayer``, scaled to fit with black bars."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.image = None
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    def setImage(self, image):
+        self.image = image
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.black)
+        if self.image is not None:
+            size = self.image.size().scaled(self.size(), Qt.KeepAspectRatio)
+            rect = QRect(0, 0, size.width(), size.height())
+            rect.moveCenter(self.rect().center())
+            painter.drawImage(rect, self.image)
+        painter.end()
@@ -0,0 +1,56 @@
+from bisect import bisect_right
+
+
+class IntervalIndex:
+    """Static index answering "which intervals contain t" in O(log n + k log n).
+
+    Intervals are sorted by start and stored in the leaves of a segment tree whose inner nodes
+    keep the largest end in their subtree. A stabbing query only descends into the prefix of
+    intervals that start at or before ``t`` and prunes every subtree whose largest end is
+    before ``t``.
+
+    Args:
+        intervals (Iterable[tuple[int, int, object]]): ``(start, end, payload)`` triples. Both
+            ends are inclusive.
+    """
+
+    def __init__(self, intervals=()):
+        intervals = sorted(intervals, key=lambda interval: (interval[0], interval[1]))
+        self.starts = [interval[0] for interval in intervals]
+        self.ends = [interval[1] for interval in intervals]
+        self.payloads = [interval[2] for interval in intervals]
+
+        size = 1
+        while size < len(intervals):
+            size *= 2
+        self._size = size
+        self._max_end = [float("-inf")] * (2 * size)
+        self._max_end[size : size + len(intervals)] = self.ends
+        for node in range(size - 1, 0, -1):
+            self._max_end[node] = max(self._max_end[2 * node], self._max_end[2 * node + 1])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def at(self, t):
+        """Return the payloads of all intervals with ``start <= t <= end`` in start order."""
+        count = bisect_right(self.starts, t)
+        if count == 0 or self._max_end[1] < t:
+            return []
+
+        result = []
+        max_end = self._max_end
+        size = self._size
+        # (node, node 가 덮는 구간의 첫 leaf 위치, 구간 길이)
+        stack = [(1, 0, size)]
+        while stack:
+            node, first, width = stack.pop()
+            if first >= count or max_end[node] < t:
+                continue
+            if width == 1:
+                result.append(first)
+                continue
+            half = width // 2
+            stack.append((2 * node + 1, first + half, half))
+            stack.append((2 * node, first, half))
+        return [self.payloads[i] for i in result]
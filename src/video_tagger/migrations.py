@@ -0,0 +1,251 @@
+"""Versioned schema migrations for the tag database.
+
+Each migration upgrades the schema by exactly one version and runs inside the transaction opened
+by ``migrate``. The applied versions are recorded in the ``schema_version`` table. Databases
+created before the table existed are detected from their ``tags`` table and treated as version 1.
+"""
+
+from datetime import datetime, timezone
+
+SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        applied_at TEXT NOT NULL
+    )
+"""
+
+
+def _table_type(cursor, name):
+    cursor.execute("SELECT type FROM sqlite_master WHERE name = ?", (name,))
+    row = cursor.fetchone()
+    return row[0] if row is not None else None
+
+
+def _migrate_v1(cursor):
+    """Original schema: one row per tag with the name and type stored as text."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tags (
+            time_ms INTEGER,
+            tag_name TEXT,
+            tag_type TEXT,
+            PRIMARY KEY (time_ms, tag_name, tag_type)
+        )
+        """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_time_tag ON tags(time_ms ASC, tag_name ASC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tag_name ON tags(tag_name ASC)")
+
+
+def _migrate_v2(cursor):
+    """Dictionary-encode tag names and types.
+
+    ``tag_events`` stores integer keys into ``tag_names``/``tag_types`` and is clustered on its
+    primary key (``WITHOUT ROWID``), so time range scans read the table directly instead of
+    going through a separate index. ``tags`` becomes a view with the old columns so readers of
+    the previous schema (and the tag catalog) keep working.
+    """
+    cursor.execute(
+        """
+        CREATE TABLE tag_names (
+            name_id INTEGER PRIMARY KEY,
+            tag_name TEXT NOT NULL UNIQUE
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE tag_types (
+            type_id INTEGER PRIMARY KEY,
+            tag_type TEXT NOT NULL UNIQUE
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE tag_events (
+            time_ms INTEGER NOT NULL,
+            name_id INTEGER NOT NULL REFERENCES tag_names(name_id),
+            type_id INTEGER NOT NULL REFERENCES tag_types(type_id),
+            PRIMARY KEY (time_ms, name_id, type_id)
+        ) WITHOUT ROWID
+        """
+    )
+    cursor.execute("CREATE INDEX idx_events_name_time ON tag_events(name_id, time_ms)")
+
+    cursor.execute(
+        """
+        INSERT OR IGNORE INTO tag_names (tag_name)
+        SELECT DISTINCT COALESCE(tag_name, '') FROM tags
+        """
+    )
+    cursor.execute(
+        """
+        INSERT OR IGNORE INTO tag_types (tag_type)
+        SELECT DISTINCT COALESCE(tag_type, '') FROM tags
+        """
+    )
+    cursor.execute(
+        """
+        INSERT OR IGNORE INTO tag_events (time_ms, name_id, type_id)
+        SELECT tags.time_ms, tag_names.name_id, tag_types.type_id
+        FROM tags
+        JOIN tag_names ON tag_names.tag_name = COALESCE(tags.tag_name, '')
+        JOIN tag_types ON tag_types.tag_type = COALESCE(tags.tag_type, '')
+        WHERE tags.time_ms IS NOT NULL
+        """
+    )
+
+    # 이전 버전의 FTS 색인은 tags 테이블의 rowid 에 묶여 있으므로 제거
+    cursor.execute("DROP TRIGGER IF EXISTS tags_fts_insert")
+    cursor.execute("DROP TRIGGER IF EXISTS tags_fts_delete")
+    cursor.execute("DROP TABLE IF EXISTS tags_fts")
+    cursor.execute("DROP TABLE tags")
+
+    cursor.execute(
+        """
+        CREATE VIEW tags AS
+        SELECT tag_events.time_ms, tag_names.tag_name, tag_types.tag_type
+        FROM tag_events
+        JOIN tag_names ON tag_names.name_id = tag_events.name_id
+        JOIN tag_types ON tag_types.type_id = tag_events.type_id
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER tags_insert INSTEAD OF INSERT ON tags BEGIN
+            INSERT OR IGNORE INTO tag_names (tag_name) VALUES (new.tag_name);
+            INSERT OR IGNORE INTO tag_types (tag_type) VALUES (new.tag_type);
+            INSERT OR REPLACE INTO tag_events (time_ms, name_id, type_id)
+            VALUES (
+                new.time_ms,
+                (SELECT name_id FROM tag_names WHERE tag_name = new.tag_name),
+                (SELECT type_id FROM tag_types WHERE tag_type = new.tag_type)
+            );
+        END
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER tags_delete INSTEAD OF DELETE ON tags BEGIN
+            DELETE FROM tag_events
+            WHERE time_ms = old.time_ms
+                AND name_id = (SELECT name_id FROM tag_names WHERE tag_name = old.tag_name)
+                AND type_id = (SELECT type_id FROM tag_types WHERE tag_type = old.tag_type);
+        END
+        """
+    )
+
+
+def _migrate_v3(cursor):
+    """Record every tag insert and delete in ``tag_changes`` for incremental exports.
+
+    ``revision`` is ``AUTOINCREMENT`` so revisions keep increasing after old changes are pruned.
+    Existing tags are not logged; a new change feed starts from a snapshot of the current tags.
+    ``export_state`` keeps the last revision written to each change feed.
+    """
+    cursor.execute(
+        """
+        CREATE TABLE tag_changes (
+            revision INTEGER PRIMARY KEY AUTOINCREMENT,
+            op TEXT NOT NULL,
+            time_ms INTEGER NOT NULL,
+            name_id INTEGER NOT NULL,
+            type_id INTEGER NOT NULL
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE export_state (
+            target TEXT PRIMARY KEY,
+            revision INTEGER NOT NULL,
+            exported_at TEXT NOT NULL
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER tag_events_log_insert AFTER INSERT ON tag_events BEGIN
+            INSERT INTO tag_changes (op, time_ms, name_id, type_id)
+            VALUES ('add', new.time_ms, new.name_id, new.type_id);
+        END
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER tag_events_log_delete AFTER DELETE ON tag_events BEGIN
+            INSERT INTO tag_changes (op, time_ms, name_id, type_id)
+            VALUES ('remove', old.time_ms, old.name_id, old.type_id);
+        END
+        """
+    )
+
+    # 모든 컬럼이 기본 키이므로 REPLACE 는 같은 행을 지웠다 다시 넣어 변경 기록만 늘림
+    cursor.execute("DROP TRIGGER tags_insert")
+    cursor.execute(
+        """
+        CREATE TRIGGER tags_insert INSTEAD OF INSERT ON tags BEGIN
+            INSERT OR IGNORE INTO tag_names (tag_name) VALUES (new.tag_name);
+            INSERT OR IGNORE INTO tag_types (tag_type) VALUES (new.tag_type);
+            INSERT OR IGNORE INTO tag_events (time_ms, name_id, type_id)
+            VALUES (
+                new.time_ms,
+                (SELECT name_id FROM tag_names WHERE tag_name = new.tag_name),
+                (SELECT type_id FROM tag_types WHERE tag_type = new.tag_type)
+            );
+        END
+        """
+    )
+
+
+MIGRATIONS = [
+    (1, _migrate_v1),
+    (2, _migrate_v2),
+    (3, _migrate_v3),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(cursor):
+    if _table_type(cursor, "schema_version") is None:
+        # schema_version 테이블이 생기기 전의 DB
+        return 1 if _table_type(cursor, "tags") == "table" else 0
+    cursor.execute("SELECT MAX(version) FROM schema_version")
+    return cursor.fetchone()[0] or 0
+
+
+def migrate(conn, target_version=LATEST_VERSION):
+    """Upgrade the database to ``target_version``.
+
+    Returns:
+        list[int]: The versions that were applied, empty if the schema was already current.
+    """
+    cursor = conn.cursor()
+    try:
+        # 여러 연결이 동시에 열어도 마이그레이션은 한 번만 실행되도록 쓰기 잠금을 먼저 획득
+        cursor.execute("BEGIN IMMEDIATE")
+        current_version = get_schema_version(cursor)
+        cursor.execute(SCHEMA_VERSION_TABLE)
+        if current_version > 0:
+            cursor.execute(
+                "INSERT OR IGNORE INTO schema_version (version, applied_at) VALUES (?, ?)",
+                (current_version, datetime.now(timezone.utc).isoformat()),
+            )
+
+        applied = []
+        for version, migration in MIGRATIONS:
+            if current_version < version <= target_version:
+                migration(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, applied_at) VALUES (?, ?)",
+                    (version, datetime.now(timezone.utc).isoformat()),
+                )
+                applied.append(version)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return applied
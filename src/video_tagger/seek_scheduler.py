@@ -0,0 +1,74 @@
+from PyQt5.QtCore import QObject, QTimer
+
+
+class SeekScheduler(QObject):
+    """Coalesces seek requests so the player never falls behind the user.
+
+    Only one seek is in flight at a time. Requests made while it runs replace each other, and the
+    latest one is issued when the running seek finishes: when ``finished_signal`` fires (the
+    player reports a position or shows a frame) or, at the latest, after ``interval_ms``.
+    Dragging a slider or holding an arrow key therefore costs a few seeks instead of one per
+    pixel or key repeat, and the video stops where the user stopped.
+
+    Args:
+        player: ``QMediaPlayer`` or ``FramePlayer``.
+        finished_signal: Signal that marks the running seek as done. Defaults to
+            ``player.positionChanged``.
+        interval_ms (int): Longest wait for ``finished_signal`` before the next seek is issued.
+        fast_seek (bool): Pass ``exact=False`` seeks on to the player
+            (``FramePlayer.setPosition``) instead of treating them as exact seeks.
+    """
+
+    def __init__(self, player, finished_signal=None, interval_ms=100, fast_seek=False):
+        super().__init__(player)
+        self.player = player
+        self.fast_seek = fast_seek
+        self.pending = None
+        self.last_target = None
+        self.busy = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self._on_finished)
+        if finished_signal is None:
+            finished_signal = player.positionChanged
+        finished_signal.connect(self._on_finished)
+
+    def target(self):
+        """Where the video will be once the queued seeks are done."""
+        if self.pending is not None:
+            return self.pending[0]
+        if self.busy:
+            return self.last_target
+        return self.player.position()
+
+    def seek(self, position_ms, exact=True):
+        position_ms = max(int(position_ms), 0)
+        if self.busy:
+            self.pending = (position_ms, exact)
+            return
+        self._issue(position_ms, exact)
+
+    def seek_by(self, delta_ms):
+        """Seek relative to the last requested position, so repeated skips add up."""
+        self.seek(self.target() + delta_ms)
+
+    def _issue(self, position_ms, exact):
+        self.busy = True
+        self.last_target = position_ms
+        self.timer.start()
+        if self.fast_seek:
+            self.player.setPosition(position_ms, exact)
+        else:
+            self.player.setPosition(position_ms)
+
+    def _on_finished(self, *args):
+        if not self.busy:
+            return
+        self.busy = False
+        self.timer.stop()
+        if self.pending is not None:
+            position_ms, exact = self.pending
+            self.pending = None
+            self._issue(position_ms, exact)
@@ -0,0 +1,294 @@
+"""Streaming tag export.
+
+Rows are read from the database in chunks and written as they arrive, so memory use does not
+grow with the number of tags. Text formats (CSV, JSON Lines, JSON) write ``time_ms`` as integer
+milliseconds and ``datetime`` as ``YYYY-MM-DD HH:MM:SS.fff`` UTC. Columnar formats (Parquet,
+Arrow IPC) write ``time_ms`` as int64 and ``datetime`` as a UTC millisecond timestamp. They need
+the optional ``pyarrow`` package.
+
+Output is written to a temporary file in the target directory and renamed over the target only
+once it is complete, so an interrupted export never leaves a truncated file behind.
+
+The ``changes`` format is incremental: it appends the tag additions and removals made since the
+previous export to a JSON Lines change feed and records the exported revision in the database.
+"""
+
+import csv
+import json
+import os
+from datetime import datetime, timedelta
+
+EXPORT_FORMATS = {
+    "csv": ".csv",
+    "jsonl": ".jsonl",
+    "json": ".json",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+    "changes": ".changes.jsonl",
+}
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def export_filename(db_path, export_format):
+    return os.path.splitext(db_path)[0] + EXPORT_FORMATS[export_format]
+
+
+def _columns(video_start_time):
+    if video_start_time is None:
+        return ["time_ms", "tag_name", "tag_type"]
+    return ["datetime", "time_ms", "tag_name", "tag_type"]
+
+
+def _text_rows(chunk, video_start_time):
+    if video_start_time is None:
+        return chunk
+    return [
+        (
+            (video_start_time + timedelta(milliseconds=time_ms)).isoformat(
+                sep=" ", timespec="milliseconds"
+            ),
+            time_ms,
+            tag_name,
+            tag_type,
+        )
+        for time_ms, tag_name, tag_type in chunk
+    ]
+
+
+def _write_csv(chunks, f, video_start_time):
+    writer = csv.writer(f)
+    writer.writerow(_columns(video_start_time))
+    for chunk in chunks:
+        writer.writerows(_text_rows(chunk, video_start_time))
+        yield len(chunk)
+
+
+def _write_jsonl(chunks, f, video_start_time):
+    columns = _columns(video_start_time)
+    for chunk in chunks:
+        f.writelines(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n"
+            for row in _text_rows(chunk, video_start_time)
+        )
+        yield len(chunk)
+
+
+def _write_json(chunks, f, video_start_time):
+    columns = _columns(video_start_time)
+    f.write("[")
+    separator = "\n"
+    for chunk in chunks:
+        for row in _text_rows(chunk, video_start_time):
+            f.write(separator + json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+            separator = ",\n"
+        yield len(chunk)
+    f.write("\n]\n")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise RuntimeError(
+            "Parquet/Arrow files need the optional 'pyarrow' package "
+            "(poetry install --extras arrow, or pip install pyarrow)"
+        ) from e
+    return pa
+
+
+def _arrow_schema(pa, video_start_time):
+    fields = [
+        pa.field("time_ms", pa.int64()),
+        pa.field("tag_name", pa.string()),
+        pa.field("tag_type", pa.string()),
+    ]
+    if video_start_time is not None:
+        fields.insert(0, pa.field("datetime", pa.timestamp("ms", tz="UTC")))
+    return pa.schema(fields)
+
+
+def _arrow_batch(pa, schema, chunk, start_epoch_ms):
+    time_ms, tag_names, tag_types = zip(*chunk) if chunk else ((), (), ())
+    columns = [
+        pa.array(time_ms, pa.int64()),
+        pa.array(tag_names, pa.string()),
+        pa.array(tag_types, pa.string()),
+    ]
+    if start_epoch_ms is not None:
+        epoch_ms = [start_epoch_ms + t for t in time_ms]
+        columns.insert(0, pa.array(epoch_ms, pa.int64()).cast(schema.field("datetime").type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def _start_epoch_ms(video_start_time):
+    if video_start_time is None:
+        return None
+    # video_start_time 은 UTC 기준의 naive datetime
+    elapsed = video_start_time.replace(tzinfo=None) - datetime(1970, 1, 1)
+    return elapsed // timedelta(milliseconds=1)
+
+
+def _write_columnar(chunks, filename, video_start_time, export_format):
+    pa = _import_pyarrow()
+    schema = _arrow_schema(pa, video_start_time)
+    start_epoch_ms = _start_epoch_ms(video_start_time)
+    if export_format == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(filename, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(filename, schema)
+    try:
+        for chunk in chunks:
+            writer.write_batch(_arrow_batch(pa, schema, chunk, start_epoch_ms))
+            yield len(chunk)
+    finally:
+        writer.close()
+
+
+def _fsync(filename):
+    with open(filename, "rb") as f:
+        os.fsync(f.fileno())
+
+
+def _remove(filename):
+    try:
+        os.remove(filename)
+    except FileNotFoundError:
+        pass
+
+
+def iter_export(db, filename, export_format="csv", video_start_time=None, chunk_size=None):
+    """Write all tags of ``db`` to ``filename``, yielding the number of rows per written chunk.
+
+    Args:
+        db (TagDatabase): Source database.
+        filename (str): Output path.
+        export_format (str): One of ``EXPORT_FORMATS``.
+        video_start_time (datetime, optional): UTC start of the video. Adds a ``datetime``
+            column when set.
+        chunk_size (int, optional): Rows read from the database per chunk.
+
+    Closing the generator before it is exhausted discards the partial output and leaves any
+    existing ``filename`` untouched.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    if export_format == "changes":
+        yield from iter_export_changes(db, filename, video_start_time, chunk_size)
+        return
+
+    chunks = db.iter_tags(chunk_size or DEFAULT_CHUNK_SIZE)
+    output_dir = os.path.dirname(filename)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    # 같은 디렉터리에 써야 os.replace 가 원자적으로 동작
+    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+    try:
+        if export_format in ("parquet", "arrow"):
+            yield from _write_columnar(chunks, tmp_filename, video_start_time, export_format)
+        else:
+            writers = {"csv": _write_csv, "jsonl": _write_jsonl, "json": _write_json}
+            with open(tmp_filename, "w", encoding="utf-8", newline="") as f:
+                yield from writers[export_format](chunks, f, video_start_time)
+        _fsync(tmp_filename)
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        # GeneratorExit (취소) 포함
+        _remove(tmp_filename)
+        raise
+    finally:
+        chunks.close()
+
+
+def _change_records(chunk, video_start_time):
+    columns = ["revision", "op"] + _columns(video_start_time)
+    if video_start_time is None:
+        return [dict(zip(columns, row)) for row in chunk]
+    return [
+        dict(zip(columns, row[:2] + text_row))
+        for row, text_row in zip(chunk, _text_rows([row[2:] for row in chunk], video_start_time))
+    ]
+
+
+def _truncate_partial_line(f):
+    """Drop a trailing line left incomplete by a crash during an earlier append."""
+    size = f.seek(0, os.SEEK_END)
+    if size == 0:
+        return
+    f.seek(size - 1)
+    if f.read(1) == b"\n":
+        return
+    block_end = size
+    while block_end > 0:
+        block_start = max(0, block_end - 65536)
+        f.seek(block_start)
+        newline = f.read(block_end - block_start).rfind(b"\n")
+        if newline >= 0:
+            f.truncate(block_start + newline + 1)
+            return
+        block_end = block_start
+    f.truncate(0)
+
+
+def iter_export_changes(db, filename, video_start_time=None, chunk_size=None):
+    """Append the changes since the last export of ``filename`` to it as JSON Lines.
+
+    Each line has ``revision``, ``op`` (``add`` or ``remove``) and the tag columns. A feed that
+    is new, or whose last export predates pruned changes, first gets a ``reset`` line followed by
+    an ``add`` line for every current tag. Consumers apply lines in order and may skip lines
+    with a revision they have already applied. Yields the number of lines per written chunk.
+
+    The exported revision is recorded in ``db`` only after the appended lines are synced. If the
+    generator is closed early, the file is truncated back to its previous size.
+    """
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    target = os.path.basename(filename)
+    output_dir = os.path.dirname(filename)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    # 변경 기록과 스냅샷을 같은 시점에서 읽도록 읽기 트랜잭션을 염
+    db.conn.execute("BEGIN")
+    try:
+        revision = db.revision
+        last_revision = db.get_export_revision(target)
+        if last_revision is None or last_revision < db.change_horizon():
+            snapshot = db.iter_tags(chunk_size)
+            header = [{"revision": revision, "op": "reset"}]
+            chunks = ([(revision, "add") + row for row in chunk] for chunk in snapshot)
+        else:
+            header = []
+            chunks = db.iter_changes(last_revision, revision, chunk_size)
+
+        with open(filename, "ab+") as f:
+            _truncate_partial_line(f)
+            start_size = f.tell()
+            try:
+                lines = [json.dumps(record) + "\n" for record in header]
+                f.write("".join(lines).encode("utf-8"))
+                for chunk in chunks:
+                    records = _change_records(chunk, video_start_time)
+                    f.write(
+                        "".join(
+                            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+                        ).encode("utf-8")
+                    )
+                    yield len(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                f.truncate(start_size)
+                raise
+            finally:
+                chunks.close()
+    finally:
+        db.conn.commit()
+    db.set_export_revision(target, revision)
+    db.prune_changes()
+
+
+def export_tags(db, filename, export_format="csv", video_start_time=None, chunk_size=None):
+    """Write all tags of ``db`` to ``filename`` and return the number of rows written."""
+    return sum(iter_export(db, filename, export_format, video_start_time, chunk_size))
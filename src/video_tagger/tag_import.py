@@ -0,0 +1,160 @@
+"""Streaming tag import.
+
+Reads tag files in the layouts written by ``tag_export`` (CSV, JSON Lines, JSON, Parquet, Arrow
+IPC) and yields ``(time_ms, tag_name, tag_type)`` rows in chunks, so files larger than memory can
+be imported. A ``datetime`` column, if present, is ignored; ``time_ms`` is authoritative. Besides
+integer milliseconds, ``time_ms`` may be a timedelta, as in the ``0 days 00:00:01.234000`` text
+of CSV files saved by earlier versions of the app. Parquet and Arrow need the optional
+``pyarrow`` package.
+"""
+
+import csv
+import json
+import os
+import re
+
+import pandas as pd
+
+from .tag_export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, _import_pyarrow
+
+# 변경 피드(changes)는 태그 목록이 아니므로 가져올 수 없음
+IMPORT_FORMATS = {fmt: ext for fmt, ext in EXPORT_FORMATS.items() if fmt != "changes"}
+COLUMNS = ("time_ms", "tag_name", "tag_type")
+_JSON_READ_SIZE = 1 << 16
+_SEPARATOR = re.compile(r"[\s,]*")
+
+
+def guess_import_format(filename):
+    """Guess the import format from the file extension."""
+    extension = os.path.splitext(filename)[1].lower()
+    for fmt, fmt_extension in IMPORT_FORMATS.items():
+        if extension == fmt_extension:
+            return fmt
+    raise ValueError(f'Unknown tag file format: "{filename}"')
+
+
+def _time_ms(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        # pandas 로 만든 파일은 "1000.0" 처럼 실수로 저장되어 있을 수 있음
+        return int(float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        # 이전 버전의 앱은 time_ms 를 pandas timedelta 문자열 ("0 days 00:00:01.234000") 로 저장
+        # timedelta / timedelta64 값도 여기서 변환
+        return pd.Timedelta(value) // pd.Timedelta(milliseconds=1)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid time_ms "{value}" in tag file') from None
+
+
+def _row(record):
+    try:
+        return _time_ms(record["time_ms"]), str(record["tag_name"]), str(record["tag_type"])
+    except KeyError as e:
+        raise ValueError(f"Missing column {e} in tag file") from None
+
+
+def _chunked(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _read_csv(f):
+    reader = csv.reader(f)
+    header = next(reader, [])
+    missing = [column for column in COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f"Missing column(s) {missing} in tag file")
+    time_index, name_index, type_index = (header.index(column) for column in COLUMNS)
+    for record in reader:
+        if record:
+            yield _time_ms(record[time_index]), record[name_index], record[type_index]
+
+
+def _read_jsonl(f):
+    for line in f:
+        if line.strip():
+            yield _row(json.loads(line))
+
+
+def _read_json(f):
+    """Yield the objects of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buffer = f.read(_JSON_READ_SIZE).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("Expected a JSON array of tags")
+    pos = 1
+    eof = False
+    while True:
+        # 버퍼를 자르지 않고 위치만 옮겨 객체마다 문자열을 복사하지 않도록 함
+        pos = _SEPARATOR.match(buffer, pos).end()
+        if buffer.startswith("]", pos):
+            return
+        try:
+            record, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # 객체가 읽은 블록 경계에 걸친 경우 더 읽어서 다시 시도
+            if eof:
+                raise
+            block = f.read(_JSON_READ_SIZE)
+            eof = not block
+            buffer = buffer[pos:] + block
+            pos = 0
+            continue
+        yield _row(record)
+
+
+def _read_columnar(filename, import_format, chunk_size):
+    pa = _import_pyarrow()
+    if import_format == "parquet":
+        import pyarrow.parquet as pq
+
+        batches = pq.ParquetFile(filename).iter_batches(batch_size=chunk_size, columns=COLUMNS)
+    else:
+        reader = pa.ipc.open_file(filename)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    for batch in batches:
+        missing = [column for column in COLUMNS if column not in batch.schema.names]
+        if missing:
+            raise ValueError(f"Missing column(s) {missing} in tag file")
+        time_ms = batch.column("time_ms")
+        if pa.types.is_duration(time_ms.type):
+            # pandas 의 timedelta 열은 duration 으로 저장됨
+            time_ms = time_ms.cast(pa.duration("ms"), safe=False).cast(pa.int64())
+        columns = [time_ms.to_pylist()] + [
+            batch.column(column).to_pylist() for column in COLUMNS[1:]
+        ]
+        yield list(zip(*columns))
+
+
+def iter_import(filename, import_format=None, chunk_size=None):
+    """Yield the tags stored in ``filename`` as lists of ``(time_ms, tag_name, tag_type)``.
+
+    Args:
+        filename (str): Tag file written by ``tag_export`` or with the same columns.
+        import_format (str, optional): One of ``IMPORT_FORMATS``. Guessed from the extension
+            when omitted.
+        chunk_size (int, optional): Rows per yielded chunk.
+    """
+    import_format = import_format or guess_import_format(filename)
+    if import_format not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format: {import_format}")
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+
+    if import_format in ("parquet", "arrow"):
+        yield from _read_columnar(filename, import_format, chunk_size)
+        return
+
+    readers = {"csv": _read_csv, "jsonl": _read_jsonl, "json": _read_json}
+    with open(filename, "r", encoding="utf-8", newline="") as f:
+        yield from _chunked(readers[import_format](f), chunk_size)
@@ -0,0 +1,128 @@
+from bisect import bisect_left
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+
+from .utils import format_time
+
+# 정렬과 탐색에 쓰는 숫자 시간 (ms)
+TIME_ROLE = Qt.UserRole + 1
+
+
+class TagListModel(QAbstractTableModel):
+    """Table model over a tag list owned and kept sorted by time by a tag manager.
+
+    The model does not copy tags or build items. Row text is formatted in ``data()`` only for
+    the rows a view actually paints, so a list of 100k tags costs nothing until it is scrolled.
+    The owner changes its list first and then reports the change with ``insert_rows`` or
+    ``remove_rows``; the model keeps its own row count, so views see the old count until the
+    change is announced.
+
+    Args:
+        tags (list[dict]): The owner's tag list, sorted by ``time_ms(tag)``.
+        time_ms (callable): Tag -> position in the video in ms. Defaults to ``tag["time_ms"]``.
+        label (callable): Tag -> text shown after the time. Defaults to ``tag["tag_name"]``.
+    """
+
+    TEXT_COLUMN = 0
+    TIME_COLUMN = 1
+    LABEL_COLUMN = 2
+    HEADERS = ["Tag", "Time", "Label"]
+
+    def __init__(self, tags=None, time_ms=None, label=None, parent=None):
+        super().__init__(parent)
+        self.time_ms = time_ms or (lambda tag: tag["time_ms"])
+        self.label = label or (lambda tag: tag["tag_name"])
+        self._tags = tags if tags is not None else []
+        self._row_count = len(self._tags)
+
+    def set_tags(self, tags):
+        """Show a new tag list, e.g. after loading or importing tags."""
+        self.beginResetModel()
+        self._tags = tags
+        self._row_count = len(tags)
+        self.endResetModel()
+
+    def insert_rows(self, first, count):
+        """Announce ``count`` tags the owner inserted at ``first``."""
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), first, first + count - 1)
+        self._row_count += count
+        self.endInsertRows()
+
+    def remove_rows(self, first, count):
+        """Announce ``count`` tags the owner removed at ``first``."""
+        if count <= 0:
+            return
+        self.beginRemoveRows(QModelIndex(), first, first + count - 1)
+        self._row_count -= count
+        self.endRemoveRows()
+
+    def tag(self, row):
+        return self._tags[row]
+
+    def nearest_row(self, time_ms):
+        """Row of the tag closest to ``time_ms`` (binary search), or -1 if there are no tags."""
+        if self._row_count == 0:
+            return -1
+        row = bisect_left(self._tags, time_ms, hi=self._row_count, key=self.time_ms)
+        if row == self._row_count or (
+            row > 0
+            and time_ms - self.time_ms(self._tags[row - 1])
+            <= self.time_ms(self._tags[row]) - time_ms
+        ):
+            row -= 1
+        return row
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        tag = self._tags[index.row()]
+        if role == Qt.DisplayRole:
+            column = index.column()
+            if column == self.TEXT_COLUMN:
+                return f"[{format_time(self.time_ms(tag))}] {self.label(tag)}"
+            if column == self.TIME_COLUMN:
+                return format_time(self.time_ms(tag))
+            return self.label(tag)
+        if role == TIME_ROLE:
+            return self.time_ms(tag)
+        if role == Qt.UserRole:
+            return tag
+        return None
+
+
+class TagFilterProxyModel(QSortFilterProxyModel):
+    """Filters a ``TagListModel`` by a tag predicate and sorts numerically by time.
+
+    The source is already in time order, so the proxy keeps that order unless ``sort()`` is
+    called explicitly.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._predicate = None
+        self.setSortRole(TIME_ROLE)
+        self.setFilterKeyColumn(TagListModel.LABEL_COLUMN)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+    def set_predicate(self, predicate):
+        """Show only tags for which ``predicate(tag)`` is true; None shows all tags."""
+        self._predicate = predicate
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._predicate is not None and not self._predicate(self.sourceModel().tag(source_row)):
+            return False
+        return super().filterAcceptsRow(source_row, source_parent)
@@ -1,99 +1,325 @@
-import pandas as pd
-from PyQt5.QtCore import QObject, Qt, pyqtSignal
-from PyQt5.QtWidgets import QListWidgetItem
+import re
+import sqlite3
+import unicodedata
+from bisect import bisect_left
+
+from PyQt5.QtCore import QObject, pyqtSignal
 
 from .database import TagDatabase
-from .utils import format_time, load_json, save_json
+from .export_job import ExportJob, ExportJobRunner
+from .tag_export import export_filename
+from .tag_import import iter_import
+from .tag_writer import REMOVE, TagWriter
+
+# FTS5 의 unicode61 토크나이저처럼 문자와 숫자가 이어진 부분을 한 단어로 봄
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _words(text):
+    # unicode61 과 같이 대소문자와 발음 구별 기호를 무시 ("Été" -> "ete")
+    text = unicodedata.normalize("NFKD", str(text).casefold())
+    return _WORD.findall("".join(c for c in text if not unicodedata.combining(c)))
 
 
 class TagManager(QObject):
-    tagAdded = pyqtSignal(QListWidgetItem)
+    # (첫 행, 개수): 정렬된 store 에서 바뀐 위치, 목록 모델이 그대로 반영
+    tagsInserted = pyqtSignal(int, int)
+    tagsRemoved = pyqtSignal(int, int)
+    tagsLoaded = pyqtSignal(list)
+    tagsChanged = pyqtSignal()
+    writeFailed = pyqtSignal(str)
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, export_options=None, import_options=None):
         super().__init__()
         self.parent = parent
+        self.export_options = export_options or {}
+        self.import_options = import_options or {}
+        self.export_format = self.export_options.get("format", "csv")
         self.db_path = None
         self.db = None
+        self.db_options = {}
+        self.writer = None
+        self.export_runner = ExportJobRunner(self.export_options.get("max_workers", 2))
+        self.export_runner.progress.connect(self.on_export_progress)
+        self.export_runner.finished.connect(self.on_export_finished)
+        self.export_runner.failed.connect(self.on_export_failed)
+        self.export_runner.cancelled.connect(self.on_export_cancelled)
         self.video_start_time = None
+        # DB 내용을 (time_ms, tag_name, tag_type) 순으로 정렬해 메모리에 보관
+        self._keys = []
+        self._tags = []
 
-    def load_db(self, db_path):
-        self.db = TagDatabase(db_path)
+    def load_db(self, db_path, writer_options=None, **db_options):
+        """Open ``db_path`` and start the writer. Call ``load_tags_from_db`` to read the tags."""
+        self.close()
+        self.db = TagDatabase(db_path, **db_options)
         self.db_path = db_path
+        self.db_options = db_options
 
-    def add_tag(self, tag):
-        tag_time = tag.get("time_ms")
-        tag_name = tag.get("tag_name")
-        tag_type = tag.get("tag_type")
-        tag_text = f"[{format_time(tag_time)}] {tag_name}"
-        item = QListWidgetItem(tag_text)
-        item.setData(Qt.UserRole, tag)
-        self.db.add_tag(tag_time, tag_name, tag_type)
-        self.tagAdded.emit(item)
+        writer_options = dict(writer_options or {})
+        if writer_options.pop("enabled", True):
+            self.writer = TagWriter(db_path, db_options, **writer_options)
+            self.writer.writeFailed.connect(self.on_write_failed)
+            self.writer.start()
 
-    def get_tags(self):
-        tags = self.db.load_tags()
-        tags = [
+    def _load_store(self):
+        rows = self.db.load_tags()
+        self._keys = rows
+        self._tags = [
             {
                 "time_ms": time_ms,
                 "tag_name": tag_name,
                 "tag_type": tag_type,
             }
-            for time_ms, tag_name, tag_type in tags
+            for time_ms, tag_name, tag_type in rows
         ]
+
+    def flush(self):
+        """Wait until queued tag changes are committed; False if the writer could not do it."""
+        # 내보내기 worker 스레드에서도 호출되므로 한 번만 읽음
+        writer = self.writer
+        return writer is None or writer.flush()
+
+    def _write_behind(self):
+        # 쓰기 스레드가 DB 를 열지 못하고 끝났으면 변경을 큐에 넣지 않고 바로 씀
+        return self.writer is not None and self.writer.is_alive()
+
+    def close(self):
+        # 진행 중인 내보내기는 끝까지 기다림 (DB 를 바꾸기 전에 요청한 저장이 사라지지 않도록)
+        self.export_runner.wait()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self.db is not None:
+            # 모든 변경 피드가 이미 내보낸 변경 기록은 정리
+            self.db.prune_changes()
+            self.db.close()
+            self.db = None
+        self._keys = []
+        self._tags = []
+
+    def on_write_failed(self, message):
+        print(message)
+        self.writeFailed.emit(message)
+        # 저장에 실패한 변경은 메모리에서도 되돌림
+        self.flush()
+        if self.writer is not None and not self.writer.is_alive():
+            # 이후 변경은 GUI 스레드의 연결로 바로 저장
+            self.writer = None
+        self.load_tags_from_db()
+
+    def add_tag(self, tag):
+        tag_time = tag.get("time_ms")
+        tag_name = tag.get("tag_name")
+        tag_type = tag.get("tag_type")
+        key = (tag_time, tag_name, tag_type)
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return
+        self._keys.insert(index, key)
+        self._tags.insert(index, tag)
+
+        if self._write_behind():
+            self.writer.add_tag(tag_time, tag_name, tag_type)
+        else:
+            self.db.add_tag(tag_time, tag_name, tag_type)
+        self.tagsInserted.emit(index, 1)
+        self.tagsChanged.emit()
+
+    @property
+    def tag_count(self):
+        return len(self._tags)
+
+    @property
+    def tags(self):
+        """The sorted store itself (not a copy) for list models; do not modify it."""
+        return self._tags
+
+    def get_tags(self):
+        return list(self._tags)
+
+    def get_tags_in_range(self, start_ms, end_ms, tag_names=None, tag_types=None):
+        """Return tags with ``start_ms <= time_ms < end_ms`` from the in-memory store."""
+        start = bisect_left(self._keys, (start_ms,))
+        end = bisect_left(self._keys, (end_ms,), lo=start)
+        tags = self._tags[start:end]
+        if tag_names is not None:
+            tag_names = set(tag_names)
+            tags = [tag for tag in tags if tag["tag_name"] in tag_names]
+        if tag_types is not None:
+            tag_types = set(tag_types)
+            tags = [tag for tag in tags if tag["tag_type"] in tag_types]
         return tags
 
-        # return self.db.load_tags()
-        # return self.tags
+    def search_tags(self, query, tag_types=None):
+        """Search tag names with ``TagDatabase.search_tags`` (FTS5), ordered by time.
+
+        Changes still queued for the writer are merged into the database result, so the search
+        matches the in-memory store without waiting for the writer.
+        """
+        if not query.split():
+            return self.get_tags()
+        # 큐를 DB 보다 먼저 읽어야 그 사이에 커밋된 변경이 양쪽 모두에서 빠지지 않음
+        pending = self.writer.pending() if self.writer is not None else []
+        keys = set(self.db.search_tags(query, tag_types))
+        if tag_types is not None:
+            tag_types = set(tag_types)
+        for kind, time_ms, tag_name, tag_type in pending:
+            key = (time_ms, tag_name, tag_type)
+            if kind == REMOVE:
+                keys.discard(key)
+            elif (tag_types is None or tag_type in tag_types) and self.tag_name_matches(
+                query, tag_name
+            ):
+                keys.add(key)
+
+        tags = []
+        for key in sorted(keys):
+            index = bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                tags.append(self._tags[index])
+        return tags
+
+    def tag_name_matches(self, query, tag_name):
+        """Whether ``search_tags(query)`` matches ``tag_name``, checked without the database."""
+        if not self.db.has_fts:
+            # LIKE 과 같이 부분 문자열 검색 (ASCII 대소문자 무시)
+            return query.strip().lower() in tag_name.lower()
+        words = _words(tag_name)
+        return all(any(word.startswith(term) for word in words) for term in _words(query))
 
     def remove_tag(self, tag_time, tag_name, tag_type):
-        # self.tags.remove((tag_time, tag_name))
-        print(f"Removed tag_time: {tag_time}, tag_name: {tag_name}, tag_type: {tag_type}")
-        self.db.remove_tag(tag_time, tag_name, tag_type)
+        self.remove_tags([(tag_time, tag_name, tag_type)])
+
+    def remove_tags(self, keys):
+        """Remove several ``(time_ms, tag_name, tag_type)`` tags at once.
+
+        Each run of adjacent rows is removed with one slice and one ``tagsRemoved`` signal. Keys
+        that are not in the store are ignored.
+        """
+        rows = set()
+        for key in keys:
+            index = bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                rows.add(index)
+
+        if not rows:
+            return
+
+        # 뒤에서부터 지워야 앞쪽 행 번호가 바뀌지 않음
+        rows = sorted(rows)
+        removed = [self._keys[row] for row in rows]
+        end = len(rows)
+        while end:
+            start = end - 1
+            while start > 0 and rows[start - 1] == rows[start] - 1:
+                start -= 1
+            first, last = rows[start], rows[end - 1]
+            del self._keys[first : last + 1]
+            del self._tags[first : last + 1]
+            self.tagsRemoved.emit(first, last - first + 1)
+            end = start
+
+        if self._write_behind():
+            for tag_time, tag_name, tag_type in removed:
+                self.writer.remove_tag(tag_time, tag_name, tag_type)
+        else:
+            self.db.apply_batch((REMOVE, *key) for key in removed)
+        print(f"Removed {len(removed)} tag(s)")
+        self.tagsChanged.emit()
 
     def load_tags_from_db(self):
-        tags = self.get_tags()
-        for tag in tags:
-            self.add_tag(tag)
+        # 이미 DB에 있는 태그이므로 다시 쓰지 않고 한 번에 전달
+        self._load_store()
+        self.tagsLoaded.emit(self.get_tags())
         print(f'Successfully loaded tags from database "{self.db_path}"')
 
     def set_video_start_time(self, start_time):
         self.video_start_time = start_time
 
-    def save_tags_to_json(self):
-        filename = self.db_path.replace(".db", ".json")
-        tags = self.db.load_tags()
-        columns = ["time_ms", "tag_name", "tag_type"]
-        df = pd.DataFrame(tags, columns=columns)
-        df.time_ms = pd.to_timedelta(df.time_ms, unit="ms")
+    def export_tags(self, export_format=None):
+        """Export all tags in the background; see ``ExportJobRunner`` for how saves coalesce."""
+        export_format = export_format or self.export_format
+        filename = export_filename(self.db_path, export_format)
+        job = ExportJob(
+            self.db_path,
+            filename,
+            export_format,
+            self.video_start_time,
+            self.export_options.get("chunk_size"),
+            # 변경 피드는 바뀐 만큼만 쓰므로 전체 개수를 알 수 없음
+            total=self.tag_count if export_format != "changes" else 0,
+            db_options=self.db_options,
+            before=self.flush,
+        )
+        if not self.export_runner.submit(job):
+            self._show_message(f'Export to "{filename}" queued after the running one')
+
+    def cancel_exports(self):
+        if self.export_runner.is_running():
+            self.export_runner.cancel()
+
+    def _show_message(self, message, timeout=0):
+        if self.parent is not None:
+            self.parent.statusBar().showMessage(message, timeout)
+
+    def on_export_progress(self, filename, written, total):
+        percent = written * 100 // total if total else 100
+        self._show_message(f'Saving tags to "{filename}"... {written}/{total} ({percent}%)')
 
-        if self.video_start_time is not None:
-            df["datetime"] = self.video_start_time + df.time_ms
-            df = df[["datetime", "time_ms", "tag_name", "tag_type"]]
+    def on_export_finished(self, filename, count):
+        self._show_message(f'Successfully saved {count} tags to "{filename}"', 5000)
+        print(f'Successfully saved {count} tags to "{filename}"')
 
-        json_data = df.to_dict(orient="records")
-        save_json(json_data, filename)
-        self.parent.statusBar().showMessage(f'Successfully saved tags to "{filename}"', 5000)
-        print(f'Successfully saved tags to "{filename}"')
+    def on_export_failed(self, filename, error):
+        message = f'Failed to save tags to "{filename}": {error}'
+        self._show_message(message, 10000)
+        print(message)
+
+    def on_export_cancelled(self, filename):
+        self._show_message(f'Cancelled saving tags to "{filename}"', 5000)
+        print(f'Cancelled saving tags to "{filename}"')
+
+    def save_tags_to_json(self):
+        self.export_tags("json")
 
     def save_tags_to_csv(self):
-        filename = self.db_path.replace(".db", ".csv")
-        tags = self.db.load_tags()
-        columns = ["time_ms", "tag_name", "tag_type"]
-        df = pd.DataFrame(tags, columns=columns)
-        df.time_ms = pd.to_timedelta(df.time_ms, unit="ms")
+        self.export_tags("csv")
 
-        if self.video_start_time is not None:
-            df["datetime"] = self.video_start_time + df.time_ms
-            df = df[["datetime", "time_ms", "tag_name", "tag_type"]]
+    def import_tags(self, filename, on_conflict=None, import_format=None):
+        """Import a tag file into the database in one transaction and reload the tag list once.
 
-        df.to_csv(filename, index=False)
-        self.parent.statusBar().showMessage(f'Successfully saved tags to "{filename}"', 5000)
-        print(f'Successfully saved tags to "{filename}"')
+        Returns:
+            ImportResult: Rows read, tags added and existing tags removed, or None on failure.
+        """
+        on_conflict = on_conflict or self.import_options.get("on_conflict", "skip")
+        # 큐에 남은 태그가 가져오기 뒤에 쓰여 충돌 정책을 거스르지 않도록
+        if not self.flush():
+            message = (
+                f'Failed to import tags from "{filename}": queued tag changes could not be saved'
+            )
+            self._show_message(message, 10000)
+            print(message)
+            return None
+        try:
+            result = self.db.import_tags(
+                iter_import(filename, import_format, self.import_options.get("chunk_size")),
+                on_conflict,
+            )
+        except (sqlite3.Error, OSError, RuntimeError, ValueError) as e:
+            message = f'Failed to import tags from "{filename}": {e}'
+            self._show_message(message, 10000)
+            print(message)
+            return None
+
+        self.load_tags_from_db()
+        message = (
+            f'Imported {result.added} of {result.read} tags from "{filename}"'
+            f" ({result.removed} replaced)"
+        )
+        self._show_message(message, 5000)
+        print(message)
+        return result
 
     def load_tags_from_json(self, filename="data/tagged_data/tags.json"):
-        json_data = [
-            (tag["time_ms"], tag["tag_name"], tag["tag_type"]) for tag in load_json(filename)
-        ]
-        for time_ms, tag_name, tag_type in json_data:
-            self.add_tag(time_ms, tag_name, tag_type)
-        print(f'Successfully loaded tags from "{filename}"')
+        return self.import_tags(filename, import_format="json")
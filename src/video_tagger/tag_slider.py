@@ -1,18 +1,112 @@
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QColor, QPainter, QPen
-from PyQt5.QtWidgets import QSlider, QStyleOptionSlider
+import numpy as np
+from PyQt5.QtCore import QEvent, QLine, QPoint, QRect, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QImage, QPainter, QPen, QPixmap
+from PyQt5.QtWidgets import QSlider, QStyleOptionSlider, QWidget
+
+from .utils import format_time
+
+# 확대했을 때 보이는 구간의 최소 길이
+MIN_VIEW_MS = 500
+# 휠 한 칸 (120) 당 확대/축소 배율
+ZOOM_STEP = 1.25
+# Shift + 휠 한 칸 당 이동 거리 (보이는 구간 길이 대비)
+PAN_STEP = 0.1
+# 재생 위치가 보이는 구간을 벗어나면 이 비율만큼 앞에 두고 다음 구간으로 넘김
+FOLLOW_MARGIN = 0.1
+
+
+def column_counts(groups, start_ms, end_ms, left, width, columns):
+    """Number of tags per pixel column for each marker group, shape (groups, columns).
+
+    ``start_ms`` ~ ``end_ms`` (in the groups' own time base) maps to pixels ``left`` ~
+    ``left + width``. Only tags inside that window are binned; they are found by binary search
+    on the sorted group times.
+    """
+    counts = np.zeros((len(groups), columns), dtype=np.int64)
+    span = end_ms - start_ms
+    if span <= 0:
+        return counts
+    for row, (_, times) in enumerate(groups):
+        visible = times[
+            np.searchsorted(times, start_ms) : np.searchsorted(times, end_ms, side="right")
+        ]
+        # fraction = 0.0 -> 그루브의 왼쪽 끝, 1.0 -> 오른쪽 끝
+        xs = (left + (visible - start_ms) / span * width).astype(np.int64)
+        xs = xs[(xs >= 0) & (xs < columns)]
+        counts[row] = np.bincount(xs, minlength=columns)
+    return counts
+
+
+def draw_density(painter, groups, counts, top_y, bottom_y):
+    """Stacked bars per pixel column; height ~ log(1 + tags), split by marker group.
+
+    The bars are filled into a NumPy pixel buffer and drawn as one image.
+    """
+    total = counts.sum(axis=0)
+    width = len(total)
+    height = bottom_y - top_y + 1
+    bar_height = np.log1p(total) / np.log1p(total.max()) * height
+    share = counts * np.divide(bar_height, total, out=np.zeros(width), where=total > 0)
+    # 아래에서부터 태그 이름 순서대로 쌓음: k 번째 이름은 edges[k + 1] <= y < edges[k] 행
+    edges = np.rint(height - np.cumsum(share, axis=0)).astype(np.int64)
+    edges = np.vstack([np.full(width, height), edges])
+    rows = np.arange(height)[:, None]
+    pixels = np.zeros((height, width), dtype=np.uint32)
+    for row, (color, _) in enumerate(groups):
+        pixels[(rows >= edges[row + 1]) & (rows < edges[row])] = color.rgba()
+    image = QImage(pixels.tobytes(), width, height, width * 4, QImage.Format_ARGB32)
+    painter.drawImage(0, top_y, image)
 
 
 class TagSlider(QSlider):
-    def __init__(self, config, orientation=Qt.Horizontal, parent=None):
+    """Slider with a line marker per tag, colored by tag name.
+
+    The markers are rendered once into a cached pixmap, one ``drawLines`` batch per tag name with
+    at most one line per pixel column. The pixmap is rebuilt only when the tags, time offset,
+    range, size or style change, so moving the handle during playback only blits it.
+
+    Tag times are binned per pixel column with ``np.bincount``. When some column holds more than
+    ``slider.lod_threshold`` tags, exact markers would only overdraw each other, so the layer
+    becomes a stacked density strip instead: bar height grows with the number of tags in the
+    column (log scale) and is split by tag name. Rendering cost is bounded by the widget width.
+
+    The slider range is the visible window of the video (``setDuration`` shows all of it). The
+    wheel zooms around the cursor, Shift + wheel pans, and only tags inside the window are
+    binned, so zooming stays cheap with many tags.
+
+    With a thumbnail provider set, hovering shows a preview of the frame under the cursor
+    without seeking the player; the player only seeks on click.
+    """
+
+    viewRangeChanged = pyqtSignal(int, int)
+    markersChanged = pyqtSignal()
+
+    def __init__(self, config, orientation=Qt.Horizontal, parent=None, time_key="time_ms"):
         super().__init__(orientation, parent)
         self.config = config
         self.tags = []  # 태그가 있는 위치(슬라이더 범위 내의 값)
+        # 태그 위치 = tag[time_key] - time_offset_ms (절대 시간으로 저장된 태그용)
+        self.time_key = time_key
+        self.time_offset_ms = 0
         self.marker_color = QColor("red")  # 마커 색상
         self.marker_width = 1  # 마커 선 굵기
         self.marker_height = 80  # 마커 선 높이(슬라이더 트랙 위/아래로 얼마나 그릴지)
 
         self.tag_color = {v["name"]: v["color"] for v in self.config.get("tags", [])}
+        # 한 픽셀 열에 이보다 많은 태그가 있으면 밀도 막대로 그림
+        self.lod_threshold = self.config.get("slider", {}).get("lod_threshold", 4)
+        # [(QColor, 태그 시간 배열)]: 태그 이름별로 묶은 마커
+        self.marker_groups = []
+        # 태그 이름 -> marker_groups 의 위치, 행마다 (태그 이름, 시간): 행 단위 추가/삭제용
+        self.marker_group_rows = {}
+        self.marker_keys = []
+        self.marker_layer = None
+        self.marker_layer_key = None
+        self.duration = 0
+        self.position_ms = 0
+        # 시간(ms) -> 미리보기 QImage (없으면 None)
+        self.thumbnail_provider = None
+        self.preview = None
 
     def setTags(self, tags):
         """
@@ -20,54 +114,401 @@ class TagSlider(QSlider):
         positions는 self.minimum() ~ self.maximum() 사이 값들의 리스트로 가정
         """
         self.tags = tags
-        self.update()
+        self.marker_keys = [(self.tag_name(tag), tag.get(self.time_key, 0)) for tag in tags]
+        self.marker_groups = self.group_markers(tags)
+        self.marker_group_rows = {
+            tag_name: row
+            for row, tag_name in enumerate(dict.fromkeys(k for k, _ in self.marker_keys))
+        }
+        self.markers_updated()
 
-    def paintEvent(self, event):
-        super().paintEvent(event)
+    def insert_rows(self, first, count):
+        """Add the markers of ``count`` tags the owner inserted into ``tags`` at ``first``.
 
-        painter = QPainter(self)
-        pen = QPen(self.marker_color)
-        pen.setWidth(self.marker_width)
-        painter.setPen(pen)
+        Only the groups of the new tags change, so adding a tag does not regroup all of them.
+        """
+        if count <= 0:
+            return
+        keys = [
+            (self.tag_name(tag), tag.get(self.time_key, 0))
+            for tag in self.tags[first : first + count]
+        ]
+        self.marker_keys[first:first] = keys
+        for tag_name, time_ms in keys:
+            row = self.marker_group_rows.get(tag_name)
+            if row is None:
+                self.marker_group_rows[tag_name] = len(self.marker_groups)
+                color = QColor(self.tag_color.get(tag_name, "red"))
+                self.marker_groups.append((color, np.array([time_ms], dtype=np.int64)))
+                continue
+            color, times = self.marker_groups[row]
+            times = np.insert(times, np.searchsorted(times, time_ms), time_ms)
+            self.marker_groups[row] = (color, times)
+        self.markers_updated()
 
+    def remove_rows(self, first, count):
+        """Remove the markers of ``count`` tags the owner removed from ``tags`` at ``first``."""
+        if count <= 0:
+            return
+        keys = self.marker_keys[first : first + count]
+        del self.marker_keys[first : first + count]
+        for tag_name, time_ms in keys:
+            row = self.marker_group_rows[tag_name]
+            color, times = self.marker_groups[row]
+            self.marker_groups[row] = (color, np.delete(times, np.searchsorted(times, time_ms)))
+        if any(len(times) == 0 for _, times in self.marker_groups):
+            # 마지막 태그가 지워진 이름의 묶음은 없앰 (드묾)
+            names = list(self.marker_group_rows)
+            kept = [row for row, (_, times) in enumerate(self.marker_groups) if len(times)]
+            self.marker_groups = [self.marker_groups[row] for row in kept]
+            self.marker_group_rows = {names[row]: i for i, row in enumerate(kept)}
+        self.markers_updated()
+
+    def markers_updated(self):
+        self.invalidateMarkers()
+        self.markersChanged.emit()
+
+    def setTimeOffset(self, offset_ms):
+        """태그를 다시 설정하지 않고 모든 마커를 offset 만큼 옮김"""
+        if offset_ms != self.time_offset_ms:
+            self.time_offset_ms = offset_ms
+            self.update()
+            self.markersChanged.emit()
+
+    def setDuration(self, duration):
+        """영상 길이를 설정하고 전체 구간을 보여줌"""
+        self.duration = max(duration, 0)
+        self.resetZoom()
+
+    def resetZoom(self):
+        self.setViewRange(0, self.duration)
+
+    def isZoomed(self):
+        return self.maximum() - self.minimum() < self.duration
+
+    def setViewRange(self, start, end):
+        """보이는 구간 [start, end] (ms) 을 영상 길이 안으로 맞춰 슬라이더 범위로 설정"""
+        span = min(max(end - start, MIN_VIEW_MS), self.duration)
+        start = int(round(min(max(start, 0), self.duration - span)))
+        end = int(round(start + span))
+        if (start, end) != (self.minimum(), self.maximum()):
+            self.setRange(start, end)
+            self.setValue(self.position_ms)
+            self.viewRangeChanged.emit(start, end)
+
+    def setPosition(self, position):
+        """재생 위치를 표시; 재생이 보이는 구간을 벗어나면 다음 구간으로 넘김"""
+        start, end = self.minimum(), self.maximum()
+        # 사용자가 재생 위치와 다른 곳을 보고 있을 때는 따라가지 않음
+        if self.isZoomed() and start <= self.position_ms <= end and not start <= position <= end:
+            span = end - start
+            new_start = position - span * FOLLOW_MARGIN
+            self.position_ms = position
+            self.setViewRange(new_start, new_start + span)
+        self.position_ms = position
+        # 드래그 중에는 (탐색이 따라오는 동안) 핸들을 되돌리지 않고,
+        # 핸들이 같은 픽셀에 머무르면 다시 그리지 않음
+        if not self.isSliderDown() and self.handle_x(position) != self.handle_x(self.value()):
+            self.setValue(position)
+
+    def groove_rect(self):
         opt = QStyleOptionSlider()
         self.initStyleOption(opt)
-        groove_rect = self.style().subControlRect(
+        return self.style().subControlRect(
             self.style().CC_Slider, opt, self.style().SC_SliderGroove, self
         )
 
-        slider_min = self.minimum()
-        slider_max = self.maximum()
-        slider_range = slider_max - slider_min
+    def handle_x(self, value):
+        span = max(self.maximum() - self.minimum(), 1)
+        return int((value - self.minimum()) * self.groove_rect().width() / span)
+
+    def time_at(self, x):
+        groove_rect = self.groove_rect()
+        fraction = (x - groove_rect.left()) / max(groove_rect.width(), 1)
+        return self.minimum() + fraction * (self.maximum() - self.minimum())
+
+    def setThumbnailProvider(self, provider):
+        """Show hover previews from ``provider(time_ms)`` (QImage or None); None turns them off."""
+        self.thumbnail_provider = provider
+        self.setMouseTracking(provider is not None)
+        if provider is None:
+            self.hidePreview()
+
+    def hidePreview(self):
+        if self.preview is not None:
+            self.preview.hide()
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        if self.thumbnail_provider is None or event.buttons() or self.duration <= 0:
+            return
+        time_ms = int(min(max(self.time_at(event.x()), self.minimum()), self.maximum()))
+        if self.preview is None:
+            self.preview = ThumbnailPreview(self)
+        anchor = self.mapToGlobal(QPoint(event.x(), 0))
+        self.preview.show_at(anchor, self.thumbnail_provider(time_ms), format_time(time_ms))
+
+    def mousePressEvent(self, event):
+        self.hidePreview()
+        super().mousePressEvent(event)
+
+    def leaveEvent(self, event):
+        self.hidePreview()
+        super().leaveEvent(event)
+
+    def wheelEvent(self, event):
+        self.hidePreview()
+        if self.duration <= 0:
+            event.ignore()
+            return
+
+        delta = event.angleDelta()
+        start, end = self.minimum(), self.maximum()
+        span = end - start
+        if event.modifiers() & Qt.ShiftModifier or abs(delta.x()) > abs(delta.y()):
+            steps = (delta.x() or delta.y()) / 120
+            shift = -steps * PAN_STEP * span
+            self.setViewRange(start + shift, end + shift)
+        else:
+            # 커서 아래의 시각이 그대로 있도록 확대/축소
+            anchor = self.time_at(event.pos().x())
+            new_span = min(max(span * ZOOM_STEP ** (-delta.y() / 120), MIN_VIEW_MS), self.duration)
+            new_start = anchor - (anchor - start) * new_span / max(span, 1)
+            self.setViewRange(new_start, new_start + new_span)
+        event.accept()
+
+    def tag_name(self, tag):
+        tag_name = tag.get("tag_name", "")
+        if tag_name == "":
+            action_type = tag.get("action_type", "")
+            direction = tag.get("direction", "")
+            if not direction:
+                direction = ""
+
+            tag_name = f"{action_type} {direction}".strip()
+        return tag_name
+
+    def group_markers(self, tags):
+        groups = {}
+        for tag in tags:
+            groups.setdefault(self.tag_name(tag), []).append(tag.get(self.time_key, 0))
+        # 보이는 구간의 태그를 이진 탐색으로 찾도록 시간순 정렬
+        return [
+            (QColor(self.tag_color.get(tag_name, "red")), np.sort(np.array(times, dtype=np.int64)))
+            for tag_name, times in groups.items()
+        ]
+
+    def column_counts(self, groove_rect):
+        """Number of visible tags per pixel column for each marker group, shape (groups, width)."""
+        return column_counts(
+            self.marker_groups,
+            self.minimum() + self.time_offset_ms,
+            self.maximum() + self.time_offset_ms,
+            groove_rect.left(),
+            groove_rect.width(),
+            self.width(),
+        )
+
+    def invalidateMarkers(self):
+        self.marker_layer = None
+        self.update()
+
+    def changeEvent(self, event):
+        if event.type() in (QEvent.PaletteChange, QEvent.StyleChange):
+            self.marker_layer = None
+        super().changeEvent(event)
+
+    def render_markers(self, groove_rect):
+        ratio = self.devicePixelRatioF()
+        layer = QPixmap(self.size() * ratio)
+        layer.setDevicePixelRatio(ratio)
+        layer.fill(Qt.transparent)
+
+        counts = self.column_counts(groove_rect)
+        if not counts.any():
+            return layer
 
         y_center = groove_rect.center().y()
+        top_y = int(y_center - (self.marker_height / 2))
+        bottom_y = int(y_center + (self.marker_height / 2))
 
-        for tag in self.tags:
-            time_ms = tag.get("time_ms", 0)
-            tag_name = tag.get("tag_name", "")
-            if tag_name == "":
-                action_type = tag.get("action_type", "")
-                direction = tag.get("direction", "")
-                if not direction:
-                    direction = ""
+        painter = QPainter(layer)
+        pen = QPen(self.marker_color)
+        pen.setWidth(self.marker_width)
+        if counts.sum(axis=0).max() > self.lod_threshold:
+            draw_density(painter, self.marker_groups, counts, top_y, bottom_y)
+        else:
+            for (color, _), count in zip(self.marker_groups, counts):
+                # 같은 픽셀 열에 겹치는 마커는 한 번만 그림
+                xs = np.flatnonzero(count).tolist()
+                if xs:
+                    pen.setColor(color)
+                    painter.setPen(pen)
+                    painter.drawLines([QLine(x, top_y, x, bottom_y) for x in xs])
+        painter.end()
+        return layer
 
-                tag_name = f"{action_type} {direction}".strip()
+    def paintEvent(self, event):
+        super().paintEvent(event)
 
-            # time_ms, tag_name = tag["time_ms"], tag["tag_name"]
-            if slider_range == 0:
-                continue
-            fraction = (time_ms - slider_min) / slider_range
-            # fraction = 0.0 -> 그루브의 왼쪽 끝, 1.0 -> 오른쪽 끝
+        groove_rect = self.groove_rect()
+
+        # 핸들만 움직일 때는 캐시된 마커 레이어를 그대로 사용
+        key = (
+            self.size(),
+            self.devicePixelRatioF(),
+            self.minimum(),
+            self.maximum(),
+            self.time_offset_ms,
+            groove_rect,
+        )
+        if self.marker_layer is None or key != self.marker_layer_key:
+            self.marker_layer = self.render_markers(groove_rect)
+            self.marker_layer_key = key
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.marker_layer)
+        painter.end()
+
+
+class ThumbnailPreview(QWidget):
+    """Frameless popup above a slider with a thumbnail (if there is one) and its time."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.ToolTip | Qt.FramelessWindowHint)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.image = None
+        self.text = ""
+
+    def show_at(self, anchor, image, text):
+        """Show centered above the global position ``anchor``."""
+        self.image = image
+        self.text = text
+        text_width = self.fontMetrics().horizontalAdvance(text) + 8
+        text_height = self.fontMetrics().height() + 4
+        width = max(image.width() if image is not None else 0, text_width) + 2
+        height = (image.height() if image is not None else 0) + text_height + 2
+        self.setFixedSize(width, height)
+        self.move(anchor.x() - width // 2, anchor.y() - height - 2)
+        self.update()
+        self.show()
 
-            x = groove_rect.left() + fraction * groove_rect.width()
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#2e2e2e"))
+        top = 1
+        if self.image is not None:
+            painter.drawImage((self.width() - self.image.width()) // 2, top, self.image)
+            top += self.image.height()
+        painter.setPen(QColor("white"))
+        text_rect = QRect(0, top, self.width(), self.height() - top)
+        painter.drawText(text_rect, Qt.AlignCenter, self.text)
+        painter.end()
+
+
+class TimelineMinimap(QWidget):
+    """Whole-video overview under one or more zoomable ``TagSlider``s.
+
+    Each slider gets a row with its tag density over the whole video, the sliders' visible
+    window is outlined and the playhead is a line. Click or drag to move the window, double-click
+    to show the whole video again.
+    """
+
+    def __init__(self, sliders, parent=None, row_height=10):
+        super().__init__(parent)
+        self.sliders = sliders
+        self.position_ms = 0
+        self.layer = None
+        self.layer_key = None
+        self.background_color = QColor("#d0d0d0")
+        self.window_color = QColor("#555")
+        self.setFixedHeight(row_height * len(sliders))
+        for slider in sliders:
+            slider.viewRangeChanged.connect(lambda *_: self.update())
+            slider.markersChanged.connect(self.invalidate)
+
+    @property
+    def slider(self):
+        return self.sliders[0]
+
+    def invalidate(self):
+        self.layer = None
+        self.update()
+
+    def x_at(self, time_ms):
+        duration = self.slider.duration
+        return int(time_ms / duration * self.width()) if duration > 0 else 0
 
-            # 마커 선 그리기 (x좌표는 계산된 값, y좌표는 가운데를 기준으로)
-            top_y = y_center - (self.marker_height / 2)
-            bottom_y = y_center + (self.marker_height / 2)
+    def time_at(self, x):
+        return x / max(self.width(), 1) * self.slider.duration
 
-            tag_color = self.tag_color.get(tag_name, "red")
-            pen.setColor(QColor(tag_color))
-            painter.setPen(pen)
-            painter.drawLine(int(x), int(top_y), int(x), int(bottom_y))
+    def setPosition(self, position):
+        # 재생 위치가 다른 픽셀로 옮겨갈 때만 다시 그림
+        moved = self.x_at(position) != self.x_at(self.position_ms)
+        self.position_ms = position
+        if moved:
+            self.update()
 
+    def render_layer(self):
+        ratio = self.devicePixelRatioF()
+        layer = QPixmap(self.size() * ratio)
+        layer.setDevicePixelRatio(ratio)
+        layer.fill(self.background_color)
+
+        width = self.width()
+        duration = self.slider.duration
+        row_height = self.height() / len(self.sliders)
+        painter = QPainter(layer)
+        for row, slider in enumerate(self.sliders):
+            counts = column_counts(
+                slider.marker_groups,
+                slider.time_offset_ms,
+                slider.time_offset_ms + duration,
+                0,
+                width,
+                width,
+            )
+            if counts.any():
+                top_y = int(row * row_height)
+                bottom_y = int((row + 1) * row_height) - 1
+                draw_density(painter, slider.marker_groups, counts, top_y, bottom_y)
+        painter.end()
+        return layer
+
+    def paintEvent(self, event):
+        key = (self.size(), self.devicePixelRatioF(), self.slider.duration)
+        if self.layer is None or key != self.layer_key:
+            self.layer = self.render_layer()
+            self.layer_key = key
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.layer)
+        if self.slider.isZoomed():
+            x0 = self.x_at(self.slider.minimum())
+            x1 = self.x_at(self.slider.maximum())
+            fill = QColor(self.window_color)
+            fill.setAlpha(60)
+            painter.setPen(self.window_color)
+            painter.setBrush(fill)
+            painter.drawRect(x0, 0, max(x1 - x0, 2), self.height() - 1)
+        x = self.x_at(self.position_ms)
+        painter.setPen(QColor("black"))
+        painter.drawLine(x, 0, x, self.height())
         painter.end()
+
+    def center_on(self, x):
+        time_ms = self.time_at(x)
+        span = self.slider.maximum() - self.slider.minimum()
+        self.slider.setViewRange(time_ms - span / 2, time_ms + span / 2)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.center_on(event.x())
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.LeftButton:
+            self.center_on(event.x())
+
+    def mouseDoubleClickEvent(self, event):
+        self.slider.resetZoom()
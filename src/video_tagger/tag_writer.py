@@ -0,0 +1,132 @@
+import queue
+import sqlite3
+import threading
+import time
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from .database import TagDatabase
+
+ADD = "add"
+REMOVE = "remove"
+_FLUSH = "flush"
+_STOP = "stop"
+
+
+class TagWriter(QObject):
+    """Write-behind queue that persists tag changes on a dedicated thread.
+
+    Operations are queued from the GUI thread and returned immediately. The writer thread owns
+    its own connection to the database and commits pending operations in one transaction once
+    ``flush_interval_ms`` has passed since the first pending operation, or as soon as
+    ``max_batch_size`` operations are waiting.
+
+    Signals are emitted from the writer thread, so connected slots on GUI objects run as
+    queued calls on the GUI thread.
+    """
+
+    batchCommitted = pyqtSignal(int)
+    writeFailed = pyqtSignal(str)
+
+    def __init__(self, db_path, db_options=None, flush_interval_ms=5, max_batch_size=256):
+        super().__init__()
+        self.db_path = db_path
+        self.db_options = db_options or {}
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.queue = queue.Queue()
+        # 큐에 넣었지만 아직 커밋하지 않은 add/remove (오래된 순), 검색 결과에 합치는 데 씀
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name="TagWriter", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def is_alive(self):
+        """False once the thread has stopped, e.g. because it could not open the database."""
+        return self.thread.is_alive()
+
+    def add_tag(self, time_ms, tag_name, tag_type):
+        self._put((ADD, time_ms, tag_name, tag_type))
+
+    def remove_tag(self, time_ms, tag_name, tag_type):
+        self._put((REMOVE, time_ms, tag_name, tag_type))
+
+    def _put(self, operation):
+        with self._pending_lock:
+            self._pending.append(operation)
+            self.queue.put(operation)
+
+    def pending(self):
+        """Return the add/remove operations not committed yet, oldest first."""
+        with self._pending_lock:
+            return list(self._pending)
+
+    def flush(self, timeout=None):
+        """Block until every operation queued before this call is committed (or failed)."""
+        if not self.thread.is_alive():
+            return False
+        done = threading.Event()
+        self.queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self, timeout=None):
+        if not self.thread.is_alive():
+            return
+        self.queue.put((_STOP,))
+        self.thread.join(timeout)
+
+    def _run(self):
+        try:
+            db = TagDatabase(self.db_path, **self.db_options)
+        except (sqlite3.Error, OSError) as e:
+            self.writeFailed.emit(f'Failed to open "{self.db_path}" for writing: {e}')
+            return
+
+        try:
+            stop = False
+            while not stop:
+                batch, flushed, stop = self._collect(self.queue.get())
+                if batch:
+                    self._commit(db, batch)
+                for done in flushed:
+                    done.set()
+        finally:
+            db.close()
+
+    def _collect(self, operation):
+        batch = []
+        flushed = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            kind = operation[0]
+            if kind == _STOP:
+                return batch, flushed, True
+            if kind == _FLUSH:
+                flushed.append(operation[1])
+                return batch, flushed, False
+
+            batch.append(operation)
+            remaining = deadline - time.monotonic()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                return batch, flushed, False
+            try:
+                operation = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                return batch, flushed, False
+
+    def _commit(self, db, batch):
+        try:
+            db.apply_batch(batch)
+        except sqlite3.Error as e:
+            self._done(batch)
+            self.writeFailed.emit(f"Failed to save {len(batch)} tag change(s): {e}")
+            return
+        self._done(batch)
+        self.batchCommitted.emit(len(batch))
+
+    def _done(self, batch):
+        # 큐는 순서대로 처리되므로 batch 는 항상 pending 의 앞부분
+        with self._pending_lock:
+            del self._pending[: len(batch)]
@@ -0,0 +1,317 @@
+"""Thumbnail sprite sheets for timeline hover previews.
+
+Low-resolution frames are taken every ``interval_ms`` by a process pool and packed
+``columns x rows`` to a JPEG sprite sheet, so one decoded file serves many previews. Sheets are
+cached in ``.video_tagger_cache/thumbnails`` in the data directory, in a folder keyed by the
+video's absolute path, size and modification time and the thumbnail options. Each sheet is
+written atomically, so an interrupted run resumes with the sheets that are still missing.
+Decoding needs the optional PyAV or OpenCV package (see ``frame_decoder``).
+"""
+
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+import numpy as np
+from PyQt5.QtCore import QObject, QRect, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from .frame_decoder import open_decoder
+
+THUMBNAIL_DIRNAME = "thumbnails"
+# 저장 형식이 바뀌면 올려서 이전 썸네일을 무효화
+THUMBNAIL_VERSION = 1
+META_FILENAME = "meta.json"
+JPEG_QUALITY = 80
+
+
+def thumbnail_dir(cache_root, video_path, interval_ms, width, columns, rows):
+    stat = os.stat(video_path)
+    source = "|".join(
+        str(value)
+        for value in (
+            THUMBNAIL_VERSION,
+            os.path.abspath(video_path),
+            stat.st_size,
+            stat.st_mtime_ns,
+            interval_ms,
+            width,
+            columns,
+            rows,
+        )
+    )
+    key = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_root, THUMBNAIL_DIRNAME, f"{os.path.basename(video_path)}.{key}")
+
+
+def sheet_path(directory, sheet):
+    return os.path.join(directory, f"sheet_{sheet:05d}.jpg")
+
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def probe_video(video_path, backend, width):
+    """Worker process: duration and thumbnail size of ``video_path``."""
+    decoder = open_decoder(video_path, backend, max_width=width)
+    try:
+        return {
+            "duration_ms": int(decoder.frame_count * 1000 / decoder.fps),
+            "width": decoder.width,
+            "height": decoder.height,
+        }
+    finally:
+        decoder.close()
+
+
+def build_sheet(video_path, backend, meta, times_ms, columns, path):
+    """Worker process: decode the frames at ``times_ms`` and save them as one sprite sheet.
+
+    Frames that cannot be decoded (e.g. past the real end of the video) stay black.
+    """
+    decoder = open_decoder(video_path, backend, max_width=meta["width"])
+    try:
+        width, height = meta["width"], meta["height"]
+        rows = -(-len(times_ms) // columns)
+        sheet = np.zeros((rows * height, columns * width, 3), dtype=np.uint8)
+        frames = None
+        next_index = None
+        for tile, time_ms in enumerate(times_ms):
+            index = int(time_ms * decoder.fps / 1000)
+            # 가까운 다음 썸네일은 탐색 없이 이어서 디코딩
+            if frames is None or not 0 <= index - next_index <= decoder.fps:
+                frames = decoder.iter_frames(index)
+            for frame_index, frame in frames:
+                next_index = frame_index + 1
+                if frame_index >= index:
+                    break
+            else:
+                frames = None
+                continue
+            y, x = tile // columns * height, tile % columns * width
+            sheet[y : y + height, x : x + width] = frame[:height, :width]
+
+        image = QImage(
+            sheet.data, sheet.shape[1], sheet.shape[0], sheet.strides[0], QImage.Format_RGB888
+        )
+
+        def write(tmp_path):
+            if not image.save(tmp_path, "JPG", JPEG_QUALITY):
+                raise OSError(f'Cannot write "{tmp_path}"')
+
+        _write_atomic(path, write)
+    finally:
+        decoder.close()
+
+
+class ThumbnailGenerator(QObject):
+    """Builds and serves the thumbnail sprite sheets of one video.
+
+    Sheets are built in time order on a process pool (``spawn`` start method, so the workers
+    share no Qt state with the GUI process) and can be used as soon as each one is written.
+    ``thumbnail_at`` never decodes video; it returns None until the sheet covering the time is
+    ready. A few decoded sheets are kept in memory.
+
+    Signals are emitted from pool threads, so connected slots on GUI objects run as queued
+    calls on the GUI thread.
+    """
+
+    sheetReady = pyqtSignal(int)
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(
+        self,
+        cache_root,
+        interval_ms=2000,
+        width=160,
+        columns=10,
+        rows=10,
+        max_workers=2,
+        backend="auto",
+        max_loaded_sheets=8,
+    ):
+        super().__init__()
+        self.cache_root = cache_root
+        self.interval_ms = interval_ms
+        self.width = width
+        self.columns = columns
+        self.rows = rows
+        self.max_workers = max_workers
+        self.backend = backend
+        self.max_loaded_sheets = max_loaded_sheets
+        self.executor = None
+        self.lock = threading.Lock()
+        self.video_path = None
+        self.directory = None
+        self.meta = None
+        self.ready = set()
+        self.pending = 0
+        self.loaded = OrderedDict()
+
+    @property
+    def per_sheet(self):
+        return self.columns * self.rows
+
+    def sheet_count(self):
+        count = self.meta["duration_ms"] // self.interval_ms + 1
+        return -(-count // self.per_sheet)
+
+    def start(self, video_path):
+        """Use the cached sheets of ``video_path`` and build the missing ones in the background."""
+        self.close()
+        self.video_path = video_path
+        self.directory = thumbnail_dir(
+            self.cache_root, video_path, self.interval_ms, self.width, self.columns, self.rows
+        )
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        meta_path = os.path.join(self.directory, META_FILENAME)
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                self._submit_sheets(json.load(f))
+            return
+
+        future = self.executor.submit(probe_video, video_path, self.backend, self.width)
+        future.add_done_callback(
+            lambda future, directory=self.directory: self._on_probed(directory, future)
+        )
+
+    def close(self):
+        """Stop building sheets; a sheet being written is finished so the cache stays valid."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        with self.lock:
+            self.meta = None
+            self.ready = set()
+            self.loaded.clear()
+
+    def _on_probed(self, directory, future):
+        if directory != self.directory:
+            return
+        try:
+            meta = future.result()
+            os.makedirs(self.directory, exist_ok=True)
+            self._remove_stale()
+
+            def write(tmp_path):
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+
+            _write_atomic(os.path.join(self.directory, META_FILENAME), write)
+        except CancelledError:
+            return
+        except (OSError, ValueError, RuntimeError) as e:
+            self.failed.emit(str(e))
+            return
+        self._submit_sheets(meta)
+
+    def _remove_stale(self):
+        # 같은 영상의 이전 버전(수정 시각, 옵션이 다른) 썸네일을 지움
+        name = os.path.basename(self.video_path)
+        pattern = os.path.join(os.path.dirname(self.directory), f"{glob.escape(name)}.*")
+        for stale in glob.glob(pattern):
+            if stale != self.directory:
+                shutil.rmtree(stale, ignore_errors=True)
+
+    def _submit_sheets(self, meta):
+        directory = self.directory
+        with self.lock:
+            self.meta = meta
+            missing = []
+            for sheet in range(self.sheet_count()):
+                if os.path.exists(sheet_path(self.directory, sheet)):
+                    self.ready.add(sheet)
+                else:
+                    missing.append(sheet)
+            self.pending = len(missing)
+        if not missing:
+            self.finished.emit()
+            return
+
+        try:
+            for sheet in missing:
+                first = sheet * self.per_sheet * self.interval_ms
+                last = min((sheet + 1) * self.per_sheet * self.interval_ms, meta["duration_ms"] + 1)
+                future = self.executor.submit(
+                    build_sheet,
+                    self.video_path,
+                    self.backend,
+                    meta,
+                    list(range(first, last, self.interval_ms)),
+                    self.columns,
+                    sheet_path(self.directory, sheet),
+                )
+                future.add_done_callback(
+                    lambda future, sheet=sheet: self._on_built(directory, sheet, future)
+                )
+        except (AttributeError, RuntimeError):
+            # 닫는 중 (executor 가 없거나 종료됨)
+            return
+
+    def _on_built(self, directory, sheet, future):
+        # 다른 영상으로 바뀐 뒤에 끝난 작업은 무시
+        if directory != self.directory:
+            return
+        try:
+            future.result()
+        except CancelledError:
+            return
+        except (OSError, ValueError, RuntimeError) as e:
+            self.failed.emit(f"Thumbnail sheet {sheet}: {e}")
+        else:
+            with self.lock:
+                self.ready.add(sheet)
+            self.sheetReady.emit(sheet)
+        with self.lock:
+            self.pending -= 1
+            done = self.pending == 0
+        if done:
+            self.finished.emit()
+
+    def progress(self):
+        """(ready sheets, total sheets), or None while the video is being probed."""
+        with self.lock:
+            if self.meta is None:
+                return None
+            return len(self.ready), self.sheet_count()
+
+    def thumbnail_at(self, time_ms):
+        """Thumbnail nearest to ``time_ms``, or None if its sheet is not built yet."""
+        with self.lock:
+            if self.meta is None:
+                return None
+            last = self.meta["duration_ms"] // self.interval_ms
+            number = min(max(round(time_ms / self.interval_ms), 0), last)
+            sheet, tile = divmod(number, self.per_sheet)
+            if sheet not in self.ready:
+                return None
+            width, height = self.meta["width"], self.meta["height"]
+
+        image = self.loaded.get(sheet)
+        if image is None:
+            image = QImage(sheet_path(self.directory, sheet))
+            if image.isNull():
+                return None
+            self.loaded[sheet] = image
+            if len(self.loaded) > self.max_loaded_sheets:
+                self.loaded.popitem(last=False)
+        else:
+            self.loaded.move_to_end(sheet)
+        x, y = tile % self.columns * width, tile // self.columns * height
+        return image.copy(QRect(x, y, width, height))
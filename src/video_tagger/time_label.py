@@ -18,8 +18,14 @@ class TimeLabel(QWidget):
         self.setLayout(layout)
 
         layout.addWidget(self.time_label)
+        self.shown_seconds = None
 
     def update_time_label(self, position, duration):
+        # 초 단위로만 표시하므로 초가 바뀔 때만 글자를 다시 만듦
+        seconds = (position // 1000, duration // 1000)
+        if seconds == self.shown_seconds:
+            return
+        self.shown_seconds = seconds
         current_str = format_time(position, show_miliseconds=False)
         total_str = format_time(duration, show_miliseconds=False)
         self.time_label.setText(f"{current_str} / {total_str}")
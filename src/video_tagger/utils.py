@@ -2,9 +2,12 @@ import json
 import os
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 import yaml
 
+from .data_cache import read_csv_cached
+
 
 def load_settings(filename=None):
     if filename is None or not os.path.exists(filename):
@@ -61,13 +64,36 @@ def save_json(data, filename):
 
 
 def load_fusion_data(filename: str):
-    df = pd.read_csv(filename, parse_dates=["datetime"])
+    df = read_csv_cached(filename, parse_dates=["datetime"])
     return df
 
 
-def get_video_time_ms(
-    datetimes: pd.Series, video_start_time_utc: Optional[pd.Timestamp]
-) -> pd.Series:
-    if video_start_time_utc is None:
-        return pd.Series([0] * len(datetimes))
-    return ((datetimes - video_start_time_utc).dt.total_seconds() * 1000).astype(int)
+def timedelta_ms(delta: pd.Series) -> np.ndarray:
+    """Whole milliseconds of a timedelta Series, truncated toward zero, as int64."""
+    values = delta.to_numpy()
+    unit, _ = np.datetime_data(values.dtype)
+    per_ms = {"ms": 1, "us": 1000, "ns": 1000000}[unit]
+    values = values.astype(np.int64)
+    return np.sign(values) * (np.abs(values) // per_ms)
+
+
+def epoch_ms(datetimes: pd.Series) -> np.ndarray:
+    """Milliseconds since 1970-01-01 of a datetime Series as int64.
+
+    Naive datetimes are taken as they are (the app treats them as UTC), aware ones are
+    converted to UTC.
+    """
+    if datetimes.dt.tz is not None:
+        datetimes = datetimes.dt.tz_convert("UTC").dt.tz_localize(None)
+    return timedelta_ms(datetimes - pd.Timestamp(0))
+
+
+def to_epoch_ms(value) -> Optional[int]:
+    """Milliseconds since 1970-01-01 of a single datetime, or None for None/NaT."""
+    if value is None or value is pd.NaT:
+        return None
+    value = pd.Timestamp(value)
+    if value.tz is not None:
+        value = value.tz_convert("UTC").tz_localize(None)
+    # 1970 년 이후 시각만 다루므로 내림과 0 방향 자름이 같음
+    return (value - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)
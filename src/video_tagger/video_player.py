@@ -5,8 +5,14 @@ from PyQt5.QtMultimediaWidgets import QVideoWidget
 from PyQt5.QtWidgets import QFileDialog, QHBoxLayout, QLabel, QPushButton, QVBoxLayout, QWidget
 
 from .cell_3d_cuboid import Cell3dCuboid
+from .frame_clock import FrameClock
+from .frame_decoder import available_backends
+from .frame_player import FramePlayer, FrameView
+from .interval_index import IntervalIndex
 from .overlay_label import OverlayLabel
-from .tag_slider import TagSlider
+from .seek_scheduler import SeekScheduler
+from .tag_slider import TagSlider, TimelineMinimap
+from .thumbnails import ThumbnailGenerator
 from .time_label import TimeLabel
 from .utils import format_time
 
@@ -18,6 +24,11 @@ class VideoPlayer(QWidget):
         self.config = config
         self.data_config = data_config
         self.tag_manager = tag_manager
+        self.overlay_duration_ms = self.config.get("overlay", {}).get("default_duration_ms", 1000)
+        self.cell_action_index = IntervalIndex()
+        # 셀 액션은 절대 시간(epoch_ms)으로 색인하고 영상 시작 시각만큼 빼서 표시
+        self.cell_action_offset_ms = 0
+        self.overlay_key = None
 
         # # 키보드 단축키, 재생/일시정지, 태그 추가 로직 등을 여기에 구현할 수 있음.
         # # 예: self.setFocusPolicy(Qt.StrongFocus) 후 keyPressEvent를 override 등.
@@ -27,12 +38,11 @@ class VideoPlayer(QWidget):
 
         self.screen_layout = QHBoxLayout()
         self.video_path = None
+        self.thumbnails = None
         self.fusion_data_path = self.data_config.fusion_data_path
         self.video_start_time_utc = pd.Timestamp(self.data_config.video_start_time_utc)
-        self.video_widget = QVideoWidget()
-        self.player = QMediaPlayer(None, QMediaPlayer.VideoSurface)
-        self.player.setVideoOutput(self.video_widget)
-        self.player.setNotifyInterval(20)
+        self.player = self.create_player(self.config.get("playback", {}))
+        self.seek_scheduler = self.create_seek_scheduler(self.config.get("seek", {}))
         self.video_widget.setMinimumSize(1280, 720)
         self.play_speed = 1.0
         self.screen_layout.addWidget(self.video_widget)
@@ -101,10 +111,11 @@ class VideoPlayer(QWidget):
             """
         )
 
-        self.position_slider.sliderMoved.connect(self.seek_position)
+        self.position_slider.sliderMoved.connect(self.drag_seek_position)
         self.position_slider.sliderPressed.connect(self.pressed_seek_position)
+        self.position_slider.sliderReleased.connect(self.released_seek_position)
 
-        self.cell_action_position_slider = TagSlider(config, Qt.Horizontal)
+        self.cell_action_position_slider = TagSlider(config, Qt.Horizontal, time_key="epoch_ms")
         self.cell_action_position_slider.setMinimumHeight(80)
         self.cell_action_position_slider.setRange(0, 0)
         self.cell_action_position_slider.setStyleSheet(
@@ -123,24 +134,69 @@ class VideoPlayer(QWidget):
             """
         )
 
-        self.cell_action_position_slider.sliderMoved.connect(self.seek_position)
+        self.cell_action_position_slider.sliderMoved.connect(self.drag_seek_position)
         self.cell_action_position_slider.sliderPressed.connect(
             self.pressed_cell_action_seek_position
         )
+        self.cell_action_position_slider.sliderReleased.connect(
+            self.released_cell_action_seek_position
+        )
+
+        # 두 슬라이더는 같은 구간을 보도록 확대/이동을 맞춤
+        self.position_slider.viewRangeChanged.connect(self.cell_action_position_slider.setViewRange)
+        self.cell_action_position_slider.viewRangeChanged.connect(self.position_slider.setViewRange)
+        self.timeline_minimap = TimelineMinimap(
+            [self.position_slider, self.cell_action_position_slider]
+        )
 
         # layout.addWidget(self.video_widget)
         layout.addLayout(self.screen_layout)
         layout.addLayout(self.button_layout)
         layout.addWidget(self.position_slider)
         layout.addWidget(self.cell_action_position_slider)
-
-        self.player.positionChanged.connect(self.update_slider)
+        layout.addWidget(self.timeline_minimap)
+
+        # 재생 위치를 따라가는 화면은 모두 한 시계로 화면 주사율에 맞춰 한 번씩 갱신
+        self.frame_clock = FrameClock(self.player, parent=self)
+        self.player.setNotifyInterval(self.frame_clock.interval_ms)
+        self.frame_clock.add_view(self.update_slider)
+        self.frame_clock.add_view(self.update_time_label)
+        self.frame_clock.add_view(self.update_overlay_label)
+        self.frame_clock.add_view(self.update_cell_3d_cuboid)
         self.player.durationChanged.connect(self.update_duration)
-        self.player.positionChanged.connect(self.update_time_label)
         self.player.durationChanged.connect(self.update_time_label)
-        self.player.positionChanged.connect(self.update_overlay_label)
-        self.player.positionChanged.connect(self.update_cell_3d_cuboid)
-        self.player.durationChanged.connect(self.update_cell_3d_cuboid)
+
+    def create_player(self, playback_config):
+        """QMediaPlayer, or the frame cache engine if configured and PyAV/OpenCV is installed."""
+        engine = playback_config.get("engine", "qt")
+        if engine == "frames" and available_backends():
+            self.video_widget = FrameView()
+            player = FramePlayer(
+                max_memory_mb=playback_config.get("max_memory_mb", 512),
+                prefetch_ms=playback_config.get("prefetch_ms", 2000),
+                backend=playback_config.get("backend", "auto"),
+                max_width=playback_config.get("max_width", 1280),
+            )
+            player.frameReady.connect(self.video_widget.setImage)
+            return player
+
+        if engine == "frames":
+            print("Frame playback needs 'av' or 'opencv-python' (pip install av), using Qt player")
+        self.video_widget = QVideoWidget()
+        player = QMediaPlayer(None, QMediaPlayer.VideoSurface)
+        player.setVideoOutput(self.video_widget)
+        return player
+
+    def create_seek_scheduler(self, seek_config):
+        if isinstance(self.player, FramePlayer):
+            # 프레임이 화면에 나오면 탐색이 끝난 것으로 봄
+            return SeekScheduler(
+                self.player,
+                finished_signal=self.player.frameReady,
+                interval_ms=seek_config.get("interval_ms", 100),
+                fast_seek=seek_config.get("fast_seek_while_dragging", True),
+            )
+        return SeekScheduler(self.player, interval_ms=seek_config.get("interval_ms", 100))
 
     def load_video(self, video_path):
         if video_path == "" or video_path is None:
@@ -153,12 +209,42 @@ class VideoPlayer(QWidget):
             )[0]
 
         if video_path != "":
-            video_url = QUrl.fromLocalFile(video_path)
             self.video_path = video_path
-            self.player.setMedia(QMediaContent(video_url))
+            if isinstance(self.player, FramePlayer):
+                try:
+                    self.player.load(video_path)
+                except (OSError, ValueError, RuntimeError) as e:
+                    print(f"Failed to open video {video_path}: {e}")
+                    return
+            else:
+                self.player.setMedia(QMediaContent(QUrl.fromLocalFile(video_path)))
             self.player.play()
             self.update_playing_state()
 
+    def load_thumbnails(self, cache_root):
+        """Build (or reuse) thumbnail sprite sheets in ``cache_root`` for slider hover previews."""
+        thumbnail_config = self.config.get("thumbnails", {})
+        if not thumbnail_config.get("enabled", True) or self.video_path is None:
+            return
+        if not available_backends():
+            print("Thumbnail previews need 'av' or 'opencv-python' (pip install av)")
+            return
+
+        if self.thumbnails is None:
+            self.thumbnails = ThumbnailGenerator(
+                cache_root,
+                interval_ms=thumbnail_config.get("interval_ms", 2000),
+                width=thumbnail_config.get("width", 160),
+                columns=thumbnail_config.get("columns", 10),
+                rows=thumbnail_config.get("rows", 10),
+                max_workers=thumbnail_config.get("max_workers", 2),
+                backend=self.config.get("playback", {}).get("backend", "auto"),
+            )
+            self.thumbnails.failed.connect(lambda message: print(f"Thumbnails: {message}"))
+            self.position_slider.setThumbnailProvider(self.thumbnails.thumbnail_at)
+            self.cell_action_position_slider.setThumbnailProvider(self.thumbnails.thumbnail_at)
+        self.thumbnails.start(self.video_path)
+
     def set_fusion_data_path(self, fusion_data_filename):
         if fusion_data_filename is None or fusion_data_filename == "":
             fusion_data_filename = QFileDialog.getOpenFileName(
@@ -198,70 +284,112 @@ class VideoPlayer(QWidget):
         self.apply_playback_speed()
 
     def pressed_seek_position(self):
-        self.seek_position(self.position_slider.value())
+        self.drag_seek_position(self.position_slider.value())
 
     def pressed_cell_action_seek_position(self):
-        self.seek_position(self.cell_action_position_slider.value())
+        self.drag_seek_position(self.cell_action_position_slider.value())
+
+    def released_seek_position(self):
+        self.released_slider(self.position_slider)
+
+    def released_cell_action_seek_position(self):
+        self.released_slider(self.cell_action_position_slider)
+
+    def released_slider(self, slider):
+        # 드래그 중에는 키프레임으로 빠르게 탐색했으므로 놓은 위치로 정확히 탐색
+        if self.seek_scheduler.fast_seek:
+            self.seek_position(slider.value())
+
+    def drag_seek_position(self, position):
+        self.seek_scheduler.seek(position, exact=False)
 
     def seek_position(self, position):
-        self.player.setPosition(position)
+        self.seek_scheduler.seek(position)
 
     def update_cell_3d_cuboid(self, position):
         if self.cell_3d_cuboid is not None:
             self.cell_3d_cuboid.set_current_video_time_ms(position)
 
     def update_slider(self, position):
-        self.position_slider.setValue(position)
-        self.cell_action_position_slider.setValue(position)
+        self.position_slider.setPosition(position)
+        self.cell_action_position_slider.setPosition(position)
+        self.timeline_minimap.setPosition(position)
 
     def update_duration(self, duration):
-        self.position_slider.setRange(0, duration)
-        self.cell_action_position_slider.setRange(0, duration)
+        self.position_slider.setDuration(duration)
+        self.cell_action_position_slider.setDuration(duration)
+
+    def set_cell_action_tags(self, tags):
+        # 셀 액션은 initial_time -> final_time 동안 표시 (최소 overlay_duration_ms)
+        self.cell_action_index = IntervalIndex(
+            (
+                tag["epoch_ms"],
+                tag["epoch_ms"] + max(tag.get("duration_ms", 0), self.overlay_duration_ms),
+                tag,
+            )
+            for tag in tags
+        )
+        self.cell_action_position_slider.setTags(tags)
+        self.overlay_key = None
+        self.update_overlay_label(self.player.position())
+
+    def set_cell_action_offset(self, offset_ms):
+        """Shift cell action tags to a new video start time without rebuilding anything."""
+        self.cell_action_offset_ms = offset_ms
+        self.cell_action_position_slider.setTimeOffset(offset_ms)
+        self.overlay_key = None
+        self.update_overlay_label(self.player.position())
+
+    def tag_time_ms(self, tag):
+        if "epoch_ms" in tag:
+            return tag["epoch_ms"] - self.cell_action_offset_ms
+        return tag.get("time_ms", 0)
+
+    @staticmethod
+    def overlay_tag_name(tag):
+        tag_name = tag.get("tag_name", "")
+        if tag_name == "":
+            parts = [tag.get("action_type", ""), tag.get("direction", "")]
+            tag_name = " ".join(part for part in parts if isinstance(part, str) and part)
+        return tag_name
 
     def update_overlay_label(self, position):
-        tags = self.tag_manager.get_tags()
-
-        active_tags = []
-        for tag in tags:
-            time_ms = tag.get("time_ms", 0)
-            tag_name = tag.get("tag_name", "")
-            tag_type = tag.get("tag_type", "")
-            if tag_name == "":
-                tag_name = (tag.get("action_type", "") + " " + tag.get("direction", "")).strip()
-
-            start_ms = time_ms
-            end_ms = time_ms + 1000
-            if start_ms <= position <= end_ms:
-                tag_text = f"[{format_time(time_ms)}] {tag_name} ({tag_type})"
-                active_tags.append(tag_text)
+        # 수동 태그는 모두 같은 길이이므로 시작 시간 범위로 찾고, 셀 액션은 구간 색인으로 찾음
+        active_tags = self.tag_manager.get_tags_in_range(
+            position - self.overlay_duration_ms, position + 1
+        )
+        active_tags += self.cell_action_index.at(position + self.cell_action_offset_ms)
+
+        # 활성 태그 집합이 바뀔 때만 텍스트를 다시 만듦
+        overlay_key = tuple(id(tag) for tag in active_tags)
+        if overlay_key == self.overlay_key:
+            return
+        self.overlay_key = overlay_key
 
         if active_tags:
-            self.overlay_label.show_text("\n".join(active_tags))
-            # self.overlay_label.setText("\n".join(active_tags))
-            # self.overlay_label.adjustSize()
-            # self.overlay_label.show()
+            lines = [
+                f"[{format_time(self.tag_time_ms(tag))}] {self.overlay_tag_name(tag)} "
+                f"({tag.get('tag_type', '')})"
+                for tag in active_tags
+            ]
+            self.overlay_label.show_text("\n".join(lines))
         else:
             self.overlay_label.hide_text()
 
     def skip_time(self, ms):
-        new_position = self.player.position() + ms
-        self.player.setPosition(new_position)
+        self.seek_scheduler.seek_by(ms)
 
     def skip_5sec_backward(self):
-        new_position = self.player.position() - 5000  # 5000 ms = 5초
-        self.player.setPosition(new_position)
+        self.seek_scheduler.seek_by(-5000)  # 5000 ms = 5초
 
     def skip_5sec_forward(self):
-        new_position = self.player.position() + 5000  # 5000 ms = 5초
-        self.player.setPosition(new_position)
+        self.seek_scheduler.seek_by(5000)  # 5000 ms = 5초
 
     def skip_2sec_backward(self):
-        new_position = self.player.position() - 2000  # 5000 ms = 5초
-        self.player.setPosition(new_position)
+        self.seek_scheduler.seek_by(-2000)  # 2000 ms = 2초
 
     def skip_2sec_forward(self):
-        new_position = self.player.position() + 2000  # 5000 ms = 5초
-        self.player.setPosition(new_position)
+        self.seek_scheduler.seek_by(2000)  # 2000 ms = 2초
 
     def update_playing_state(self):
         if self.player.state() == QMediaPlayer.PlayingState:
@@ -278,7 +406,25 @@ class VideoPlayer(QWidget):
             self.player.play()
         self.update_playing_state()
 
-    def update_time_label(self):
+    def step_frame(self, frames):
+        """Pause and step ``frames`` frames (negative: backward)."""
+        if isinstance(self.player, FramePlayer):
+            self.player.step_frame(frames)
+        else:
+            # QMediaPlayer 는 프레임 단위 이동이 없으므로 약 30fps 기준으로 이동
+            self.player.pause()
+            self.player.setPosition(self.player.position() + frames * 33)
+        self.update_playing_state()
+
+    def close_player(self):
+        if self.thumbnails is not None:
+            self.thumbnails.close()
+        if isinstance(self.player, FramePlayer):
+            self.player.close()
+        else:
+            self.player.stop()
+
+    def update_time_label(self, *args):
         current_ms = self.player.position()
         total_ms = self.player.duration()
         self.time_label.update_time_label(current_ms, total_ms)
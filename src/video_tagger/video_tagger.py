@@ -1,15 +1,20 @@
+import os
 import sys
+from operator import itemgetter
 
-from PyQt5.QtCore import QDateTime, QSettings, Qt
+from PyQt5.QtCore import QDateTime, QItemSelectionModel, QSettings, Qt, QTimer
 from PyQt5.QtGui import QKeySequence
 from PyQt5.QtWidgets import (
     QAbstractItemView,
+    QAction,
     QApplication,
+    QCheckBox,
     QDateTimeEdit,
     QFileDialog,
     QHBoxLayout,
     QLabel,
-    QListWidget,
+    QLineEdit,
+    QListView,
     QMainWindow,
     QShortcut,
     QSplitter,
@@ -20,12 +25,16 @@ from PyQt5.QtWidgets import (
 
 from .cell_action_tag_manager import CellActionTagManager
 from .config import load_data_config, save_data_config
+from .data_cache import CACHE_DIRNAME
+from .tag_list_model import TagFilterProxyModel, TagListModel
 from .tag_manager import TagManager
 from .utils import load_settings, save_settings
 from .version import __version__
 from .video_player import VideoPlayer
 
 MANUAL_TAG_TYPE = "MANUAL"
+# 시작 시각을 화살표 키로 연속 조정하는 동안 설정 저장을 미루는 시간
+START_TIME_SETTLE_MS = 300
 
 
 class VideoTagger(QMainWindow):
@@ -59,7 +68,11 @@ class VideoTagger(QMainWindow):
         main_layout = QHBoxLayout()
         central_widget.setLayout(main_layout)
 
-        self.tag_manager = TagManager(self)
+        self.tag_manager = TagManager(
+            self,
+            export_options=self.config.get("export", {}),
+            import_options=self.config.get("import", {}),
+        )
         self.video_player = VideoPlayer(self.config, self.data_config, self.tag_manager)
 
         self.right_layout = QVBoxLayout()
@@ -75,23 +88,58 @@ class VideoTagger(QMainWindow):
         self.video_start_time_layout.addWidget(self.video_start_time_edit)
         self.right_layout.addLayout(self.video_start_time_layout)
 
+        self.follow_playhead_check = QCheckBox("Follow playhead")
+        self.follow_playhead_check.setChecked(
+            self.config.get("tag_list", {}).get("follow_playhead", False)
+        )
+        self.right_layout.addWidget(self.follow_playhead_check)
+
         self.tag_list_layout = QHBoxLayout()
-        self.tag_list = QListWidget()
+        self.manual_tag_layout = QVBoxLayout()
+        self.tag_search_edit = QLineEdit()
+        self.tag_search_edit.setFixedWidth(200)
+        self.tag_search_edit.setPlaceholderText("Search tags")
+        self.tag_search_edit.setClearButtonEnabled(True)
+        self.manual_tag_layout.addWidget(self.tag_search_edit)
+        # 검색 중일 때 결과에 든 태그의 (time_ms, tag_name, tag_type), 검색하지 않으면 None
+        self.tag_search_matches = None
+        # 태그 목록은 TagManager 의 정렬된 store 를 그대로 보여주는 모델 (항목 객체를 만들지 않음)
+        self.tag_model = TagListModel(self.tag_manager.tags, parent=self)
+        self.tag_proxy = TagFilterProxyModel(self)
+        self.tag_proxy.setSourceModel(self.tag_model)
+        self.tag_list = QListView()
         self.tag_list.setFixedWidth(200)
-        self.tag_list.setSortingEnabled(True)
-        self.tag_list_layout.addWidget(self.tag_list)
-
-        self.cell_action_tag_list = QListWidget()  # 새 태그 리스트
+        self.tag_list.setUniformItemSizes(True)
+        self.tag_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tag_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.tag_list.setModel(self.tag_proxy)
+        self.manual_tag_layout.addWidget(self.tag_list)
+        self.tag_list_layout.addLayout(self.manual_tag_layout)
+
+        self.cell_action_tag_list = QListView()  # 새 태그 리스트
         # self.cell_action_tag_list.setFixedWidth(400)
         self.cell_action_tag_list.setMinimumWidth(400)
-        self.cell_action_tag_list.setSortingEnabled(True)
+        self.cell_action_tag_list.setUniformItemSizes(True)
+        self.cell_action_tag_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.tag_list_layout.addWidget(self.cell_action_tag_list)
         self.right_layout.addLayout(self.tag_list_layout)
 
-        self.tag_manager.tagAdded.connect(self.on_tag_added)
-        self.tag_list.itemDoubleClicked.connect(self.on_tag_double_clicked)
-        self.cell_action_tag_list.itemDoubleClicked.connect(self.on_cell_action_tag_double_clicked)
+        self.tag_manager.tagsInserted.connect(self.on_tags_inserted)
+        self.tag_manager.tagsRemoved.connect(self.tag_model.remove_rows)
+        # 슬라이더도 목록과 같이 바뀐 행만 반영 (전체 태그를 다시 묶지 않음)
+        self.tag_manager.tagsRemoved.connect(self.video_player.position_slider.remove_rows)
+        self.tag_manager.tagsLoaded.connect(self.on_tags_loaded)
+        self.tag_manager.writeFailed.connect(self.on_tag_write_failed)
+        self.tag_list.doubleClicked.connect(self.on_tag_double_clicked)
+        self.cell_action_tag_list.doubleClicked.connect(self.on_cell_action_tag_double_clicked)
+        QShortcut(
+            QKeySequence(Qt.Key_Delete),
+            self.tag_list,
+            self.remove_selected_tags,
+            context=Qt.WidgetShortcut,
+        )
         self.video_start_time_edit.dateTimeChanged.connect(self.on_start_time_changed)
+        self.tag_search_edit.textChanged.connect(self.on_tag_search_changed)
 
         # main_layout.addWidget(self.video_player)
         # main_layout.addLayout(self.right_layout)
@@ -125,21 +173,51 @@ class VideoTagger(QMainWindow):
         QShortcut(QKeySequence(Qt.Key_Down), self, lambda: self.video_player.decrease_play_speed())
 
         QShortcut(QKeySequence(Qt.Key_Space), self, self.video_player.toggle_play_pause)
+        # 한 프레임씩 이동 (일시정지)
+        QShortcut(QKeySequence(Qt.Key_Comma), self, lambda: self.video_player.step_frame(-1))
+        QShortcut(QKeySequence(Qt.Key_Period), self, lambda: self.video_player.step_frame(1))
 
-        # ctrl + s 키를 누르면 태그를 저장하는 기능을 추가합니다.
-        QShortcut(QKeySequence(Qt.CTRL + Qt.Key_S), self, self.tag_manager.save_tags_to_csv)
+        file_menu = self.menuBar().addMenu("File")
+        import_action = QAction("Import Tags...", self)
+        import_action.setShortcut(QKeySequence(Qt.CTRL + Qt.Key_I))
+        import_action.triggered.connect(self.import_tags)
+        file_menu.addAction(import_action)
 
-        self.tag_manager.load_db(self.data_config.db_path)
+        # ctrl + s 키를 누르면 태그를 저장하는 기능을 추가합니다.
+        QShortcut(QKeySequence(Qt.CTRL + Qt.Key_S), self, self.tag_manager.export_tags)
+        # 백그라운드 저장 취소
+        QShortcut(QKeySequence(Qt.Key_Escape), self, self.tag_manager.cancel_exports)
+
+        self.tag_manager.load_db(
+            self.data_config.db_path,
+            writer_options=self.config.get("tag_writer", {}),
+            **self.config.get("database", {}),
+        )
         self.tag_manager.load_tags_from_db()
-        self.video_player.position_slider.setTags(self.tag_manager.get_tags())
         self.video_player.load_video(self.data_config.video_path)
+        self.video_player.load_thumbnails(os.path.join(self.data_directory, CACHE_DIRNAME))
         self.data_config.video_path = self.video_player.video_path
         self.data_config.fusion_data_path = self.video_player.fusion_data_path
 
+        self.start_time_timer = QTimer(self)
+        self.start_time_timer.setSingleShot(True)
+        self.start_time_timer.setInterval(START_TIME_SETTLE_MS)
+        self.start_time_timer.timeout.connect(self.on_start_time_settled)
+
         self.cell_action_tag_manager = CellActionTagManager(self)
+        self.cell_action_model = TagListModel(
+            self.cell_action_tag_manager.tags,
+            time_ms=self.cell_action_tag_manager.time_ms,
+            label=itemgetter("label"),
+            parent=self,
+        )
+        # 셀 액션 목록은 검색이 없으므로 proxy 없이 모델을 바로 연결
+        self.cell_action_tag_list.setModel(self.cell_action_model)
         self.cell_action_tag_manager.load_cell_action(self.data_config.imu_action_path)
         self.data_config.imu_action_path = self.cell_action_tag_manager.csv_filename
-        self.cell_action_tag_manager.tagAdded.connect(self.on_cell_action_tag_added)
+        self.cell_action_tag_manager.tagsInserted.connect(self.on_cell_action_tags_inserted)
+        self.video_player.frame_clock.add_view(self.on_position_changed)
+        self.cell_action_tag_manager.tagsLoaded.connect(self.on_cell_action_tags_loaded)
         self.cell_action_tag_manager.load_cell_action_tags()
 
         if self.data_config.video_start_time_utc != "":
@@ -153,6 +231,14 @@ class VideoTagger(QMainWindow):
         save_settings(self.config, self.config_path)
         save_data_config(self.data_config, self.data_config_path)
 
+    def closeEvent(self, event):
+        if self.start_time_timer.isActive():
+            self.start_time_timer.stop()
+            save_data_config(self.data_config, self.data_config_path)
+        self.tag_manager.close()
+        self.video_player.close_player()
+        super().closeEvent(event)
+
     def get_recent_data_directory(self):
         settings = QSettings("Fitogether", "SimpleVideoTagger")
         return settings.value("recent_data_directory", "")
@@ -184,57 +270,133 @@ class VideoTagger(QMainWindow):
 
         return data_directory
 
+    def import_tags(self):
+        filename, _ = QFileDialog.getOpenFileName(
+            self,
+            "Import Tags",
+            self.data_directory,
+            "Tag files (*.csv *.jsonl *.json *.parquet *.arrow)",
+            options=QFileDialog.DontUseNativeDialog,
+        )
+        if filename:
+            self.tag_manager.import_tags(filename)
+
     def add_tag(self, tag_name):
         current_time = self.video_player.player.position()
         tag = {"time_ms": current_time, "tag_name": tag_name, "tag_type": MANUAL_TAG_TYPE}
         self.tag_manager.add_tag(tag)
 
-    def on_tag_added(self, item):
-        self.tag_list.addItem(item)
-        self.tag_list.scrollToItem(item, QAbstractItemView.PositionAtBottom)
-        self.video_player.position_slider.setTags(self.tag_manager.get_tags())
+    def on_tags_inserted(self, first, count):
+        if self.tag_search_matches is not None:
+            # 새 행만 검색어와 비교, proxy 는 filterAcceptsRow 로 새 행만 걸러 넣음
+            query = self.tag_search_edit.text()
+            for tag in self.tag_manager.tags[first : first + count]:
+                if self.tag_manager.tag_name_matches(query, tag["tag_name"]):
+                    self.tag_search_matches.add((tag["time_ms"], tag["tag_name"], tag["tag_type"]))
+        self.tag_model.insert_rows(first, count)
+        self.video_player.position_slider.insert_rows(first, count)
+        index = self.tag_proxy.mapFromSource(self.tag_model.index(first, 0))
+        if index.isValid():
+            self.tag_list.scrollTo(index)
+
+    def remove_selected_tags(self):
+        tags = [index.data(Qt.UserRole) for index in self.tag_list.selectionModel().selectedRows()]
+        if tags:
+            self.tag_manager.remove_tags(
+                [(tag["time_ms"], tag["tag_name"], tag["tag_type"]) for tag in tags]
+            )
+
+    def on_tag_write_failed(self, message):
+        self.statusBar().showMessage(message, 10000)
 
-    def on_cell_action_tag_added(self, item):
-        self.cell_action_tag_list.addItem(item)
-        self.video_player.cell_action_position_slider.setTags(
-            self.cell_action_tag_manager.get_tags()
+    def on_tags_loaded(self, tags):
+        self.tag_model.set_tags(self.tag_manager.tags)
+        if self.tag_search_matches is not None:
+            self.on_tag_search_changed(self.tag_search_edit.text())
+        self.tag_list.scrollToBottom()
+        self.video_player.position_slider.setTags(self.tag_manager.tags)
+
+    def on_tag_search_changed(self, text):
+        if not text.strip():
+            matches = None
+        else:
+            matches = {
+                (tag["time_ms"], tag["tag_name"], tag["tag_type"])
+                for tag in self.tag_manager.search_tags(text)
+            }
+        self.tag_search_matches = matches
+
+        self.tag_proxy.set_predicate(
+            None
+            if matches is None
+            else lambda tag: (tag["time_ms"], tag["tag_name"], tag["tag_type"]) in matches
         )
 
+    def on_cell_action_tags_inserted(self, first, count):
+        self.cell_action_model.insert_rows(first, count)
+        self.video_player.set_cell_action_tags(self.cell_action_tag_manager.get_tags())
+
+    def on_cell_action_tags_loaded(self, tags):
+        self.cell_action_model.set_tags(tags)
+        self.video_player.set_cell_action_tags(tags)
+        self.video_player.set_cell_action_offset(self.cell_action_tag_manager.start_epoch_ms)
+
     def on_start_time_changed(self, datetime):
+        # 시작 시각은 한 값(offset)만 바꿔 슬라이더, 오버레이, 3D 뷰, 목록에 바로 반영하고
+        # 설정 파일 저장은 입력이 멈춘 뒤 한 번만 처리
         pydatetime = datetime.toPyDateTime()
-        self.cell_action_tag_list.clear()
         self.cell_action_tag_manager.set_video_start_time(pydatetime)
         self.tag_manager.set_video_start_time(pydatetime)
-        self.cell_action_tag_manager.load_cell_action_tags()
-        self.video_player.cell_action_position_slider.setTags(
-            self.cell_action_tag_manager.get_tags()
-        )
+        self.video_player.set_cell_action_offset(self.cell_action_tag_manager.start_epoch_ms)
         if self.video_player.cell_3d_cuboid is not None:
             self.video_player.cell_3d_cuboid.set_video_start_time_utc(pydatetime)
+        # 문구는 data() 에서 그때그때 만들므로 보이는 행만 다시 그리면 됨
+        # (dataChanged 를 보내면 QListView 가 모든 행을 다시 배치함)
+        self.cell_action_tag_list.viewport().update()
         self.data_config.video_start_time_utc = datetime.toString("yyyy-MM-dd HH:mm:ss.zzz")
+        self.start_time_timer.start()
+
+    def on_start_time_settled(self):
         save_data_config(self.data_config, self.data_config_path)
 
-    def on_tag_double_clicked(self, item):
+    def on_position_changed(self, position):
+        if self.follow_playhead_check.isChecked():
+            self.select_nearest_tag(self.tag_list, self.tag_model, position)
+            self.select_nearest_tag(self.cell_action_tag_list, self.cell_action_model, position)
+
+    @staticmethod
+    def select_nearest_tag(view, model, position):
+        row = model.nearest_row(position)
+        if row < 0:
+            return
+        index = model.index(row, 0)
+        if view.model() is not model:
+            # 검색으로 숨겨진 태그는 건너뜀
+            index = view.model().mapFromSource(index)
+            if not index.isValid():
+                return
+        if index != view.currentIndex():
+            view.selectionModel().setCurrentIndex(index, QItemSelectionModel.ClearAndSelect)
+            view.scrollTo(index, QAbstractItemView.PositionAtCenter)
+
+    def on_tag_double_clicked(self, index):
         modifiers = QApplication.keyboardModifiers()
 
-        tag = item.data(Qt.UserRole)
+        tag = index.data(Qt.UserRole)
         time_ms = tag.get("time_ms")
         tag_name = tag.get("tag_name")
         tag_type = tag.get("tag_type")
 
         if modifiers & Qt.ShiftModifier:
-            row = self.tag_list.row(item)
-            self.tag_list.takeItem(row)
             self.tag_manager.remove_tag(time_ms, tag_name, tag_type)
-            self.video_player.position_slider.setTags(self.tag_manager.get_tags())
         else:
             if time_ms is not None:
-                self.video_player.player.setPosition(time_ms)
+                self.video_player.seek_position(time_ms)
                 self.video_player.player.play()
 
-    def on_cell_action_tag_double_clicked(self, item):
-        tag = item.data(Qt.UserRole)
-        time_ms = tag.get("time_ms")
-        if time_ms is not None:
-            self.video_player.player.setPosition(time_ms)
+    def on_cell_action_tag_double_clicked(self, index):
+        tag = index.data(Qt.UserRole)
+        if tag.get("epoch_ms") is not None:
+            time_ms = self.cell_action_tag_manager.time_ms(tag)
+            self.video_player.seek_position(time_ms)
             self.video_player.player.play()